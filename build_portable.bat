@@ -46,6 +46,7 @@ copy "gurupia-parser\target\release\gurupia-parser.exe" "%DIST_DIR%\bin\" >nul
 
 :: Viewer
 copy "gurupia-viewer\app.py"                        "%DIST_DIR%\gurupia-viewer\" >nul
+copy "gurupia-viewer\asgi.py"                       "%DIST_DIR%\gurupia-viewer\" >nul
 copy "gurupia-viewer\static\index.html"             "%DIST_DIR%\gurupia-viewer\static\" >nul
 copy "gurupia-viewer\static\app.js"                 "%DIST_DIR%\gurupia-viewer\static\" >nul
 copy "gurupia-viewer\static\style.css"              "%DIST_DIR%\gurupia-viewer\static\" >nul
@@ -56,6 +57,8 @@ copy "gurupia-viewer\static\vendor\purify.min.js"       "%DIST_DIR%\gurupia-view
 :: Synthesizer
 copy "gurupia-synthesizer\synthesizer.py"           "%DIST_DIR%\gurupia-synthesizer\" >nul
 copy "gurupia-synthesizer\query.py"                 "%DIST_DIR%\gurupia-synthesizer\" >nul
+copy "gurupia-synthesizer\audio_manifest.py"        "%DIST_DIR%\gurupia-synthesizer\" >nul
+copy "gurupia-synthesizer\parallel.py"              "%DIST_DIR%\gurupia-synthesizer\" >nul
 
 :: Sample DB
 copy "SampleDict.db"    "%DIST_DIR%\" >nul
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+GurupiaDict Dump Reader
+Shared helpers for the Python parsers: native support for
+`pages-articles-multistream.xml.bz2` dumps (the bounded-window pool mapping
+lives in gurupia-synthesizer/parallel.py, shared with the synthesizer).
+
+A multistream dump is a concatenation of independent bz2 streams, each
+holding ~100 <page> elements. The companion
+`pages-articles-multistream-index.txt.bz2` lists `offset:page_id:title`
+for every page, so the distinct offsets are the stream boundaries. Each
+stream can be decompressed and parsed on its own, which lets workers
+process the dump in parallel without ever writing the XML to disk.
+"""
+
+import bz2
+import re
+import sys
+from multiprocessing import Pool
+from pathlib import Path
+from lxml import etree
+
+sys.path.insert(0, str(Path(__file__).parent / 'gurupia-synthesizer'))
+from parallel import ordered_imap
+
+MW_NAMESPACE = 'http://www.mediawiki.org/xml/export-0.11/'
+
+RE_XMLNS = re.compile(rb'<mediawiki[^>]*\sxmlns="([^"]+)"')
+
+
+def is_multistream(input_path):
+    """True if the input looks like a bz2 multistream dump"""
+    return str(input_path).endswith('.bz2')
+
+
+def default_index_path(dump_path):
+    """Locate the offset index next to a multistream dump.
+
+    kowiki-latest-pages-articles-multistream.xml.bz2
+      -> kowiki-latest-pages-articles-multistream-index.txt(.bz2)
+    """
+    dump_path = Path(dump_path)
+    stem = dump_path.name[:-len('.xml.bz2')] if dump_path.name.endswith('.xml.bz2') else dump_path.stem
+    for suffix in ('-index.txt.bz2', '-index.txt'):
+        candidate = dump_path.with_name(stem + suffix)
+        if candidate.exists():
+            return candidate
+    return dump_path.with_name(stem + '-index.txt.bz2')
+
+
+def read_stream_offsets(index_path):
+    """Read the distinct stream offsets from the index, in file order"""
+    opener = bz2.open if str(index_path).endswith('.bz2') else open
+    offsets = []
+    last = None
+    with opener(index_path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            offset, _, _ = line.partition(':')
+            if not offset:
+                continue
+            offset = int(offset)
+            # Pages of one stream are listed consecutively
+            if offset != last:
+                offsets.append(offset)
+                last = offset
+    return sorted(set(offsets))
+
+
+def stream_ranges(dump_path, offsets):
+    """Turn stream offsets into (offset, length) byte ranges.
+
+    The last indexed stream runs to EOF, which also covers the small
+    trailing stream holding `</mediawiki>`.
+    """
+    file_size = Path(dump_path).stat().st_size
+    ends = offsets[1:] + [file_size]
+    return [(start, end - start) for start, end in zip(offsets, ends)]
+
+
+def read_namespace(dump_path, first_offset):
+    """Read the export namespace from the header stream (<siteinfo>)"""
+    with open(dump_path, 'rb') as f:
+        header = bz2.decompress(f.read(first_offset)) if first_offset else b''
+    match = RE_XMLNS.search(header)
+    return match.group(1).decode('ascii') if match else MW_NAMESPACE
+
+
+def iter_stream_pages(dump_path, offset, length, namespace=MW_NAMESPACE):
+    """Decompress one bz2 stream and yield (title, ns, text) per <page>"""
+    with open(dump_path, 'rb') as f:
+        f.seek(offset)
+        data = bz2.decompress(f.read(length))
+
+    # Streams hold bare <page> fragments; the final one also closes the root
+    data = data.rstrip()
+    if data.endswith(b'</mediawiki>'):
+        data = data[:-len(b'</mediawiki>')]
+    document = (f'<mediawiki xmlns="{namespace}">'.encode('ascii')
+                + data + b'</mediawiki>')
+
+    # XML Bomb 방어: 엔티티 확장 비활성화 (Zero Trust)
+    safe_parser = etree.XMLParser(resolve_entities=False, recover=True, huge_tree=True)
+    root = etree.fromstring(document, parser=safe_parser)
+    if root is None:
+        return
+
+    ns = {'mw': namespace}
+    for page in root.iterfind('mw:page', ns):
+        title_elem = page.find('mw:title', ns)
+        ns_elem = page.find('mw:ns', ns)
+        text_elem = page.find('.//mw:text', ns)
+
+        if (title_elem is not None and title_elem.text
+                and text_elem is not None and text_elem.text):
+            page_ns = ns_elem.text if ns_elem is not None else None
+            yield title_elem.text.strip(), page_ns, text_elem.text
+
+
+def process_stream(task):
+    """Worker task: run `page_to_line` over every page of one stream.
+
+    Returns (pages_scanned, lines, errors) with lines in stream order.
+    """
+    dump_path, offset, length, namespace, page_to_line = task
+    pages = 0
+    lines = []
+    errors = []
+    try:
+        for title, ns, text in iter_stream_pages(dump_path, offset, length, namespace):
+            pages += 1
+            try:
+                line = page_to_line(title, ns, text)
+                if line is not None:
+                    lines.append(line)
+            except Exception as e:
+                errors.append(f"page '{title}' in stream @{offset}: {e}")
+    except Exception as e:
+        errors.append(f"stream @{offset}: {e}")
+    return pages, lines, errors
+
+
+def parse_multistream(dump_path, output_path, page_to_line, processes=1,
+                      index_path=None, initializer=None):
+    """Parse a multistream dump in parallel, writing JSONL in dump order.
+
+    `page_to_line(title, ns, text)` must be a module-level function (so it
+    can be sent to worker processes) returning a JSONL line or None.
+
+    Returns (pages_scanned, articles_written).
+    """
+    index_path = index_path or default_index_path(dump_path)
+    if not Path(index_path).exists():
+        raise FileNotFoundError(f"Multistream index not found: {index_path}")
+
+    print(f"🗂️  Index: {index_path}")
+    offsets = read_stream_offsets(index_path)
+    if not offsets:
+        raise ValueError(f"Multistream index is empty: {index_path}")
+    namespace = read_namespace(dump_path, offsets[0])
+    ranges = stream_ranges(dump_path, offsets)
+    print(f"🧩 Streams: {len(ranges):,} (decompressed in {processes} processes)")
+    print()
+
+    tasks = ((str(dump_path), offset, length, namespace, page_to_line)
+             for offset, length in ranges)
+
+    page_count = 0
+    processed_count = 0
+
+    with open(output_path, 'w', encoding='utf-8') as out_file:
+        if processes > 1:
+            pool = Pool(processes, initializer=initializer)
+            results = ordered_imap(pool, process_stream, tasks, window=processes * 4)
+        else:
+            pool = None
+            if initializer is not None:
+                initializer()
+            results = map(process_stream, tasks)
+
+        try:
+            for stream_no, (pages, lines, errors) in enumerate(results, 1):
+                page_count += pages
+                for error in errors:
+                    print(f"\n⚠️  Error processing {error}")
+
+                out_file.writelines(lines)
+                processed_count += len(lines)
+
+                if stream_no % 10 == 0:
+                    print(f"\r📊 Processed: {processed_count:,} articles "
+                          f"(Streams: {stream_no:,}/{len(ranges):,}, Total pages: {page_count:,})",
+                          end='', flush=True)
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+    return page_count, processed_count
@@ -9,10 +9,14 @@ import sys
 import json
 import re
 from pathlib import Path
+from multiprocessing import Pool
 from lxml import etree
 from os import cpu_count
 import time
 
+from dump_reader import is_multistream, parse_multistream
+from parallel import iter_chunks, ordered_imap
+
 class WikiCleaner:
     """Advanced Wikipedia markup cleaner"""
     
@@ -68,8 +72,115 @@ class WikiCleaner:
         
         return text.strip()
 
+# Pages per batch handed to a worker. Large enough to amortize pickling,
+# small enough to keep the in-flight window (and memory) bounded.
+BATCH_SIZE = 256
+
+REDIRECT_PREFIXES = ('#REDIRECT', '#redirect', '#넘겨주기')
+
+# Per-process cleaner, created once by the pool initializer
+_cleaner = None
+
+
+def _init_worker():
+    """Pool initializer: compile the cleaning patterns once per process"""
+    global _cleaner
+    _cleaner = WikiCleaner()
+
+
+def clean_page(cleaner, title, ns, text):
+    """Apply article filters and cleaning to one page.
+
+    Returns the JSONL line for the page, or None if it is skipped.
+    """
+    # Main namespace only
+    if ns != '0':
+        return None
+    
+    # Skip redirects
+    if text.strip().startswith(REDIRECT_PREFIXES):
+        return None
+    
+    # Skip disambiguation pages
+    if '(동음이의)' in title or '{{동음이의}}' in text:
+        return None
+    
+    # Enhanced cleaning
+    cleaned = cleaner.clean(text)
+    
+    # Minimum length check
+    if len(cleaned) < 100:
+        return None
+    
+    node = {
+        'title': title,
+        'content': cleaned
+    }
+    return json.dumps(node, ensure_ascii=False) + '\n'
+
+
+def page_to_line(title, ns, text):
+    """Multistream worker hook: clean one page with the per-process cleaner"""
+    global _cleaner
+    if _cleaner is None:
+        _cleaner = WikiCleaner()
+    return clean_page(_cleaner, title, ns, text)
+
+
+def clean_batch(batch):
+    """Worker task: clean a batch of (page_no, title, ns, text) tuples.
+
+    Returns (lines, errors) with lines in input order.
+    """
+    cleaner = _cleaner if _cleaner is not None else WikiCleaner()
+    lines = []
+    errors = []
+    for page_no, title, ns, text in batch:
+        try:
+            line = clean_page(cleaner, title, ns, text)
+            if line is not None:
+                lines.append(line)
+        except Exception as e:
+            errors.append(f"page {page_no} ({title}): {e}")
+    return lines, errors
+
+
+def iter_pages(input_path):
+    """Reader: stream (page_no, title, ns, text) tuples from the XML dump"""
+    # XML namespace
+    ns = {'mw': 'http://www.mediawiki.org/xml/export-0.11/'}
+    
+    page_no = 0
+    with open(input_path, 'rb') as in_file:
+        # Use iterparse for memory efficiency
+        context = etree.iterparse(in_file, events=('end',),
+                                  tag='{http://www.mediawiki.org/xml/export-0.11/}page')
+        
+        for event, page in context:
+            page_no += 1
+            
+            title_elem = page.find('mw:title', ns)
+            ns_elem = page.find('mw:ns', ns)
+            text_elem = page.find('.//mw:text', ns)
+            
+            if (title_elem is not None and title_elem.text
+                    and text_elem is not None and text_elem.text):
+                page_ns = ns_elem.text if ns_elem is not None else None
+                yield page_no, title_elem.text.strip(), page_ns, text_elem.text
+            
+            # Clear element to free memory
+            page.clear()
+            while page.getprevious() is not None:
+                del page.getparent()[0]
+
+
 def parse_wikipedia_xml(input_path, output_path, processes=None):
-    """Parse Wikipedia XML dump with multiprocessing"""
+    """Parse Wikipedia XML dump with multiprocessing
+
+    Reader (main process, lxml iterparse) -> process pool running
+    WikiCleaner.clean on page batches -> writer (main process) that emits
+    JSONL in input order.
+    """
     print(f"🚀 GurupiaDict Enhanced Parser (Python 3.14)")
     print(f"📖 Reading: {input_path}")
     print(f"📝 Writing: {output_path}")
@@ -80,87 +191,61 @@ def parse_wikipedia_xml(input_path, output_path, processes=None):
     print(f"⚡ Using {processes} processes")
     print()
     
-    # XML namespace
-    ns = {'mw': 'http://www.mediawiki.org/xml/export-0.11/'}
-    
-    cleaner = WikiCleaner()
     page_count = 0
     processed_count = 0
     start_time = time.time()
     
+    if is_multistream(input_path):
+        page_count, processed_count = parse_multistream(
+            input_path, output_path, page_to_line, processes, initializer=_init_worker)
+        print_final_stats(page_count, processed_count, start_time)
+        return
+    
+    def counted_pages():
+        nonlocal page_count
+        for page in iter_pages(input_path):
+            page_count = page[0]
+            yield page
+    
+    batches = iter_chunks(counted_pages(), BATCH_SIZE)
+    
     with open(output_path, 'w', encoding='utf-8') as out_file:
-        # Use iterparse for memory efficiency
-        context = etree.iterparse(input_path, events=('end',), 
-                                   tag='{http://www.mediawiki.org/xml/export-0.11/}page')
+        if processes > 1:
+            pool = Pool(processes, initializer=_init_worker)
+            results = ordered_imap(pool, clean_batch, batches, window=processes * 4)
+        else:
+            pool = None
+            _init_worker()
+            results = map(clean_batch, batches)
         
-        for event, page in context:
-            page_count += 1
-            
-            try:
-                # Extract title
-                title_elem = page.find('mw:title', ns)
-                if title_elem is None or not title_elem.text:
-                    page.clear()
-                    continue
+        try:
+            for lines, errors in results:
+                for error in errors:
+                    print(f"\n⚠️  Error processing {error}")
                 
-                title = title_elem.text.strip()
-                
-                # Extract namespace
-                ns_elem = page.find('mw:ns', ns)
-                if ns_elem is None or ns_elem.text != '0':
-                    page.clear()
-                    continue
-                
-                # Extract text
-                text_elem = page.find('.//mw:text', ns)
-                if text_elem is None or not text_elem.text:
-                    page.clear()
+                if not lines:
                     continue
                 
-                text = text_elem.text
+                previous = processed_count
+                out_file.writelines(lines)
+                processed_count += len(lines)
                 
-                # Skip redirects
-                if text.strip().startswith(('#REDIRECT', '#redirect', '#넘겨주기')):
-                    page.clear()
-                    continue
-                
-                # Skip disambiguation pages
-                if '(동음이의)' in title or '{{동음이의}}' in text:
-                    page.clear()
-                    continue
-                
-                # Enhanced cleaning
-                cleaned = cleaner.clean(text)
-                
-                # Minimum length check
-                if len(cleaned) < 100:
-                    page.clear()
-                    continue
-                
-                # Write to JSONL
-                node = {
-                    'title': title,
-                    'content': cleaned
-                }
-                
-                out_file.write(json.dumps(node, ensure_ascii=False) + '\n')
-                processed_count += 1
-                
-                if processed_count % 1000 == 0:
+                if processed_count // 1000 != previous // 1000:
                     elapsed = time.time() - start_time
                     rate = processed_count / elapsed if elapsed > 0 else 0
                     print(f"\r📊 Processed: {processed_count:,} articles "
                           f"({rate:.0f} articles/sec, Total pages: {page_count:,})", 
                           end='', flush=True)
-                
-            except Exception as e:
-                print(f"\n⚠️  Error processing page {page_count}: {e}")
-            
-            # Clear element to free memory
-            page.clear()
-            while page.getprevious() is not None:
-                del page.getparent()[0]
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
     
+    print_final_stats(page_count, processed_count, start_time)
+
+
+def print_final_stats(page_count, processed_count, start_time):
+    """Print the summary shared by the XML and multistream paths"""
     elapsed = time.time() - start_time
     print(f"\n\n📈 Final Stats:")
     print(f"   Total pages scanned: {page_count:,}")
@@ -171,10 +256,11 @@ def parse_wikipedia_xml(input_path, output_path, processes=None):
 
 if __name__ == '__main__':
     if len(sys.argv) < 3:
-        print("Usage: python enhanced_parser.py <input.xml> <output.jsonl> [processes]")
+        print("Usage: python enhanced_parser.py <input.xml|input-multistream.xml.bz2> <output.jsonl> [processes]")
         print("\nExample:")
         print("  python enhanced_parser.py kowiki-latest-pages-articles.xml kowiki_enhanced.jsonl")
         print("  python enhanced_parser.py kowiki-latest-pages-articles.xml kowiki_enhanced.jsonl 8")
+        print("  python enhanced_parser.py kowiki-latest-pages-articles-multistream.xml.bz2 kowiki_enhanced.jsonl 8")
         sys.exit(1)
     
     input_path = sys.argv[1]
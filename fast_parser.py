@@ -10,6 +10,9 @@ import re
 import logging
 from pathlib import Path
 from lxml import etree
+from os import cpu_count
+
+from dump_reader import is_multistream, parse_multistream
 
 # [Phase 4: #3] 전역 정규식 캐싱 - 루프 내 재컴파일 및 GC 부하 방지
 RE_FILE = re.compile(r'\[\[(?:File|파일|Image|그림):[^\]]*\]\]')
@@ -63,13 +66,61 @@ def smart_truncate(text, min_chars=500, max_chars=1500):
     # If no sentence boundary found, cut at max_chars
     return text[:max_chars].strip()
 
-def parse_wikipedia_xml(input_path, output_path):
+def page_to_line(title, ns, text):
+    """Filter one page and build its JSONL line (None if skipped).
+
+    Module-level so the multistream workers can run it in parallel.
+    """
+    # Main namespace only
+    if ns != '0':
+        return None
+    
+    # Skip redirects
+    if text.strip().startswith(('#REDIRECT', '#redirect')):
+        return None
+    
+    # Skip disambiguation pages
+    if '(동음이의)' in title or '{{동음이의}}' in text:
+        return None
+    
+    # Extract first paragraph
+    first_para = extract_first_paragraph(text)
+    
+    if not first_para:
+        return None
+    
+    # Clean wiki markup
+    cleaned = clean_wiki_markup(first_para)
+    
+    # Smart truncate
+    truncated = smart_truncate(cleaned, 500, 1500)
+    
+    if len(truncated) < 100:
+        return None
+    
+    # Write to JSONL
+    node = {
+        'title': title,
+        'content': truncated
+    }
+    
+    return json.dumps(node, ensure_ascii=False) + '\n'
+
+def parse_wikipedia_xml(input_path, output_path, processes=None):
     """Parse Wikipedia XML dump"""
     print(f"🐍 GurupiaDict Fast Parser (Python)")
     print(f"📖 Reading: {input_path}")
     print(f"📝 Writing: {output_path}")
     print()
     
+    if is_multistream(input_path):
+        if processes is None:
+            processes = max(1, cpu_count() - 1)
+        print(f"⚡ Multistream bz2 input, using {processes} processes")
+        page_count, processed_count = parse_multistream(input_path, output_path, page_to_line, processes)
+        print_final_stats(page_count, processed_count)
+        return
+    
     # XML namespace - Updated to 0.11
     ns = {'mw': 'http://www.mediawiki.org/xml/export-0.11/'}
     
@@ -97,9 +148,6 @@ def parse_wikipedia_xml(input_path, output_path):
                 
                 # Extract namespace
                 ns_elem = page.find('mw:ns', ns)
-                if ns_elem is None or ns_elem.text != '0':
-                    page.clear()
-                    continue
                 
                 # Extract text
                 text_elem = page.find('.//mw:text', ns)
@@ -107,42 +155,12 @@ def parse_wikipedia_xml(input_path, output_path):
                     page.clear()
                     continue
                 
-                text = text_elem.text
-                
-                # Skip redirects
-                if text.strip().startswith(('#REDIRECT', '#redirect')):
-                    page.clear()
-                    continue
-                
-                # Skip disambiguation pages
-                if '(동음이의)' in title or '{{동음이의}}' in text:
-                    page.clear()
-                    continue
-                
-                # Extract first paragraph
-                first_para = extract_first_paragraph(text)
-                
-                if not first_para:
+                line = page_to_line(title, ns_elem.text if ns_elem is not None else None, text_elem.text)
+                if line is None:
                     page.clear()
                     continue
                 
-                # Clean wiki markup
-                cleaned = clean_wiki_markup(first_para)
-                
-                # Smart truncate
-                truncated = smart_truncate(cleaned, 500, 1500)
-                
-                if len(truncated) < 100:
-                    page.clear()
-                    continue
-                
-                # Write to JSONL
-                node = {
-                    'title': title,
-                    'content': truncated
-                }
-                
-                out_file.write(json.dumps(node, ensure_ascii=False) + '\n')
+                out_file.write(line)
                 processed_count += 1
                 
                 if processed_count % 1000 == 0:
@@ -158,6 +176,10 @@ def parse_wikipedia_xml(input_path, output_path):
             while page.getprevious() is not None:
                 del page.getparent()[0]
     
+    print_final_stats(page_count, processed_count)
+
+def print_final_stats(page_count, processed_count):
+    """Print the summary shared by the XML and multistream paths"""
     print(f"\n📈 Final Stats:")
     print(f"   Total pages scanned: {page_count:,}")
     print(f"   Main namespace articles extracted: {processed_count:,}")
@@ -165,13 +187,15 @@ def parse_wikipedia_xml(input_path, output_path):
 
 if __name__ == '__main__':
     if len(sys.argv) < 3:
-        print("Usage: python fast_parser.py <input.xml> <output.jsonl>")
+        print("Usage: python fast_parser.py <input.xml|input-multistream.xml.bz2> <output.jsonl> [processes]")
         print("\nExample:")
         print("  python fast_parser.py kowiki-latest-pages-articles.xml kowiki_full.jsonl")
+        print("  python fast_parser.py kowiki-latest-pages-articles-multistream.xml.bz2 kowiki_full.jsonl 8")
         sys.exit(1)
     
     input_path = sys.argv[1]
     output_path = sys.argv[2]
+    processes = int(sys.argv[3]) if len(sys.argv) > 3 else None
     
     if not Path(input_path).exists():
         print(f"❌ Input file not found: {input_path}")
@@ -183,4 +207,4 @@ if __name__ == '__main__':
         print(f"❌ 보안 에러: 지정된 출력 디렉토리가 존재하지 않습니다: {output_dir}")
         sys.exit(1)
     
-    parse_wikipedia_xml(input_path, output_path)
+    parse_wikipedia_xml(input_path, output_path, processes)
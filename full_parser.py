@@ -10,6 +10,9 @@ import re
 import logging
 from pathlib import Path
 from lxml import etree
+from os import cpu_count
+
+from dump_reader import is_multistream, parse_multistream
 
 # 1.2 정규식(Regex) 전역 모듈 레벨 캐싱
 RE_FILE = re.compile(r'\[\[(?:File|파일|Image|그림):[^\]]*\]\]')
@@ -45,7 +48,39 @@ def clean_wiki_markup(text):
     
     return text.strip()
 
-def parse_wikipedia_xml(input_path, output_path):
+def page_to_line(title, ns, text):
+    """Filter one page and build its JSONL line (None if skipped).
+
+    Module-level so the multistream workers can run it in parallel.
+    """
+    # Main namespace only
+    if ns != '0':
+        return None
+    
+    # Skip redirects
+    if text.strip().startswith(('#REDIRECT', '#redirect')):
+        return None
+    
+    # Skip disambiguation pages
+    if '(동음이의)' in title or '{{동음이의}}' in text:
+        return None
+    
+    # Clean wiki markup (but keep FULL content!)
+    cleaned = clean_wiki_markup(text)
+    
+    # Minimum length check (at least 100 chars)
+    if len(cleaned) < 100:
+        return None
+    
+    # Write to JSONL - FULL CONTENT!
+    node = {
+        'title': title,
+        'content': cleaned  # Complete article!
+    }
+    
+    return json.dumps(node, ensure_ascii=False) + '\n'
+
+def parse_wikipedia_xml(input_path, output_path, processes=None):
     """Parse Wikipedia XML dump - FULL CONTENT"""
     print(f"🐍 GurupiaDict Full Parser (Python)")
     print(f"📖 Reading: {input_path}")
@@ -53,6 +88,14 @@ def parse_wikipedia_xml(input_path, output_path):
     print(f"💾 Mode: FULL CONTENT (complete articles)")
     print()
     
+    if is_multistream(input_path):
+        if processes is None:
+            processes = max(1, cpu_count() - 1)
+        print(f"⚡ Multistream bz2 input, using {processes} processes")
+        page_count, processed_count = parse_multistream(input_path, output_path, page_to_line, processes)
+        print_final_stats(page_count, processed_count)
+        return
+    
     # XML namespace
     ns = {'mw': 'http://www.mediawiki.org/xml/export-0.11/'}
     
@@ -81,9 +124,6 @@ def parse_wikipedia_xml(input_path, output_path):
                 
                 # Extract namespace
                 ns_elem = page.find('mw:ns', ns)
-                if ns_elem is None or ns_elem.text != '0':
-                    page.clear()
-                    continue
                 
                 # Extract text
                 text_elem = page.find('.//mw:text', ns)
@@ -91,33 +131,12 @@ def parse_wikipedia_xml(input_path, output_path):
                     page.clear()
                     continue
                 
-                text = text_elem.text
-                
-                # Skip redirects
-                if text.strip().startswith(('#REDIRECT', '#redirect')):
-                    page.clear()
-                    continue
-                
-                # Skip disambiguation pages
-                if '(동음이의)' in title or '{{동음이의}}' in text:
-                    page.clear()
-                    continue
-                
-                # Clean wiki markup (but keep FULL content!)
-                cleaned = clean_wiki_markup(text)
-                
-                # Minimum length check (at least 100 chars)
-                if len(cleaned) < 100:
+                line = page_to_line(title, ns_elem.text if ns_elem is not None else None, text_elem.text)
+                if line is None:
                     page.clear()
                     continue
                 
-                # Write to JSONL - FULL CONTENT!
-                node = {
-                    'title': title,
-                    'content': cleaned  # Complete article!
-                }
-                
-                out_file.write(json.dumps(node, ensure_ascii=False) + '\n')
+                out_file.write(line)
                 processed_count += 1
                 
                 if processed_count % 1000 == 0:
@@ -133,6 +152,10 @@ def parse_wikipedia_xml(input_path, output_path):
             while page.getprevious() is not None:
                 del page.getparent()[0]
     
+    print_final_stats(page_count, processed_count)
+
+def print_final_stats(page_count, processed_count):
+    """Print the summary shared by the XML and multistream paths"""
     print(f"\n📈 Final Stats:")
     print(f"   Total pages scanned: {page_count:,}")
     print(f"   Full articles extracted: {processed_count:,}")
@@ -140,14 +163,16 @@ def parse_wikipedia_xml(input_path, output_path):
 
 if __name__ == '__main__':
     if len(sys.argv) < 3:
-        print("Usage: python full_parser.py <input.xml> <output.jsonl>")
+        print("Usage: python full_parser.py <input.xml|input-multistream.xml.bz2> <output.jsonl> [processes]")
         print("\nExample:")
         print("  python full_parser.py kowiki-latest-pages-articles.xml kowiki_complete.jsonl")
+        print("  python full_parser.py kowiki-latest-pages-articles-multistream.xml.bz2 kowiki_complete.jsonl 8")
         sys.exit(1)
     
     
     input_path = sys.argv[1]
     output_path = sys.argv[2]
+    processes = int(sys.argv[3]) if len(sys.argv) > 3 else None
     
     if not Path(input_path).exists():
         print(f"❌ Input file not found: {input_path}")
@@ -159,4 +184,4 @@ if __name__ == '__main__':
         print(f"❌ 보안 거부: 지정된 출력 디렉토리가 존재하지 않거나 접근할 수 없습니다: {output_dir}")
         sys.exit(1)
     
-    parse_wikipedia_xml(input_path, output_path)
+    parse_wikipedia_xml(input_path, output_path, processes)
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+GurupiaDict TTS audio manifest
+
+Shared by tts_generator.py (which writes it as it generates audio) and the
+viewer (which loads it once at startup). The manifest maps each article
+title to its MP3 in the audio directory, with size, duration and content
+hash, so serving audio is a dict lookup and the hash can version URLs and
+ETags without touching the file.
+
+MP3 files the manifest does not list (audio generated before it existed)
+are indexed by scanning the directory and matched by sanitized filename.
+
+The generator also keeps a content-addressed chunk cache (ChunkCache):
+each synthesized text chunk is stored under the hash of its text, voice
+and speaking rate, and each manifest entry lists its chunk keys, so after
+a dump refresh only chunks whose text changed are synthesized again.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+CHUNK_DIR = 'chunks'
+
+# MPEG 오디오 Layer III 프레임 헤더 표 (kbps, Hz)
+_BITRATES_V1 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+_BITRATES_V2 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def safe_filename(title: str) -> str:
+    """Filesystem-safe MP3 name stem for a title (alphanumerics, space, - and _; 100 chars)"""
+    safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()
+    return safe_title[:100]
+
+
+def _frame_header(data: bytes, offset: int):
+    """(frame bytes, samples, sample rate) of a Layer III frame header at offset, or None"""
+    if offset + 4 > len(data) or data[offset] != 0xFF or data[offset + 1] & 0xE0 != 0xE0:
+        return None
+    version = (data[offset + 1] >> 3) & 0x03   # 3: MPEG-1, 2: MPEG-2, 0: MPEG-2.5
+    layer = (data[offset + 1] >> 1) & 0x03     # 1: Layer III
+    bitrate_index = data[offset + 2] >> 4
+    rate_index = (data[offset + 2] >> 2) & 0x03
+    padding = (data[offset + 2] >> 1) & 0x01
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    if version == 3:
+        bitrate = _BITRATES_V1[bitrate_index] * 1000
+        return 144 * bitrate // sample_rate + padding, 1152, sample_rate
+    bitrate = _BITRATES_V2[bitrate_index] * 1000
+    return 72 * bitrate // sample_rate + padding, 576, sample_rate
+
+
+def _id3v2_size(data: bytes) -> int:
+    """Bytes taken by a leading ID3v2 tag (0 if there is none)"""
+    if data[:3] != b'ID3' or len(data) < 10:
+        return 0
+    # ID3v2 태그 크기는 7비트씩 나눈 4바이트 (footer 플래그면 10바이트 더)
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    return 10 + size + (10 if data[5] & 0x10 else 0)
+
+
+def strip_tags(data: bytes) -> bytes:
+    """MP3 frames only: drop a leading ID3v2 and trailing ID3v1 tag (to concatenate streams)"""
+    start = _id3v2_size(data)
+    end = len(data) - 128 if len(data) - start >= 128 and data[-128:-125] == b'TAG' else len(data)
+    return data[start:end]
+
+
+def mp3_duration(data: bytes) -> float:
+    """Playing time in seconds of MP3 data, by walking its frame headers"""
+    offset = _id3v2_size(data)
+
+    seconds = 0.0
+    while offset + 4 <= len(data):
+        header = _frame_header(data, offset)
+        if header is None:
+            if data[offset:offset + 3] == b'TAG':
+                break  # 끝의 ID3v1 태그
+            offset += 1  # 동기 재탐색
+            continue
+        frame_bytes, samples, sample_rate = header
+        seconds += samples / sample_rate
+        offset += frame_bytes
+    return seconds
+
+
+def chunk_key(text: str, voice: str, speaking_rate: float) -> str:
+    """Content address of one synthesized chunk: hash of (text, voice, speaking rate)"""
+    payload = json.dumps([voice, speaking_rate, text], ensure_ascii=False).encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+class ChunkCache:
+    """Content-addressed store of synthesized chunks: <audio_dir>/chunks/<ab>/<key>.mp3"""
+
+    def __init__(self, audio_dir):
+        self.dir = Path(audio_dir) / CHUNK_DIR
+
+    def path(self, key: str) -> Path:
+        return self.dir / key[:2] / f"{key}.mp3"
+
+    def __contains__(self, key: str) -> bool:
+        return self.path(key).is_file()
+
+    def get(self, key: str) -> bytes:
+        return self.path(key).read_bytes()
+
+    def put(self, key: str, data: bytes):
+        """Store a chunk atomically (temp file + replace; safe from worker threads)"""
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def prune(self, keep) -> int:
+        """Delete cached chunks whose key is not in keep; returns the number removed"""
+        removed = 0
+        if self.dir.is_dir():
+            for path in self.dir.glob('*/*.mp3'):
+                if path.stem not in keep:
+                    path.unlink()
+                    removed += 1
+        return removed
+
+
+class AudioManifest:
+    """title -> {'file', 'size', 'duration', 'hash', 'chunks'} for an audio directory"""
+
+    def __init__(self, audio_dir):
+        self.audio_dir = Path(audio_dir)
+        self.path = self.audio_dir / MANIFEST_NAME
+        self.articles: Dict[str, Dict] = {}
+        # 매니페스트가 없는 이전 디렉터리: 파일명(정리된 제목) -> 항목
+        self._by_filename: Dict[str, Dict] = {}
+
+    @classmethod
+    def load(cls, audio_dir) -> 'AudioManifest':
+        """Read the manifest and index any MP3 files it does not list (pre-manifest audio)"""
+        manifest = cls(audio_dir)
+        if manifest.path.is_file():
+            with open(manifest.path, 'r', encoding='utf-8') as f:
+                manifest.articles = json.load(f).get('articles', {})
+        if manifest.audio_dir.is_dir():
+            listed = {entry['file'] for entry in manifest.articles.values()}
+            for path in manifest.audio_dir.glob('*.mp3'):
+                if path.name in listed:
+                    continue
+                st = path.stat()
+                manifest._by_filename[path.stem] = {
+                    'file': path.name,
+                    'size': st.st_size,
+                    'duration': None,
+                    'hash': f"{st.st_mtime_ns:x}-{st.st_size:x}",
+                }
+        return manifest
+
+    def __len__(self):
+        return len(self.articles) + len(self._by_filename)
+
+    def get(self, title: str) -> Optional[Dict]:
+        """Manifest entry for a title, None if it has no audio"""
+        entry = self.articles.get(title)
+        if entry is None and self._by_filename:
+            entry = self._by_filename.get(safe_filename(title))
+        return entry
+
+    def file_path(self, entry: Dict) -> Path:
+        return self.audio_dir / entry['file']
+
+    def add(self, title: str, filename: str, chunks: Optional[List[str]] = None) -> Dict:
+        """Record a generated MP3 (size, duration and hash read from the file) and its chunk keys"""
+        path = self.audio_dir / filename
+        data = path.read_bytes()
+        entry = {
+            'file': filename,
+            'size': len(data),
+            'duration': round(mp3_duration(data), 3),
+            'hash': hashlib.blake2b(data, digest_size=16).hexdigest(),
+        }
+        if chunks is not None:
+            entry['chunks'] = chunks
+        self.articles[title] = entry
+        return entry
+
+    def chunk_keys(self) -> Set[str]:
+        """Every chunk key some article still uses"""
+        return {key for entry in self.articles.values() for key in entry.get('chunks', ())}
+
+    def save(self):
+        """Write the manifest atomically (temp file + replace)"""
+        self.audio_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'articles': self.articles}, f,
+                      ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
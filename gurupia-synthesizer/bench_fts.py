@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+GurupiaDict full-text search benchmark
+
+Compares the unicode61 word index (NodesFTS) with the trigram substring
+index (NodesTrigram) of a DB built with `--tokenizer trigram`: on-disk size
+of each index, `full_text_search` latency, and how many articles each one
+finds for the same search terms. Terms are random 3-4 character pieces of
+words taken from the articles themselves, so many of them sit inside
+inflected or compound Korean words ("퓨터의", "자컴퓨").
+
+Usage:
+    python bench_fts.py GurupiaDict.db
+    python bench_fts.py GurupiaDict.db --terms 500 --limit 20
+"""
+
+import argparse
+import random
+import re
+import sqlite3
+import sys
+import time
+
+from query import GurupiaQuery
+
+RE_WORD = re.compile(r'[\w가-힣]{4,}')
+
+
+def index_bytes(query, table):
+    """Total page bytes of an FTS5 table's shadow tables (None without dbstat)"""
+    shadows = [f'{table}_{suffix}' for suffix in ('data', 'idx', 'docsize', 'config')]
+    try:
+        row = query.conn.execute(
+            "SELECT SUM(pgsize) FROM dbstat WHERE name IN (?, ?, ?, ?)", shadows
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0]
+
+
+def sample_terms(query, count, seed=0):
+    """Random 3-4 character substrings of words in random articles"""
+    rng = random.Random(seed)
+    max_id = query.conn.execute("SELECT MAX(id) FROM Nodes").fetchone()[0] or 0
+    terms = []
+    for _ in range(count * 20):
+        if len(terms) >= count:
+            break
+        row = query.conn.execute(
+            "SELECT raw_content FROM Nodes WHERE id >= ? LIMIT 1", (rng.randint(1, max_id),)
+        ).fetchone()
+        if row is None:
+            continue
+        words = RE_WORD.findall(query.decode_text(row['raw_content']))
+        if not words:
+            continue
+        word = rng.choice(words)
+        size = rng.choice((3, 4))
+        start = rng.randint(0, max(0, len(word) - size))
+        terms.append(word[start:start + size])
+    return terms
+
+
+def run(query, tokenizer, terms, limit):
+    """(sorted latencies, total matching articles) using the given index"""
+    query.fts_tokenizer = tokenizer
+    table = 'NodesTrigram' if tokenizer == 'trigram' else 'NodesFTS'
+    timings = []
+    matches = 0
+    for term in terms:
+        start = time.perf_counter()
+        query.full_text_search(term, limit)
+        timings.append(time.perf_counter() - start)
+
+        safe = term.replace('"', '""')
+        match_expr = f'"{safe}"' if tokenizer == 'trigram' else f'"{safe}"*'
+        matches += query.conn.execute(
+            f"SELECT COUNT(*) FROM {table} WHERE {table} MATCH ?", (match_expr,)
+        ).fetchone()[0]
+    timings.sort()
+    return timings, matches
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark unicode61 vs trigram full-text search')
+    parser.add_argument('db_path', help='GurupiaDict database built with --tokenizer trigram')
+    parser.add_argument('--terms', type=int, default=300, help='Search terms to sample')
+    parser.add_argument('--limit', type=int, default=10, help='Results per search')
+
+    args = parser.parse_args()
+
+    with GurupiaQuery(args.db_path, read_only=True) as query:
+        if query.fts_tokenizer != 'trigram':
+            print("❌ No trigram index (rebuild with: synthesizer.py ... --tokenizer trigram)")
+            sys.exit(1)
+
+        terms = sample_terms(query, args.terms)
+        print(f"⏱️  {len(terms):,} search terms, limit {args.limit}")
+
+        for tokenizer, table in (('unicode61', 'NodesFTS'), ('trigram', 'NodesTrigram')):
+            size = index_bytes(query, table)
+            size_text = f"{size / 1024 / 1024:8.1f} MiB" if size is not None else "     n/a    "
+            timings, matches = run(query, tokenizer, terms, args.limit)
+            print(f"   {tokenizer:10} {size_text}  "
+                  f"p50 {percentile(timings, 50) * 1000:7.3f} ms  "
+                  f"p99 {percentile(timings, 99) * 1000:7.3f} ms  "
+                  f"matches {matches / len(terms):8.1f}/term")
+
+
+if __name__ == '__main__':
+    main()
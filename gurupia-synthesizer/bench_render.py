@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+GurupiaDict render benchmark
+
+Checks `convert_to_html` against the golden corpus (render_golden.jsonl)
+and the reference regex chain, then times both on real articles.
+
+Usage:
+    python bench_render.py                       # golden check + built-in sample
+    python bench_render.py --jsonl articles.jsonl --limit 20000
+    python bench_render.py --db GurupiaDict.db --fuzz 100000
+    python bench_render.py --update-golden       # after an intended output change
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+from wikitext import convert_to_html, convert_to_html_chained
+
+GOLDEN_PATH = Path(__file__).with_name('render_golden.jsonl')
+
+FUZZ_ALPHABET = ["[[", "]]", "|", "'", "''", "'''", "'''''", "a", "b c", " ",
+                 "\n", "\n\n", "\r\n", "[", "]", "x", "가"]
+
+
+def load_golden(path=GOLDEN_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def check_golden(cases):
+    """Return the names of cases whose output differs from the stored HTML"""
+    failed = []
+    for case in cases:
+        if convert_to_html(case['wikitext']) != case['html']:
+            failed.append(case['name'])
+    return failed
+
+
+def update_golden(cases, path=GOLDEN_PATH):
+    """Re-record expected HTML with the reference chain"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for case in cases:
+            case['html'] = convert_to_html_chained(case['wikitext'])
+            f.write(json.dumps(case, ensure_ascii=False) + '\n')
+
+
+def fuzz(iterations, seed=0):
+    """Cross-check against the reference chain on random markup soup"""
+    rng = random.Random(seed)
+    for _ in range(iterations):
+        text = ''.join(rng.choice(FUZZ_ALPHABET) for _ in range(rng.randint(0, 16)))
+        if convert_to_html(text) != convert_to_html_chained(text):
+            return text
+    return None
+
+
+def load_jsonl(path, limit):
+    texts = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if len(texts) >= limit:
+                break
+            try:
+                texts.append(json.loads(line)['content'])
+            except (json.JSONDecodeError, KeyError):
+                continue
+    return texts
+
+
+def load_db(path, limit):
+    from query import GurupiaQuery
+
+    with GurupiaQuery(path) as query:
+        rows = query.conn.execute(
+            "SELECT raw_content FROM Nodes LIMIT ?", (limit,)
+        ).fetchall()
+        return [query.decode_text(row['raw_content']) for row in rows]
+
+
+def time_renderer(func, texts, repeat):
+    """Best wall time of `repeat` runs over all texts"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark wiki markup rendering')
+    parser.add_argument('--jsonl', help='Articles JSONL (parser output)')
+    parser.add_argument('--db', help='GurupiaDict database')
+    parser.add_argument('--limit', type=int, default=10000, help='Max articles to load')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing runs (best is reported)')
+    parser.add_argument('--fuzz', type=int, default=20000, help='Random cross-check iterations')
+    parser.add_argument('--update-golden', action='store_true', help='Re-record render_golden.jsonl')
+
+    args = parser.parse_args()
+
+    cases = load_golden()
+    if args.update_golden:
+        update_golden(cases)
+        print(f"📝 Golden corpus updated: {len(cases)} cases")
+        return
+
+    failed = check_golden(cases)
+    if failed:
+        print(f"❌ Golden mismatch: {', '.join(failed)}")
+        sys.exit(1)
+    print(f"✅ Golden corpus: {len(cases)} cases")
+
+    if args.fuzz:
+        bad = fuzz(args.fuzz)
+        if bad is not None:
+            print(f"❌ Differs from reference chain: {bad!r}")
+            sys.exit(1)
+        print(f"✅ Fuzz: {args.fuzz:,} random inputs match the reference chain")
+
+    if args.jsonl:
+        texts = load_jsonl(args.jsonl, args.limit)
+    elif args.db:
+        texts = load_db(args.db, args.limit)
+    else:
+        texts = [case['wikitext'] for case in cases] * 200
+
+    for text in texts:
+        if convert_to_html(text) != convert_to_html_chained(text):
+            print(f"❌ Differs from reference chain: {text[:80]!r}")
+            sys.exit(1)
+
+    total_chars = sum(len(t) for t in texts)
+    print(f"\n⏱️  {len(texts):,} articles, {total_chars:,} chars (best of {args.repeat})")
+
+    chained = time_renderer(convert_to_html_chained, texts, args.repeat)
+    single = time_renderer(convert_to_html, texts, args.repeat)
+    for name, elapsed in (('regex chain', chained), ('single pass', single)):
+        print(f"   {name:12} {elapsed * 1000:9.1f} ms  "
+              f"({elapsed / len(texts) * 1e6:.1f} µs/article)")
+    print(f"   speedup      {chained / single:9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
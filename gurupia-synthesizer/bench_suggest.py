@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+GurupiaDict autocomplete benchmark
+
+Replays typed prefixes of sampled titles (1 character, 2 characters, ...)
+against `suggest_titles` and the FTS5 prefix search `search_titles`, and
+reports latency percentiles for each. --choseong replays initial
+consonants instead ("ㅋ", "ㅋㅍ", ...); only `suggest_titles` matches those.
+
+Usage:
+    python bench_suggest.py GurupiaDict.db
+    python bench_suggest.py GurupiaDict.db --samples 2000 --max-chars 6
+    python bench_suggest.py GurupiaDict.db --choseong
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from query import GurupiaQuery
+from suggest import choseong_key
+
+
+def sample_prefixes(query, samples, max_chars, choseong=False, seed=0):
+    """Every prefix (up to max_chars) of randomly sampled titles, as typed"""
+    rows = query.conn.execute("SELECT title FROM Nodes").fetchall()
+    titles = [row['title'] for row in rows]
+    rng = random.Random(seed)
+    picked = rng.sample(titles, min(samples, len(titles)))
+    if choseong:
+        picked = [key for key in map(choseong_key, picked) if 'ㄱ' <= key[:1] <= 'ㅎ']
+    return [title[:n] for title in picked for n in range(1, min(len(title), max_chars) + 1)]
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))
+    return sorted_values[index]
+
+
+def time_lookups(func, prefixes, limit):
+    timings = []
+    for prefix in prefixes:
+        start = time.perf_counter()
+        func(prefix, limit)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark title autocomplete')
+    parser.add_argument('db_path', help='GurupiaDict database')
+    parser.add_argument('--samples', type=int, default=1000, help='Titles to sample')
+    parser.add_argument('--max-chars', type=int, default=5, help='Longest prefix typed per title')
+    parser.add_argument('--limit', type=int, default=10, help='Suggestions per lookup')
+    parser.add_argument('--choseong', action='store_true', help='Type initial consonants (ㅋㅍㅌ)')
+
+    args = parser.parse_args()
+
+    with GurupiaQuery(args.db_path, read_only=True) as query:
+        if not query.has_suggest:
+            print("❌ No autocomplete index (re-run the synthesizer to build it)")
+            sys.exit(1)
+
+        prefixes = sample_prefixes(query, args.samples, args.max_chars, args.choseong)
+        print(f"⏱️  {len(prefixes):,} prefixes from {args.samples:,} sampled titles")
+
+        for name, func in (('suggest', query.suggest_titles), ('FTS search', query.search_titles)):
+            timings = time_lookups(func, prefixes, args.limit)
+            print(f"   {name:12} p50 {percentile(timings, 50) * 1000:7.3f} ms  "
+                  f"p99 {percentile(timings, 99) * 1000:7.3f} ms  "
+                  f"max {timings[-1] * 1000:7.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+GurupiaDict graph analytics
+
+Loads the resolved Edges table into compact NumPy CSR arrays (dense node
+indexes, int32) and computes link-based scores on them vectorized. The
+synthesizer writes the results to NodeScore; run this module directly to
+time the stage and inspect the top articles without touching the DB.
+
+The synthesizer can also export forward and reverse CSR arrays next to the
+DB (`<db>.csr/<stamp>/`, one .npy per array). GraphStore memory-maps them
+for multi-hop queries: k-hop neighborhoods, shortest paths (bidirectional
+BFS) and common neighbors.
+
+Usage:
+    python graph.py GurupiaDict.db
+    python graph.py GurupiaDict.db --top 50
+"""
+
+import argparse
+import shutil
+import sqlite3
+import threading
+import time
+from itertools import chain
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # 선택 의존성: synthesizer --prior pagerank 에서만 필요
+    np = None
+
+PAGERANK_DAMPING = 0.85
+PAGERANK_TOL = 1e-6  # 반복 간 L1 변화량
+PAGERANK_MAX_ITER = 100
+
+# CSR 내보내기 파일 (<db>.csr/<name>.npy)
+GRAPH_ARRAYS = ('node_ids', 'fwd_indptr', 'fwd_indices', 'rev_indptr', 'rev_indices')
+GRAPH_STAMP_FILE = 'stamp'
+
+
+class CSRGraph:
+    """Directed graph in CSR form over dense node indexes 0..n-1"""
+
+    def __init__(self, node_ids, indptr, indices):
+        self.node_ids = node_ids  # dense index -> Nodes.id (오름차순)
+        self.indptr = indptr      # 노드 i의 이웃은 indices[indptr[i]:indptr[i + 1]]
+        self.indices = indices
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.indices)
+
+    def out_degree(self):
+        return np.diff(self.indptr)
+
+    def in_degree(self):
+        return np.bincount(self.indices, minlength=self.num_nodes)
+
+    def sources(self):
+        """Source index of every edge (the row of each CSR entry)"""
+        return np.repeat(np.arange(self.num_nodes, dtype=np.int32), self.out_degree())
+
+    def transpose(self) -> 'CSRGraph':
+        """Reverse graph (backlinks) in CSR form"""
+        return from_index_edges(self.node_ids, self.indices, self.sources())
+
+
+def from_index_edges(node_ids, sources, targets) -> CSRGraph:
+    """Build a CSRGraph from edge arrays that already hold dense indexes"""
+    n = len(node_ids)
+    order = np.argsort(sources, kind='stable')
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n), out=indptr[1:])
+    return CSRGraph(node_ids, indptr, targets[order].astype(np.int32))
+
+
+def load_graph(conn: sqlite3.Connection) -> CSRGraph:
+    """Node-to-node edges (red links excluded) as a CSRGraph"""
+    cursor = conn.cursor()
+    cursor.row_factory = None  # 튜플로 받아 바로 NumPy로 펼친다
+
+    cursor.execute("SELECT id FROM Nodes ORDER BY id")
+    node_ids = np.fromiter(chain.from_iterable(cursor), dtype=np.int64)
+
+    # 행당 정수 하나로 묶어 읽으면 튜플 원소 변환이 절반 (두 컬럼 대비 약 30% 빠름)
+    cursor.execute("SELECT (source_id << 32) | target_id FROM Edges WHERE target_id IS NOT NULL")
+    packed = np.fromiter(chain.from_iterable(cursor), dtype=np.int64)
+
+    # Nodes.id -> 0..n-1 (id는 정렬되어 있으므로 이진 탐색)
+    sources = np.searchsorted(node_ids, packed >> 32).astype(np.int32)
+    targets = np.searchsorted(node_ids, packed & 0xFFFFFFFF).astype(np.int32)
+    return from_index_edges(node_ids, sources, targets)
+
+
+def graph_dir(db_path) -> Path:
+    """Directory holding the CSR export of a database (GurupiaDict.db -> GurupiaDict.csr)"""
+    return Path(db_path).with_suffix('.csr')
+
+
+def export_graph(graph: CSRGraph, path: Path, stamp: str):
+    """
+    Write forward and reverse CSR arrays as .npy files into a new version, `path/<stamp>/`
+
+    새 디렉터리에 모두 쓴 뒤 이름을 바꿔, 읽는 쪽이 반쯤 쓰인 내보내기를 보지 않게 합니다.
+    실행 중인 뷰어가 메모리 맵으로 연 이전 버전은 건드리지 않으므로(Windows에서는 열린
+    파일의 디렉터리 이름을 바꿀 수 없음) 조회 쪽이 Meta graph_stamp로 고르는 버전이
+    바뀌는 것이 곧 전환입니다. 이전 버전은 prune_graph_exports()로 정리합니다.
+    """
+    reverse = graph.transpose()
+    arrays = {
+        'node_ids': graph.node_ids,
+        'fwd_indptr': graph.indptr,
+        'fwd_indices': graph.indices,
+        'rev_indptr': reverse.indptr,
+        'rev_indices': reverse.indices,
+    }
+
+    tmp = path / f'{stamp}.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    for name in GRAPH_ARRAYS:
+        np.save(tmp / f'{name}.npy', arrays[name])
+    (tmp / GRAPH_STAMP_FILE).write_text(stamp, encoding='utf-8')
+    tmp.rename(path / stamp)
+
+
+def prune_graph_exports(path: Path, keep: str):
+    """
+    Delete export versions other than `keep` (and a pre-versioning export's top-level files)
+
+    아직 메모리 맵으로 열려 있어 지울 수 없는 버전(Windows)은 남겨 두고 다음 내보내기 때
+    다시 시도합니다.
+    """
+    if not path.is_dir():
+        return
+    for child in path.iterdir():
+        if child.name == keep:
+            continue
+        try:
+            if child.is_dir():
+                shutil.rmtree(child)
+            else:
+                child.unlink()
+        except OSError:
+            continue
+
+
+def _expand(graph: CSRGraph, frontier) -> Tuple["np.ndarray", "np.ndarray"]:
+    """(source, neighbor) for every edge leaving the frontier, gathered without a Python loop"""
+    starts = graph.indptr[frontier]
+    lengths = graph.indptr[frontier + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        empty = np.zeros(0, dtype=np.int32)
+        return empty, empty
+    # 각 범위의 시작 위치 - 앞선 범위 길이 합 = 이어 붙인 위치 j를 원래 위치로 옮기는 오프셋
+    offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    neighbors = graph.indices[offsets + np.arange(total)]
+    return np.repeat(frontier, lengths).astype(np.int32), neighbors
+
+
+class GraphStore:
+    """Memory-mapped CSR export: multi-hop traversal over dense node indexes"""
+
+    def __init__(self, path: Path):
+        arrays = {name: np.load(path / f'{name}.npy', mmap_mode='r') for name in GRAPH_ARRAYS}
+        self.stamp = (path / GRAPH_STAMP_FILE).read_text(encoding='utf-8')
+        self.node_ids = arrays['node_ids']
+        self.forward = CSRGraph(self.node_ids, arrays['fwd_indptr'], arrays['fwd_indices'])
+        self.reverse = CSRGraph(self.node_ids, arrays['rev_indptr'], arrays['rev_indices'])
+        self.in_degree = np.diff(self.reverse.indptr)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    def index_of(self, node_id: int) -> Optional[int]:
+        """Dense index of a Nodes.id (None if the node is not in the export)"""
+        index = int(np.searchsorted(self.node_ids, node_id))
+        if index < self.num_nodes and self.node_ids[index] == node_id:
+            return index
+        return None
+
+    def _direction(self, direction: str) -> CSRGraph:
+        if direction == 'out':
+            return self.forward
+        if direction == 'in':
+            return self.reverse
+        raise ValueError(f"Unknown direction '{direction}' (choose from out, in)")
+
+    def k_hop(self, start: int, k: int, direction: str = 'out', limit: int = 100) -> List[Tuple[int, int]]:
+        """
+        (index, depth) of nodes within k hops, nearest first
+
+        같은 거리 안에서는 들어오는 링크가 많은 문서부터 (limit개까지)
+        """
+        graph = self._direction(direction)
+        seen = np.zeros(self.num_nodes, dtype=bool)
+        seen[start] = True
+        frontier = np.array([start], dtype=np.int32)
+
+        result = []
+        for depth in range(1, k + 1):
+            _, neighbors = _expand(graph, frontier)
+            neighbors = np.unique(neighbors)
+            neighbors = neighbors[~seen[neighbors]]
+            if neighbors.size == 0:
+                break
+            seen[neighbors] = True
+            ranked = neighbors[np.argsort(-self.in_degree[neighbors], kind='stable')]
+            result.extend((int(index), depth) for index in ranked[:limit - len(result)])
+            if len(result) >= limit:
+                break
+            frontier = neighbors
+        return result
+
+    def shortest_path(self, source: int, target: int, max_depth: int = 6) -> Optional[List[int]]:
+        """
+        Shortest directed path source -> target as dense indexes (None if none within max_depth)
+
+        양방향 BFS: 정방향(나가는 링크)과 역방향(들어오는 링크)에서 번갈아, 이웃이
+        적게 펼쳐질 쪽의 경계를 한 단계씩 넓히다 두 탐색이 만나면 경로를 잇습니다.
+        """
+        if source == target:
+            return [source]
+
+        # parent[i] = 경계를 넓힐 때 i에 처음 도달한 노드 (-1: 미방문)
+        parent_fwd = np.full(self.num_nodes, -1, dtype=np.int32)
+        parent_rev = np.full(self.num_nodes, -1, dtype=np.int32)
+        parent_fwd[source] = source
+        parent_rev[target] = target
+        frontier_fwd = np.array([source], dtype=np.int32)
+        frontier_rev = np.array([target], dtype=np.int32)
+
+        for _ in range(max_depth):
+            cost_fwd = int((self.forward.indptr[frontier_fwd + 1] - self.forward.indptr[frontier_fwd]).sum())
+            cost_rev = int((self.reverse.indptr[frontier_rev + 1] - self.reverse.indptr[frontier_rev]).sum())
+            if cost_fwd <= cost_rev:
+                graph, parent, other, frontier = self.forward, parent_fwd, parent_rev, frontier_fwd
+            else:
+                graph, parent, other, frontier = self.reverse, parent_rev, parent_fwd, frontier_rev
+
+            sources, neighbors = _expand(graph, frontier)
+            fresh = parent[neighbors] == -1
+            neighbors, first = np.unique(neighbors[fresh], return_index=True)
+            if neighbors.size == 0:
+                return None
+            parent[neighbors] = sources[fresh][first]
+
+            met = neighbors[other[neighbors] != -1]
+            if met.size:
+                return self._join_path(int(met[0]), parent_fwd, parent_rev)
+
+            if graph is self.forward:
+                frontier_fwd = neighbors
+            else:
+                frontier_rev = neighbors
+        return None
+
+    @staticmethod
+    def _join_path(meet: int, parent_fwd, parent_rev) -> List[int]:
+        path = [meet]
+        while parent_fwd[path[-1]] != path[-1]:
+            path.append(int(parent_fwd[path[-1]]))
+        path.reverse()
+        while parent_rev[path[-1]] != path[-1]:
+            path.append(int(parent_rev[path[-1]]))
+        return path
+
+    def common_neighbors(self, a: int, b: int, direction: str = 'out') -> List[int]:
+        """Nodes both a and b link to ('out') or that link to both ('in')"""
+        graph = self._direction(direction)
+        return np.intersect1d(
+            graph.indices[graph.indptr[a]:graph.indptr[a + 1]],
+            graph.indices[graph.indptr[b]:graph.indptr[b + 1]],
+        ).tolist()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def open_graph(db_path, stamp: str) -> Optional[GraphStore]:
+    """
+    Shared GraphStore for a database, or None if its export is missing or stale
+
+    메모리 맵은 읽기 전용이라 스레드·연결 간에 하나를 공유합니다. 새 버전을 열면
+    이전 버전은 캐시에서 빠지므로, 그 맵을 쓰던 연결이 닫히면 파일을 지울 수 있습니다.
+    """
+    if np is None:
+        return None
+    base = graph_dir(db_path).resolve()
+    with _stores_lock:
+        store = _stores.get(base)
+        if store is not None and store.stamp == stamp:
+            return store
+        path = base / stamp
+        if not path.is_dir():
+            path = base  # 버전 디렉터리 이전의 내보내기 (<db>.csr/*.npy)
+        try:
+            store = GraphStore(path)
+        except (OSError, ValueError):
+            return None
+        if store.stamp != stamp:
+            return None
+        _stores[base] = store
+        return store
+
+
+def pagerank(graph: CSRGraph, damping: float = PAGERANK_DAMPING,
+             tol: float = PAGERANK_TOL, max_iter: int = PAGERANK_MAX_ITER) -> Tuple["np.ndarray", int]:
+    """
+    PageRank by power iteration: (scores summing to 1, iterations run)
+
+    나가는 링크가 없는 문서(dangling)의 점수는 모든 문서에 고르게 나눕니다.
+    """
+    n = graph.num_nodes
+    if n == 0:
+        return np.zeros(0), 0
+
+    out_degree = graph.out_degree().astype(np.float64)
+    dangling = out_degree == 0
+    inv_out = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+    sources = graph.sources()
+
+    rank = np.full(n, 1.0 / n)
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        spread = np.bincount(graph.indices, weights=(rank * inv_out)[sources], minlength=n)
+        new_rank = damping * spread + (1.0 - damping + damping * rank[dangling].sum()) / n
+        delta = np.abs(new_rank - rank).sum()
+        rank = new_rank
+        if delta < tol:
+            break
+
+    return rank, iterations
+
+
+def pagerank_prior(scores):
+    """0~1 search prior: log(1 + n * score), normalized by its maximum (n * score = 1 is average)"""
+    if len(scores) == 0:
+        return scores
+    scaled = np.log1p(scores * len(scores))
+    return scaled / scaled.max()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time PageRank over a GurupiaDict database')
+    parser.add_argument('db_path', help='GurupiaDict database')
+    parser.add_argument('--top', type=int, default=20, help='Articles to list')
+
+    args = parser.parse_args()
+
+    if np is None:
+        raise SystemExit("❌ numpy is required: pip install numpy")
+
+    conn = sqlite3.connect(f"file:{args.db_path}?mode=ro", uri=True)
+
+    start = time.perf_counter()
+    graph = load_graph(conn)
+    loaded = time.perf_counter()
+    scores, iterations = pagerank(graph)
+    done = time.perf_counter()
+
+    print(f"🕸️  {graph.num_nodes:,} nodes, {graph.num_edges:,} edges")
+    print(f"⏱️  load {loaded - start:.1f}s, PageRank {done - loaded:.1f}s ({iterations} iterations)")
+
+    top = np.argsort(scores)[::-1][:args.top]
+    in_degree = graph.in_degree()
+    for rank, index in enumerate(top, 1):
+        title = conn.execute(
+            "SELECT title FROM Nodes WHERE id = ?", (int(graph.node_ids[index]),)
+        ).fetchone()[0]
+        print(f"   {rank:3d}. {title:30s} {scores[index]:.6f}  (in {in_degree[index]:,})")
+
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
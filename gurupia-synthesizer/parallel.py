@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+GurupiaDict parallel helpers
+
+Bounded-window process-pool mapping shared by the synthesizer
+(synthesizer.py --workers) and the Python parsers (dump_reader.py,
+enhanced_parser.py, which add this directory to sys.path the same way
+tts_generator.py does for audio_manifest). Standard library only.
+"""
+
+from collections import deque
+
+
+def iter_chunks(iterable, size):
+    """Group an iterable into lists of at most `size` items"""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def ordered_imap(pool, func, iterable, window):
+    """Like Pool.imap, but with at most `window` tasks in flight.
+
+    Pool.imap drains its input eagerly, which would pull the whole dump into
+    memory; here the reader only runs ahead of the writer by `window` tasks.
+    Results are yielded in submission order.
+    """
+    pending = deque()
+    for item in iterable:
+        pending.append(pool.apply_async(func, (item,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+GurupiaDict connection pool
+
+Keeps long-lived read-only GurupiaQuery connections for server use, so
+requests skip connection setup (Meta reads, zstd dictionary loading) and
+share a warm SQLite page cache and memory map instead of starting cold.
+"""
+
+import threading
+import time
+from typing import Dict, List
+
+from query import GurupiaQuery
+
+
+class QueryPool:
+    """Bounded pool of read-only GurupiaQuery connections"""
+
+    def __init__(self, db_path: str, max_size: int = 8, timeout: float = 10.0):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        # LIFO: 최근에 쓴(캐시가 따뜻한) 연결부터 재사용
+        self._idle: List[GurupiaQuery] = []
+        # 빈 연결이 생기거나 열 수 있는 자리가 나면 대기 중인 acquire를 깨움
+        self._cond = threading.Condition()
+        self._open_count = 0
+        # reset()마다 증가 - 이전 세대의 연결은 반납 시 닫힘
+        self._generation = 0
+        self._generations: Dict[int, int] = {}
+        self.acquired = 0
+        self.waits = 0
+        self.discarded = 0
+        self.resets = 0
+
+    def acquire(self) -> GurupiaQuery:
+        """Check out a connection, opening one if the pool is below max_size"""
+        deadline = None
+        with self._cond:
+            while True:
+                if self._idle:
+                    gq = self._idle.pop()
+                    self.acquired += 1
+                    return gq
+                if self._open_count < self.max_size:
+                    self._open_count += 1
+                    generation = self._generation
+                    break
+                if deadline is None:
+                    self.waits += 1
+                    deadline = time.monotonic() + self.timeout
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"No database connection available within {self.timeout}s "
+                        f"(pool size {self.max_size})"
+                    )
+                self._cond.wait(remaining)
+
+        try:
+            gq = GurupiaQuery(self.db_path, read_only=True)
+            gq.connect()
+        except Exception:
+            with self._cond:
+                self._open_count -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._generations[id(gq)] = generation
+            self.acquired += 1
+        return gq
+
+    def release(self, gq: GurupiaQuery, discard: bool = False):
+        """Return a connection to the pool (or close it, e.g. after an unhandled error or reset)"""
+        with self._cond:
+            stale = self._generations.get(id(gq)) != self._generation
+            if discard or stale:
+                self._generations.pop(id(gq), None)
+                self._open_count -= 1
+                if discard:
+                    self.discarded += 1
+            else:
+                self._idle.append(gq)
+            self._cond.notify()
+        if discard or stale:
+            gq.close()
+
+    def reset(self):
+        """
+        Retire every connection, e.g. after the DB file was replaced (--reset rebuild)
+
+        Idle connections are closed now, checked-out ones when they are
+        released; new checkouts open the file currently at db_path.
+        """
+        with self._cond:
+            self._generation += 1
+            self.resets += 1
+        self.close()
+
+    def close(self):
+        """Close all idle connections"""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            for gq in idle:
+                del self._generations[id(gq)]
+            self._open_count -= len(idle)
+            self._cond.notify_all()
+        for gq in idle:
+            gq.close()
+
+    def stats(self) -> Dict:
+        """Open/idle/in-use connection counts and checkout counters"""
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                'max_size': self.max_size,
+                'open': self._open_count,
+                'idle': idle,
+                'in_use': self._open_count - idle,
+                'acquired': self.acquired,
+                'waits': self.waits,
+                'discarded': self.discarded,
+                'resets': self.resets,
+            }
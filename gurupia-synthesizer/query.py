@@ -10,17 +10,63 @@ Features:
 """
 
 import argparse
+import hashlib
 import sqlite3
 import sys
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+import graph
+from lru import ByteLRUCache
+from suggest import (KEY_COLUMNS, KEY_PREFIX_CHARS, SUGGEST_SCAN_LIMIT, SUGGEST_TOP_K,
+                     prefix_range, query_key)
+from wikitext import convert_to_html
+
+# 압축 저장(zstd) DB를 읽을 때만 필요한 선택 의존성
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# 지연 렌더링(html='lazy') DB용 렌더링 결과 캐시 상한
+HTML_CACHE_BYTES = 64 * 1024 * 1024
+
+# 읽기 전용 연결의 메모리 맵 크기 (0이면 mmap 비활성)
+READ_ONLY_MMAP_BYTES = 256 * 1024 * 1024
+
+# 전문 검색 인덱스 구성 (synthesizer --tokenizer, Meta 'fts_tokenizer')
+FTS_TOKENIZERS = ('unicode61', 'trigram')
+# trigram 인덱스가 처리할 수 있는 최소 검색어 길이
+TRIGRAM_MIN_CHARS = 3
+
+# 검색 순위: bm25 컬럼 가중치(title, content)와 인기도 사전 점수 가중치
+# 'popular'는 bm25 * (1 + POPULARITY_BOOST * NodeScore.prior) - 가장 많이 링크된 문서가 최대 2배
+RANKINGS = ('popular', 'bm25')
+BM25_WEIGHTS = (10.0, 1.0)
+POPULARITY_BOOST = 1.0
+# 사전 점수의 근거 (synthesizer --prior, Meta 'score_prior')
+SCORE_PRIORS = ('in_degree', 'pagerank')
+
+# IN (...) 목록 한 번에 바인딩할 값 수
+SQL_IN_CHUNK = 500
+
+
+def _chunks(values: List, size: int = SQL_IN_CHUNK):
+    """Consecutive slices of at most `size` values (for IN (...) lists)"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
 
 
 class GurupiaQuery:
     """Query interface for GurupiaDict knowledge graph"""
     
-    def __init__(self, db_path: str):
+    # 렌더링된 HTML 캐시: (db_path, node id, 본문 해시) -> html, 연결 간 공유
+    html_cache = ByteLRUCache(HTML_CACHE_BYTES)
+    
+    def __init__(self, db_path: str, read_only: bool = False):
         self.db_path = db_path
+        self.read_only = read_only
         self.conn: sqlite3.Connection = None
         self.cursor: sqlite3.Cursor = None
         
@@ -29,35 +75,209 @@ class GurupiaQuery:
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.conn:
-            self.conn.close()
+        self.close()
     
     def connect(self):
         """Connect to SQLite database"""
         if not Path(self.db_path).exists():
             raise FileNotFoundError(f"Database not found: {self.db_path}")
         
-        self.conn = sqlite3.connect(self.db_path)
+        self._open()
+    
+    def _open(self):
+        """Open the connection (no existence check; the synthesizer creates new DBs)"""
+        if self.read_only:
+            self.conn = self._open_read_only()
+        else:
+            self.conn = sqlite3.connect(self.db_path)
         self.conn.row_factory = sqlite3.Row
         self.cursor = self.conn.cursor()
+        self._legacy_edges = None
+        self._has_stats = None
+        self._has_suggest = None
+        self._has_scores = None
+        self._graph = None
+        self._load_storage()
+    
+    def _open_read_only(self) -> sqlite3.Connection:
+        """
+        Long-lived read-only connection for servers
+        
+        mode=ro URI로 쓰기를 원천 차단하고 query_only로 한 번 더 막습니다.
+        풀에서 스레드 간에 넘겨 쓰므로 check_same_thread를 끕니다
+        (한 번에 한 스레드만 사용하는 것은 풀이 보장).
+        """
+        uri = Path(self.db_path).resolve().as_uri() + '?mode=ro'
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute(f"PRAGMA mmap_size = {READ_ONLY_MMAP_BYTES}")
+        return conn
+    
+    def close(self):
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+    
+    def get_meta(self, key: str, default=None):
+        """Read a value from the Meta table (default if missing or pre-Meta DB)"""
+        self.cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Meta'"
+        )
+        if self.cursor.fetchone() is None:
+            return default
+        self.cursor.execute("SELECT value FROM Meta WHERE key = ?", (key,))
+        row = self.cursor.fetchone()
+        return row['value'] if row else default
+    
+    def _load_storage(self):
+        """
+        Prepare content decoding for this connection
+        
+        압축 저장 DB는 연결마다 zstd 디컴프레서(학습된 사전 포함)를 한 번만 만들어
+        재사용하고, FTS 뷰/트리거가 쓰는 node_text() SQL 함수를 등록합니다.
+        """
+        self.storage = self.get_meta('storage', 'text')
+        self.html_mode = self.get_meta('html', 'stored')
+        self.fts_tokenizer = self.get_meta('fts_tokenizer', 'unicode61')
+        self._decompressor = None
+        
+        if self.storage == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("This database is zstd-compressed; install it with: pip install zstandard")
+            dict_data = self.get_meta('zstd_dict')
+            if dict_data:
+                self._decompressor = zstandard.ZstdDecompressor(
+                    dict_data=zstandard.ZstdCompressionDict(dict_data)
+                )
+            else:
+                self._decompressor = zstandard.ZstdDecompressor()
+        
+        self.conn.create_function('node_text', 1, self.decode_text, deterministic=True)
+    
+    def decode_text(self, value):
+        """Decode a stored content value (zstd BLOB -> str, TEXT as-is)"""
+        if isinstance(value, bytes):
+            return self._decompressor.decompress(value).decode('utf-8')
+        return value
+    
+    def _table_columns(self, table: str) -> List[str]:
+        """Column names of a table (empty if the table does not exist)"""
+        self.cursor.execute(f"PRAGMA table_info({table})")
+        return [row['name'] for row in self.cursor.fetchall()]
+    
+    @property
+    def legacy_edges(self) -> bool:
+        """v0.2.0 이하 DB: Edges가 target_title 문자열로 대상을 저장"""
+        if self._legacy_edges is None:
+            self._legacy_edges = 'target_title' in self._table_columns('Edges')
+        return self._legacy_edges
+    
+    @property
+    def has_stats(self) -> bool:
+        """Stats / NodeDegree 집계 테이블이 있는 DB (synthesizer가 증분 갱신)"""
+        if self._has_stats is None:
+            self._has_stats = bool(self._table_columns('Stats')) and not self.legacy_edges
+        return self._has_stats
+    
+    @property
+    def has_scores(self) -> bool:
+        """검색 순위용 NodeScore(인기도 사전 점수)가 있는 DB"""
+        if self._has_scores is None:
+            self._has_scores = bool(self._table_columns('NodeScore'))
+        return self._has_scores
+    
+    @property
+    def has_pagerank(self) -> bool:
+        """NodeScore.pagerank가 계산된 DB (synthesizer --prior pagerank)"""
+        return self.has_scores and self.get_meta('score_prior') == 'pagerank'
+    
+    def _rank_order(self, table: str, ranking: str) -> Tuple[str, str]:
+        """(JOIN clause, ORDER BY expression) for a ranking mode over an FTS table"""
+        if ranking not in RANKINGS:
+            raise ValueError(f"Unknown ranking '{ranking}' (choose from {', '.join(RANKINGS)})")
+        bm25 = f"bm25({table}, {BM25_WEIGHTS[0]}, {BM25_WEIGHTS[1]})"
+        if ranking == 'popular' and self.has_scores:
+            # bm25는 음수(작을수록 관련도 높음)라 곱하면 인기 문서가 앞으로 온다
+            return ("LEFT JOIN NodeScore s ON s.node_id = n.id",
+                    f"{bm25} * (1 + {POPULARITY_BOOST} * COALESCE(s.prior, 0))")
+        return "", bm25
+    
+    @property
+    def has_suggest(self) -> bool:
+        """자동완성 테이블(TitleKeys / SuggestTop)이 구축된 DB"""
+        if self._has_suggest is None:
+            self._has_suggest = 'kind' in self._table_columns('SuggestTop') and self.has_stats
+            if self._has_suggest:
+                self.cursor.execute("SELECT EXISTS (SELECT 1 FROM SuggestTop)")
+                self._has_suggest = bool(self.cursor.fetchone()[0])
+        return self._has_suggest
+    
+    def suggest_titles(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """
+        Title autocomplete ranked by inbound links
+        
+        입력은 query_key로 제목 키 / 자모 키(한글, 조합 중인 음절 포함) / 초성 키
+        ("ㅋㅍㅌ") 중 하나로 바꿔 찾습니다. 짧은 접두사는 미리 계산된 SuggestTop 한 번
+        조회, 그보다 긴 접두사는 TitleKeys 인덱스 범위 검색 후 in-degree 순 정렬.
+        자동완성 테이블이 없는 DB는 search_titles로 폴백합니다.
+        """
+        kind, key = query_key(prefix)
+        if not key:
+            return []
+        if not self.has_suggest:
+            return self.search_titles(prefix, limit)
+        
+        limit = min(limit, SUGGEST_TOP_K)
+        if len(key) <= KEY_PREFIX_CHARS[kind]:
+            self.cursor.execute("""
+                SELECT n.id, n.title
+                FROM SuggestTop s JOIN Nodes n ON n.id = s.node_id
+                WHERE s.kind = ? AND s.prefix = ?
+                ORDER BY s.rank
+                LIMIT ?
+            """, (kind, key, limit))
+        else:
+            # 후보는 SUGGEST_SCAN_LIMIT개까지만 순위를 매긴다 (아주 흔한 접두사의 지연 상한)
+            column = KEY_COLUMNS[kind]
+            low, high = prefix_range(key)
+            self.cursor.execute(f"""
+                SELECT n.id, n.title
+                FROM (
+                    SELECT node_id, title_key FROM TitleKeys
+                    WHERE {column} >= ? AND {column} < ?
+                    ORDER BY {column}
+                    LIMIT ?
+                ) k
+                JOIN NodeDegree d ON d.node_id = k.node_id
+                JOIN Nodes n ON n.id = k.node_id
+                ORDER BY d.in_degree DESC, length(k.title_key), k.title_key
+                LIMIT ?
+            """, (low, high, SUGGEST_SCAN_LIMIT, limit))
+        
+        return [dict(row) for row in self.cursor.fetchall()]
     
-    def search_titles(self, query: str, limit: int = 10) -> List[Dict]:
+    def search_titles(self, query: str, limit: int = 10, ranking: str = 'popular') -> List[Dict]:
         """
         Prefix search on titles using FTS5 (Zero Trust Input 적용)
         
+        ranking='popular'(기본)은 bm25에 인기도 사전 점수를 곱해 정렬하고,
+        'bm25'는 컬럼 가중 bm25만 사용합니다.
+        
         Example:
             search_titles("컴퓨") -> ["컴퓨터", "컴퓨터 과학", ...]
         """
         # FTS5 인젝션 방어: 겹따옴표 포장 및 텍스트 내부 따옴표 이스케이프
         safe_query = query.replace('"', '""')
         match_expr = f'"{safe_query}"*'
+        join, order = self._rank_order('NodesFTS', ranking)
         
-        self.cursor.execute("""
+        self.cursor.execute(f"""
             SELECT n.id, n.title
             FROM NodesFTS
             JOIN Nodes n ON NodesFTS.rowid = n.id
+            {join}
             WHERE NodesFTS.title MATCH ?
-            ORDER BY rank
+            ORDER BY {order}
             LIMIT ?
         """, (match_expr, limit))
         
@@ -72,17 +292,51 @@ class GurupiaQuery:
         """, (title,))
         
         row = self.cursor.fetchone()
-        return dict(row) if row else None
+        if not row:
+            return None
+        return self._decode_article(row)
+    
+    def _decode_article(self, row: sqlite3.Row) -> Dict:
+        """Nodes row -> article dict with decoded text (rendering lazy HTML if needed)"""
+        article = dict(row)
+        article['raw_content'] = self.decode_text(article['raw_content'])
+        if article['html_content'] is None:
+            article['html_content'] = self.render_html(article['id'], article['raw_content'])
+        else:
+            article['html_content'] = self.decode_text(article['html_content'])
+        return article
+    
+    def render_html(self, node_id: int, raw_content: str) -> str:
+        """Render HTML on read for html='lazy' DBs, through the shared LRU cache"""
+        # 본문 해시를 키에 넣어 --incremental 등으로 바뀐 본문에 이전 HTML을 쓰지 않음
+        digest = hashlib.blake2b(raw_content.encode('utf-8'), digest_size=16).digest()
+        key = (self.db_path, node_id, digest)
+        html = self.html_cache.get(key)
+        if html is None:
+            html = convert_to_html(raw_content)
+            self.html_cache.put(key, html)
+        return html
     
     def get_outgoing_links(self, title: str) -> List[str]:
         """Get articles that THIS article references"""
-        self.cursor.execute("""
-            SELECT DISTINCT e.target_title
-            FROM Nodes n
-            JOIN Edges e ON n.id = e.source_id
-            WHERE n.title = ?
-            ORDER BY e.target_title
-        """, (title,))
+        if self.legacy_edges:
+            self.cursor.execute("""
+                SELECT DISTINCT e.target_title
+                FROM Nodes n
+                JOIN Edges e ON n.id = e.source_id
+                WHERE n.title = ?
+                ORDER BY e.target_title
+            """, (title,))
+        else:
+            self.cursor.execute("""
+                SELECT DISTINCT COALESCE(t.title, r.title) AS target_title
+                FROM Nodes n
+                JOIN Edges e ON n.id = e.source_id
+                LEFT JOIN Nodes t ON t.id = e.target_id
+                LEFT JOIN RedLinks r ON r.id = e.redlink_id
+                WHERE n.title = ?
+                ORDER BY target_title
+            """, (title,))
         
         return [row['target_title'] for row in self.cursor.fetchall()]
     
@@ -92,19 +346,251 @@ class GurupiaQuery:
         
         This is the core "expert option" feature!
         """
-        self.cursor.execute("""
-            SELECT DISTINCT n.title
-            FROM Edges e
-            JOIN Nodes n ON e.source_id = n.id
-            WHERE e.target_title = ?
-            ORDER BY n.title
-            LIMIT ?
-        """, (title, limit))
+        if self.legacy_edges:
+            self.cursor.execute("""
+                SELECT DISTINCT n.title
+                FROM Edges e
+                JOIN Nodes n ON e.source_id = n.id
+                WHERE e.target_title = ?
+                ORDER BY n.title
+                LIMIT ?
+            """, (title, limit))
+        else:
+            # 정수 조인: 제목 -> id 한 번 조회 후 idx_edges_target 사용
+            # (없는 문서 제목이면 RedLinks id로 역링크 조회)
+            self.cursor.execute("""
+                SELECT DISTINCT n.title
+                FROM Edges e
+                JOIN Nodes n ON e.source_id = n.id
+                WHERE e.target_id = (SELECT id FROM Nodes WHERE title = ?)
+                   OR e.redlink_id = (SELECT id FROM RedLinks WHERE title = ?)
+                ORDER BY n.title
+                LIMIT ?
+            """, (title, title, limit))
         
         return [row['title'] for row in self.cursor.fetchall()]
     
+    def get_articles(self, titles: List[str], backlink_limit: int = 50) -> Dict[str, Dict]:
+        """
+        Several articles with their link lists at once
+        
+        Returns {title: {'article', 'outgoing_links', 'backlinks'}} in request
+        order; titles that do not exist are left out. Outgoing links are
+        {'title', 'exists'} (exists=False: red link), backlinks are titles.
+        Same content as get_article + get_outgoing_links + get_backlinks per
+        title, but each step is one set-based query over all requested ids.
+        """
+        titles = list(dict.fromkeys(titles))
+        if self.legacy_edges:
+            bundles = {}
+            for title in titles:
+                article = self.get_article(title)
+                if article:
+                    targets = self.get_outgoing_links(title)
+                    existing = self._existing_titles(targets)
+                    bundles[title] = {
+                        'article': article,
+                        'outgoing_links': [{'title': t, 'exists': t in existing} for t in targets],
+                        'backlinks': self.get_backlinks(title, backlink_limit),
+                    }
+            return bundles
+        
+        articles = {}
+        for chunk in _chunks(titles):
+            self.cursor.execute(f"""
+                SELECT id, title, raw_content, html_content, created_at
+                FROM Nodes
+                WHERE title IN ({','.join('?' * len(chunk))})
+            """, chunk)
+            for row in self.cursor.fetchall():
+                articles[row['title']] = self._decode_article(row)
+        
+        ids = [article['id'] for article in articles.values()]
+        outgoing = self._outgoing_by_id(ids)
+        backlinks = self._backlinks_by_id(ids, backlink_limit)
+        return {
+            title: {
+                'article': articles[title],
+                'outgoing_links': outgoing[articles[title]['id']],
+                'backlinks': backlinks[articles[title]['id']],
+            }
+            for title in titles if title in articles
+        }
+    
+    def get_article_with_links(self, title: str, backlink_limit: int = 50) -> Optional[Dict]:
+        """
+        One article with its links ({'article', 'outgoing_links', 'backlinks'}, see get_articles)
+        
+        The node is looked up once and its id reused for both link lists.
+        """
+        if self.legacy_edges:
+            return self.get_articles([title], backlink_limit).get(title)
+        
+        article = self.get_article(title)
+        if not article:
+            return None
+        ids = [article['id']]
+        return {
+            'article': article,
+            'outgoing_links': self._outgoing_by_id(ids)[article['id']],
+            'backlinks': self._backlinks_by_id(ids, backlink_limit)[article['id']],
+        }
+    
+    def _outgoing_by_id(self, ids: List[int]) -> Dict[int, List[Dict]]:
+        """Node id -> [{'title', 'exists'}] of its link targets, by title"""
+        outgoing = {node_id: [] for node_id in ids}
+        for chunk in _chunks(ids):
+            # 대상이 있는 문서인지는 target_id로 이미 알 수 있음 (red link는 redlink_id)
+            self.cursor.execute(f"""
+                SELECT DISTINCT e.source_id, COALESCE(t.title, r.title) AS target_title,
+                       e.target_id IS NOT NULL AS target_exists
+                FROM Edges e
+                LEFT JOIN Nodes t ON t.id = e.target_id
+                LEFT JOIN RedLinks r ON r.id = e.redlink_id
+                WHERE e.source_id IN ({','.join('?' * len(chunk))})
+                ORDER BY e.source_id, target_title
+            """, chunk)
+            for row in self.cursor.fetchall():
+                outgoing[row['source_id']].append(
+                    {'title': row['target_title'], 'exists': bool(row['target_exists'])}
+                )
+        return outgoing
+    
+    def _backlinks_by_id(self, ids: List[int], limit: int) -> Dict[int, List[str]]:
+        """Node id -> first `limit` titles (by title) of articles linking to it"""
+        backlinks = {node_id: [] for node_id in ids}
+        if len(ids) == 1:
+            # 문서 하나면 윈도 함수 없이 LIMIT (단건 조회 경로)
+            self.cursor.execute("""
+                SELECT DISTINCT n.title
+                FROM Edges e
+                JOIN Nodes n ON e.source_id = n.id
+                WHERE e.target_id = ?
+                ORDER BY n.title
+                LIMIT ?
+            """, (ids[0], limit))
+            backlinks[ids[0]] = [row['title'] for row in self.cursor.fetchall()]
+            return backlinks
+        
+        for chunk in _chunks(ids):
+            # 문서별 상위 limit개 (제목순) - 윈도 함수로 한 번에
+            self.cursor.execute(f"""
+                SELECT target_id, title FROM (
+                    SELECT target_id, title,
+                           ROW_NUMBER() OVER (PARTITION BY target_id ORDER BY title) AS rank
+                    FROM (
+                        SELECT DISTINCT e.target_id, n.title
+                        FROM Edges e
+                        JOIN Nodes n ON e.source_id = n.id
+                        WHERE e.target_id IN ({','.join('?' * len(chunk))})
+                    )
+                )
+                WHERE rank <= ?
+                ORDER BY target_id, rank
+            """, (*chunk, limit))
+            for row in self.cursor.fetchall():
+                backlinks[row['target_id']].append(row['title'])
+        return backlinks
+    
+    def _existing_titles(self, titles: List[str]) -> set:
+        """The subset of titles that are articles"""
+        existing = set()
+        for chunk in _chunks(list(titles)):
+            self.cursor.execute(
+                f"SELECT title FROM Nodes WHERE title IN ({','.join('?' * len(chunk))})", chunk
+            )
+            existing.update(row['title'] for row in self.cursor.fetchall())
+        return existing
+    
+    @property
+    def graph_store(self) -> Optional[graph.GraphStore]:
+        """
+        Memory-mapped CSR export of this DB (synthesizer --export-graph)
+        
+        내보내기가 없거나 Meta graph_stamp와 맞지 않으면(DB만 다시 구축됨) None.
+        """
+        if self._graph is None:
+            stamp = self.get_meta('graph_stamp')
+            if stamp:
+                self._graph = graph.open_graph(self.db_path, stamp)
+        return self._graph
+    
+    def _require_graph(self) -> graph.GraphStore:
+        if self.graph_store is None:
+            raise RuntimeError("No graph export for this database; rebuild it with --export-graph")
+        return self.graph_store
+    
+    def get_node_id(self, title: str) -> Optional[int]:
+        """Nodes.id of an article title (None if it does not exist)"""
+        self.cursor.execute("SELECT id FROM Nodes WHERE title = ?", (title,))
+        row = self.cursor.fetchone()
+        return row['id'] if row else None
+    
+    def _graph_index(self, store: graph.GraphStore, title: str) -> Optional[int]:
+        node_id = self.get_node_id(title)
+        return None if node_id is None else store.index_of(node_id)
+    
+    def _titles_for_indexes(self, store: graph.GraphStore, indexes: List[int]) -> Dict[int, str]:
+        """Dense graph index -> title"""
+        ids = [int(store.node_ids[index]) for index in indexes]
+        titles = {}
+        for chunk in _chunks(ids):
+            self.cursor.execute(
+                f"SELECT id, title FROM Nodes WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            )
+            titles.update((row['id'], row['title']) for row in self.cursor.fetchall())
+        return {index: titles.get(node_id) for index, node_id in zip(indexes, ids)}
+    
+    def get_k_hop(self, title: str, k: int = 2, direction: str = 'out', limit: int = 100) -> List[Dict]:
+        """
+        Articles within k links of an article ({'title', 'depth'}, nearest first)
+        
+        direction='out'은 이 문서에서 링크를 따라가고, 'in'은 역링크를 따라갑니다.
+        """
+        store = self._require_graph()
+        start = self._graph_index(store, title)
+        if start is None:
+            return []
+        hops = store.k_hop(start, k, direction, limit)
+        titles = self._titles_for_indexes(store, [index for index, _ in hops])
+        return [{'title': titles[index], 'depth': depth} for index, depth in hops]
+    
+    def find_path(self, from_title: str, to_title: str, max_depth: int = 6) -> Optional[List[str]]:
+        """
+        Shortest link path between two articles, as titles from -> to
+        
+        None if either title does not exist or no path within max_depth links.
+        """
+        store = self._require_graph()
+        source = self._graph_index(store, from_title)
+        target = self._graph_index(store, to_title)
+        if source is None or target is None:
+            return None
+        path = store.shortest_path(source, target, max_depth)
+        if path is None:
+            return None
+        titles = self._titles_for_indexes(store, path)
+        return [titles[index] for index in path]
+    
+    def get_common_neighbors(self, title_a: str, title_b: str, direction: str = 'out',
+                             limit: int = 100) -> List[str]:
+        """Articles both link to ('out') or that link to both ('in'), most referenced first"""
+        store = self._require_graph()
+        a = self._graph_index(store, title_a)
+        b = self._graph_index(store, title_b)
+        if a is None or b is None:
+            return []
+        common = store.common_neighbors(a, b, direction)
+        common.sort(key=lambda index: -store.in_degree[index])
+        common = common[:limit]
+        titles = self._titles_for_indexes(store, common)
+        return [titles[index] for index in common]
+    
     def get_statistics(self) -> Dict:
-        """Get database statistics"""
+        """Get database statistics (materialized Stats / NodeDegree when available)"""
+        if self.has_stats:
+            return self._read_statistics()
+        
         stats = {}
         
         # Total nodes
@@ -116,48 +602,180 @@ class GurupiaQuery:
         stats['total_edges'] = self.cursor.fetchone()['count']
         
         # Most referenced articles (top 10)
+        if self.legacy_edges:
+            self.cursor.execute("""
+                SELECT target_title, COUNT(*) as ref_count
+                FROM Edges
+                GROUP BY target_title
+                ORDER BY ref_count DESC
+                LIMIT 10
+            """)
+        else:
+            self.cursor.execute("""
+                SELECT COALESCE(t.title, r.title) AS target_title, e.ref_count
+                FROM (
+                    SELECT target_id, redlink_id, COUNT(*) AS ref_count
+                    FROM Edges
+                    GROUP BY target_id, redlink_id
+                    ORDER BY ref_count DESC
+                    LIMIT 10
+                ) e
+                LEFT JOIN Nodes t ON t.id = e.target_id
+                LEFT JOIN RedLinks r ON r.id = e.redlink_id
+                ORDER BY e.ref_count DESC
+            """)
+        stats['most_referenced'] = [dict(row) for row in self.cursor.fetchall()]
+        
+        # Articles with most outgoing links
+        self.cursor.execute("""
+            SELECT n.title, e.link_count
+            FROM (
+                SELECT source_id, COUNT(*) AS link_count
+                FROM Edges
+                GROUP BY source_id
+                ORDER BY link_count DESC
+                LIMIT 10
+            ) e
+            JOIN Nodes n ON n.id = e.source_id
+            ORDER BY e.link_count DESC
+        """)
+        stats['most_links'] = [dict(row) for row in self.cursor.fetchall()]
+        
+        return stats
+    
+    def _read_statistics(self) -> Dict:
+        """Statistics from the materialized tables: index lookups only, no Edges scan"""
+        self.cursor.execute("SELECT key, value FROM Stats")
+        totals = {row['key']: row['value'] for row in self.cursor.fetchall()}
+        stats = {
+            'total_nodes': totals.get('total_nodes', 0),
+            'total_edges': totals.get('total_edges', 0),
+        }
+        
+        # 문서 상위 10개와 red link 상위 10개를 합쳐 다시 상위 10개
         self.cursor.execute("""
-            SELECT target_title, COUNT(*) as ref_count
-            FROM Edges
-            GROUP BY target_title
+            SELECT target_title, ref_count FROM (
+                SELECT n.title AS target_title, d.in_degree AS ref_count
+                FROM NodeDegree d JOIN Nodes n ON n.id = d.node_id
+                WHERE d.in_degree > 0
+                ORDER BY d.in_degree DESC
+                LIMIT 10
+            )
+            UNION ALL
+            SELECT target_title, ref_count FROM (
+                SELECT title AS target_title, ref_count
+                FROM RedLinks
+                WHERE ref_count > 0
+                ORDER BY ref_count DESC
+                LIMIT 10
+            )
             ORDER BY ref_count DESC
             LIMIT 10
         """)
         stats['most_referenced'] = [dict(row) for row in self.cursor.fetchall()]
         
-        # Articles with most outgoing links
         self.cursor.execute("""
-            SELECT n.title, COUNT(*) as link_count
-            FROM Nodes n
-            JOIN Edges e ON n.id = e.source_id
-            GROUP BY n.id
-            ORDER BY link_count DESC
+            SELECT n.title, d.out_degree AS link_count
+            FROM NodeDegree d JOIN Nodes n ON n.id = d.node_id
+            WHERE d.out_degree > 0
+            ORDER BY d.out_degree DESC
             LIMIT 10
         """)
         stats['most_links'] = [dict(row) for row in self.cursor.fetchall()]
         
+        if self.has_pagerank:
+            self.cursor.execute("""
+                SELECT n.title, s.pagerank
+                FROM NodeScore s JOIN Nodes n ON n.id = s.node_id
+                WHERE s.pagerank IS NOT NULL
+                ORDER BY s.pagerank DESC
+                LIMIT 10
+            """)
+            stats['most_central'] = [dict(row) for row in self.cursor.fetchall()]
+        
         return stats
     
-    def full_text_search(self, query: str, limit: int = 10) -> List[Dict]:
-        """Search both title and content (Zero Trust Input 적용)"""
+    def full_text_search(self, query: str, limit: int = 10, ranking: str = 'popular') -> List[Dict]:
+        """
+        Search both title and content (Zero Trust Input 적용)
+        
+        trigram 인덱스가 있는 DB는 3글자 이상 검색어를 부분 문자열 구문으로 찾고
+        ("컴퓨터" -> "양자컴퓨터의"), 그 밖에는 unicode61 어절 접두사 검색입니다.
+        정렬은 search_titles와 같은 ranking 모드를 따릅니다 (제목 일치 가중).
+        """
         # FTS5 인젝션 방어
         safe_query = query.replace('"', '""')
-        match_expr = f'"{safe_query}"*'
+        if self.fts_tokenizer == 'trigram' and len(query.strip()) >= TRIGRAM_MIN_CHARS:
+            table, match_expr = 'NodesTrigram', f'"{safe_query}"'
+        else:
+            table, match_expr = 'NodesFTS', f'"{safe_query}"*'
+        join, order = self._rank_order(table, ranking)
         
-        self.cursor.execute("""
+        self.cursor.execute(f"""
             SELECT 
                 n.id, 
                 n.title,
-                snippet(NodesFTS, 1, '<mark>', '</mark>', '...', 50) as snippet
-            FROM NodesFTS
-            JOIN Nodes n ON NodesFTS.rowid = n.id
-            WHERE NodesFTS MATCH ?
-            ORDER BY rank
+                snippet({table}, 1, '<mark>', '</mark>', '...', 50) as snippet
+            FROM {table}
+            JOIN Nodes n ON {table}.rowid = n.id
+            {join}
+            WHERE {table} MATCH ?
+            ORDER BY {order}
             LIMIT ?
         """, (match_expr, limit))
         
         return [dict(row) for row in self.cursor.fetchall()]
     
+    def get_popular_articles(self, limit: int = 100) -> List[Dict]:
+        """Most referenced articles with content (title, raw_content, ref_count)
+        
+        PageRank이 계산된 DB는 PageRank 순 (ref_count는 그대로 in-degree)
+        """
+        if self.has_pagerank:
+            self.cursor.execute("""
+                SELECT n.title, n.raw_content, COALESCE(d.in_degree, 0) AS ref_count
+                FROM NodeScore s
+                JOIN Nodes n ON n.id = s.node_id
+                LEFT JOIN NodeDegree d ON d.node_id = s.node_id
+                WHERE s.pagerank IS NOT NULL
+                ORDER BY s.pagerank DESC
+                LIMIT ?
+            """, (limit,))
+        elif self.has_stats:
+            self.cursor.execute("""
+                SELECT n.title, n.raw_content, d.in_degree AS ref_count
+                FROM NodeDegree d JOIN Nodes n ON n.id = d.node_id
+                ORDER BY d.in_degree DESC
+                LIMIT ?
+            """, (limit,))
+        elif self.legacy_edges:
+            self.cursor.execute("""
+                SELECT n.title, n.raw_content, COUNT(e.id) as ref_count
+                FROM Nodes n
+                LEFT JOIN Edges e ON e.target_title = n.title
+                GROUP BY n.id
+                ORDER BY ref_count DESC
+                LIMIT ?
+            """, (limit,))
+        else:
+            self.cursor.execute("""
+                SELECT n.title, n.raw_content, COALESCE(e.ref_count, 0) AS ref_count
+                FROM Nodes n
+                LEFT JOIN (
+                    SELECT target_id, COUNT(*) AS ref_count
+                    FROM Edges
+                    WHERE target_id IS NOT NULL
+                    GROUP BY target_id
+                ) e ON e.target_id = n.id
+                ORDER BY ref_count DESC
+                LIMIT ?
+            """, (limit,))
+        
+        articles = [dict(row) for row in self.cursor.fetchall()]
+        for article in articles:
+            article['raw_content'] = self.decode_text(article['raw_content'])
+        return articles
+    
     def get_random_title(self) -> Optional[str]:
         """랜덤 문서 제목 반환 (#2 app.py 일관성 지원)"""
         self.cursor.execute("""
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+GurupiaDict title autocomplete helpers
+
+Shared by the synthesizer (which builds the TitleKeys / SuggestTop tables)
+and the query side (which reads them). Titles are matched on a normalized
+key; short prefixes are answered from precomputed top-K lists, longer ones
+by an index range scan over the keys.
+
+Korean input gets two more keys: the title decomposed into jamo, so the
+half-composed syllables an IME shows mid-typing ("컴픁" on the way to
+"컴퓨터") are still prefixes, and the initial consonants alone ("ㅋㅍㅌ").
+"""
+
+import unicodedata
+
+# SuggestTop에 미리 계산해 두는 접두사 길이(글자 수)와 접두사당 후보 수
+SUGGEST_PREFIX_CHARS = 3
+SUGGEST_TOP_K = 20
+
+# 긴 접두사 범위 검색에서 순위를 매길 최대 후보 수 (키 순서 앞쪽부터) - 지연 상한
+SUGGEST_SCAN_LIMIT = 2000
+
+# 키 종류 (SuggestTop.kind) - TitleKeys 컬럼과 미리 계산할 접두사 길이
+KEY_TITLE = 0
+KEY_JAMO = 1
+KEY_CHOSEONG = 2
+KEY_COLUMNS = {KEY_TITLE: 'title_key', KEY_JAMO: 'jamo_key', KEY_CHOSEONG: 'choseong_key'}
+KEY_PREFIX_CHARS = {
+    KEY_TITLE: SUGGEST_PREFIX_CHARS,
+    KEY_JAMO: 9,  # 한 음절이 자모 2~5개 - 세 음절 안팎까지
+    KEY_CHOSEONG: SUGGEST_PREFIX_CHARS,
+}
+
+# 한글 음절 분해 (U+AC00..U+D7A3 = 초성 19 x 중성 21 x 종성 28)
+_SYLLABLE_BASE = 0xAC00
+_SYLLABLE_COUNT = 19 * 21 * 28
+_CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+_JUNGSEONG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+_JONGSEONG = ['', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ',
+              'ㄿ', 'ㅀ', 'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+
+# 겹자모는 입력 순서대로 풀어 둔다 ("닭"은 "달" + ㄱ을 거쳐 입력되고, "과"는 "고"를 거친다)
+_COMPOUND_JAMO = {
+    'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ',
+    'ㄽ': 'ㄹㅅ', 'ㄾ': 'ㄹㅌ', 'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ',
+    'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ', 'ㅟ': 'ㅜㅣ', 'ㅢ': 'ㅡㅣ',
+}
+
+
+def _build_tables():
+    jamo = {ord(c): split for c, split in _COMPOUND_JAMO.items()}
+    choseong = {}
+    for index in range(_SYLLABLE_COUNT):
+        initial, rest = divmod(index, 21 * 28)
+        medial, final = divmod(rest, 28)
+        parts = _CHOSEONG[initial] + _JUNGSEONG[medial] + _JONGSEONG[final]
+        jamo[_SYLLABLE_BASE + index] = ''.join(_COMPOUND_JAMO.get(c, c) for c in parts)
+        choseong[_SYLLABLE_BASE + index] = _CHOSEONG[initial]
+    return jamo, choseong
+
+
+_JAMO_TABLE, _CHOSEONG_TABLE = _build_tables()
+
+# UTF-8 바이트 순서에서 모든 문자보다 뒤에 오는 코드 포인트 (범위 검색 상한)
+_MAX_CHAR = '\U0010ffff'
+
+
+def title_key(text: str) -> str:
+    """Normalized match key: NFC, case-folded"""
+    return unicodedata.normalize('NFC', text).casefold()
+
+
+def jamo_key(text: str) -> str:
+    """title_key with Hangul syllables decomposed into basic compatibility jamo"""
+    return title_key(text).translate(_JAMO_TABLE)
+
+
+def choseong_key(text: str) -> str:
+    """title_key with each Hangul syllable reduced to its initial consonant, whitespace removed"""
+    return ''.join(title_key(text).translate(_CHOSEONG_TABLE).split())
+
+
+def _is_hangul(char: str) -> bool:
+    return 'ㄱ' <= char <= 'ㅣ' or _SYLLABLE_BASE <= ord(char) < _SYLLABLE_BASE + _SYLLABLE_COUNT
+
+
+def query_key(text: str):
+    """
+    (kind, key) to look up for what the user has typed so far
+
+    Only initial consonants ("ㅋㅍㅌ") -> choseong key; any other Hangul ->
+    jamo key, so a half-composed last syllable still matches; else title key.
+    """
+    text = text.lstrip()
+    compact = ''.join(text.split())
+    if compact and all('ㄱ' <= c <= 'ㅎ' for c in compact):
+        return KEY_CHOSEONG, choseong_key(text)
+    if any(_is_hangul(c) for c in text):
+        return KEY_JAMO, jamo_key(text)
+    return KEY_TITLE, title_key(text)
+
+
+def prefix_range(key: str):
+    """(low, high) bounds so that low <= k < high selects keys starting with `key`"""
+    return key, key + _MAX_CHAR
@@ -13,25 +13,112 @@ Features:
 """
 
 import argparse
+import hashlib
 import json
-import re
+import math
+import os
 import sqlite3
 import sys
+import time
+import uuid
+from multiprocessing import Pool
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
-from query import GurupiaQuery
+import graph
+from parallel import iter_chunks, ordered_imap
+from query import FTS_TOKENIZERS, SCORE_PRIORS, GurupiaQuery, zstandard
+from suggest import (KEY_COLUMNS, KEY_PREFIX_CHARS, SUGGEST_TOP_K, choseong_key,
+                     jamo_key, prefix_range, title_key)
+from wikitext import WikiLink, convert_to_html, extract_wiki_links
 
+# --bulk: rows per executemany/commit and page cache size (KiB)
+BULK_BATCH_SIZE = 5000
+BULK_CACHE_KIB = 262144
 
-class WikiLink:
-    """Represents a wiki link extracted from text"""
-    
-    def __init__(self, target: str, display: str = None):
-        self.target = target.strip()
-        self.display = display.strip() if display else self.target
+
+# --workers: JSONL lines per task sent to a worker process
+PREPARE_CHUNK_SIZE = 500
+
+# --compress: zstd level, trained dictionary size and training sample
+ZSTD_LEVEL = 9
+ZSTD_DICT_SIZE = 128 * 1024
+ZSTD_SAMPLE_ARTICLES = 2000
+
+# Per-process settings, set by init_worker:
+# zstd compressor (None = store plain TEXT) and whether to store rendered HTML
+_compressor = None
+_render_html = True
+
+
+def init_worker(dict_data: bytes = None, compress: bool = False, render_html: bool = True):
+    """Pool initializer: build the zstd compressor once per process"""
+    global _compressor, _render_html
+    _render_html = render_html
+    if not compress:
+        _compressor = None
+    elif dict_data:
+        _compressor = zstandard.ZstdCompressor(
+            level=ZSTD_LEVEL, dict_data=zstandard.ZstdCompressionDict(dict_data)
+        )
+    else:
+        _compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+
+
+def prepare_chunk(chunk):
+    """
+    Worker task: decode and render a chunk of (line_num, end_offset, line) items
     
-    def __repr__(self):
-        return f"WikiLink({self.target!r}, {self.display!r})"
+    Returns [(line_num, end_offset, (title, raw_content, html_content, targets, content_hash), error)]
+    in input order; article is None when the line is skipped.
+    """
+    rows = []
+    for line_num, end_offset, line in chunk:
+        line = line.strip()
+        if not line:
+            continue
+        
+        try:
+            # 바이트 줄 그대로 디코딩 (UTF-8 오류도 해당 줄만 건너뜀)
+            data = json.loads(line)
+        except ValueError as e:
+            rows.append((line_num, end_offset, None, str(e)))
+            continue
+        
+        title = data['title']
+        raw_content = data['content']
+        
+        # Convert to HTML (html='lazy' DB는 읽을 때 렌더링)
+        html_content = convert_to_html(raw_content) if _render_html else None
+        
+        # Extract links for edge creation
+        targets = [link.target for link in extract_wiki_links(raw_content)]
+        
+        # --incremental 비교용 본문 해시 (압축 전 원문 기준)
+        raw_bytes = raw_content.encode('utf-8')
+        digest = content_hash(raw_bytes)
+        
+        if _compressor is not None:
+            raw_content = _compressor.compress(raw_bytes)
+            if html_content is not None:
+                html_content = _compressor.compress(html_content.encode('utf-8'))
+        
+        rows.append((line_num, end_offset, (title, raw_content, html_content, targets, digest), None))
+    return rows
+
+
+def iter_lines(f, line_num: int = 1):
+    """Yield (line_num, end_offset, line) from a binary file, starting at its current position"""
+    offset = f.tell()
+    for line in f:
+        offset += len(line)
+        yield line_num, offset, line
+        line_num += 1
+
+
+def content_hash(raw_bytes: bytes) -> str:
+    """Digest of an article's raw content, stored in Nodes.content_hash"""
+    return hashlib.blake2b(raw_bytes, digest_size=16).hexdigest()
 
 
 class GurupiaSynthesizer(GurupiaQuery):
@@ -43,218 +130,1228 @@ class GurupiaSynthesizer(GurupiaQuery):
     
     def connect(self):
         """Connect to SQLite database with WAL mode for write performance (#6)"""
-        super().connect()
+        # 새 DB 생성을 허용해야 하므로 GurupiaQuery의 존재 검사를 건너뜁니다
+        self._open()
         # WAL 모드: 읽기/쓰기 동시성 향상 + 쓰기 성능 개선
         self.cursor.execute("PRAGMA journal_mode=WAL")
         self.cursor.execute("PRAGMA synchronous=NORMAL")
         
-    def create_schema(self):
-        """Create database schema with FTS5 search support"""
+    def create_schema(self, compress: bool = False, lazy_html: bool = False,
+                      tokenizer: Optional[str] = None, prior: Optional[str] = None,
+                      export_graph: bool = False):
+        """Create database schema with FTS5 search support
+        
+        compress=True이면 새 DB의 본문을 zstd BLOB으로 저장하고, lazy_html=True이면
+        html_content를 저장하지 않고 조회 시 렌더링합니다. 저장 형식은 DB 생성
+        시점에 Meta 테이블에 고정되며, 기존 DB와 다른 형식을 요청하면 ValueError.
+        tokenizer('unicode61' / 'trigram')는 전문 검색 인덱스 구성이며, 기존 DB와
+        다르면 FTS 인덱스만 다시 만듭니다 (None이면 기존 구성 유지). prior
+        ('in_degree' / 'pagerank')는 검색 순위 사전 점수의 근거이며 역시 Meta에 기록됩니다.
+        export_graph=True이면 이후 임포트마다 CSR 인접 배열을 <db>.csr/로 내보냅니다.
+        """
         print("📐 Creating database schema...")
         
+        # 마이그레이션(RENAME 등 DDL)까지 한 트랜잭션으로 묶어, 형식 불일치 등으로
+        # 중간에 실패하면 DB를 원래 상태로 되돌립니다
+        self.cursor.execute("BEGIN")
+        try:
+            self._build_schema(compress, lazy_html, tokenizer, prior, export_graph)
+        except Exception:
+            self.conn.rollback()
+            raise
+        
+        self.conn.commit()
+        print("✅ Schema created successfully")
+    
+    def _build_schema(self, compress: bool, lazy_html: bool, tokenizer: Optional[str],
+                      prior: Optional[str], export_graph: bool):
+        """Create or migrate all tables, indexes and triggers (inside create_schema's transaction)"""
+        # Build metadata (storage format, zstd dictionary, ...)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS Meta (
+                key TEXT PRIMARY KEY,
+                value
+            )
+        """)
+        
         # Main nodes table
         self.cursor.execute("""
             CREATE TABLE IF NOT EXISTS Nodes (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 title TEXT UNIQUE NOT NULL,
                 raw_content TEXT NOT NULL,
-                html_content TEXT NOT NULL,
+                html_content TEXT,
+                content_hash TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
         
+        # v0.2.0 이하 DB: 해시가 없는 행은 다음 --incremental 때 변경된 것으로 취급
+        if 'content_hash' not in self._table_columns('Nodes'):
+            self.cursor.execute("ALTER TABLE Nodes ADD COLUMN content_hash TEXT")
+        
+        # v0.2.0 이하 DB: target_title 문자열 엣지를 스테이징으로 옮긴 뒤 재해석
+        legacy_edges = 'target_title' in self._table_columns('Edges')
+        if legacy_edges:
+            self.cursor.execute("ALTER TABLE Edges RENAME TO EdgesLegacy")
+            for index in ('idx_edges_source', 'idx_edges_target'):
+                self.cursor.execute(f"DROP INDEX IF EXISTS {index}")
+        # 트랜잭션 없이 중단된 이전 마이그레이션이 남긴 EdgesLegacy도 이어서 처리
+        legacy_edges = legacy_edges or bool(self._table_columns('EdgesLegacy'))
+        
         # Edges table for knowledge graph (bidirectional)
+        # 대상은 정수 id로 저장: target_id -> Nodes.id, 없는 문서(red link)는 redlink_id -> RedLinks.id
         self.cursor.execute("""
             CREATE TABLE IF NOT EXISTS Edges (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 source_id INTEGER NOT NULL,
-                target_title TEXT NOT NULL,
+                target_id INTEGER,
+                redlink_id INTEGER,
                 edge_type TEXT DEFAULT 'reference',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (source_id) REFERENCES Nodes(id) ON DELETE CASCADE
+                FOREIGN KEY (source_id) REFERENCES Nodes(id) ON DELETE CASCADE,
+                FOREIGN KEY (target_id) REFERENCES Nodes(id),
+                FOREIGN KEY (redlink_id) REFERENCES RedLinks(id)
+            )
+        """)
+        
+        # Dangling / red-link targets (titles with no node)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS RedLinks (
+                id INTEGER PRIMARY KEY,
+                title TEXT UNIQUE NOT NULL
             )
         """)
         
+        # Import staging: links by title until resolve_edges() runs
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS EdgeStaging (
+                source_id INTEGER NOT NULL,
+                target_title TEXT NOT NULL
+            )
+        """)
+        
+        if legacy_edges:
+            self.cursor.execute("""
+                INSERT INTO EdgeStaging (source_id, target_title)
+                SELECT source_id, target_title FROM EdgesLegacy ORDER BY id
+            """)
+            self.cursor.execute("DROP TABLE EdgesLegacy")
+        self._legacy_edges = None
+        
+        self._init_storage(compress, lazy_html)
+        
         # FTS5 virtual table for full-text search
+        self._create_fts(tokenizer)
+        
+        # Triggers to keep FTS in sync
+        self._create_triggers()
+        
+        # Materialized statistics (get_statistics / popular articles)
+        self._create_stats()
+        
+        # Search ranking prior (filled by build_scores after each import)
+        self._create_scores(prior)
+        if export_graph:
+            self.set_meta('graph_export', 'csr')
+        if self.get_meta('graph_export') and graph.np is None:
+            raise RuntimeError("--export-graph requires the 'numpy' package: pip install numpy")
+        
+        # Title autocomplete (filled by build_suggest after each import)
+        self._create_suggest()
+        
+        # Indexes for performance
+        self._create_indexes()
+    
+    def _init_storage(self, compress: bool, lazy_html: bool):
+        """Record the storage format for a new DB, or check it for an existing one"""
+        self.cursor.execute("SELECT EXISTS (SELECT 1 FROM Nodes)")
+        has_nodes = self.cursor.fetchone()[0]
+        
+        for key, requested, default in (('storage', 'zstd' if compress else 'text', 'text'),
+                                        ('html', 'lazy' if lazy_html else 'stored', 'stored')):
+            stored = self.get_meta(key)
+            if stored is None:
+                # Meta 이전에 만들어진 DB는 기본 형식(평문, HTML 저장)
+                stored = default if has_nodes else requested
+                self.set_meta(key, stored)
+            
+            if stored != requested and requested != default:
+                raise ValueError(f"Database already uses {key}='{stored}'; rebuild with --reset to change it")
+        
+        if self.get_meta('storage') == 'zstd' and zstandard is None:
+            raise RuntimeError("--compress requires the 'zstandard' package: pip install zstandard")
+        
+        self._load_storage()
+    
+    def set_meta(self, key: str, value):
+        """Insert or replace a Meta value"""
+        self.cursor.execute(
+            "INSERT OR REPLACE INTO Meta (key, value) VALUES (?, ?)", (key, value)
+        )
+    
+    def _content_expr(self, column: str) -> str:
+        """SQL expression yielding plain text for a content column"""
+        return f"node_text({column})" if self.storage == 'zstd' else column
+    
+    def _worker_args(self, jsonl_path: str) -> Tuple:
+        """
+        Return init_worker() arguments, training the zstd dictionary if needed
+        
+        JSONL 앞부분 문서(본문 + 렌더링된 HTML)를 표본으로 사전을 학습합니다.
+        표본이 너무 적어 학습에 실패하면 사전 없이 압축합니다.
+        """
+        render_html = self.html_mode != 'lazy'
+        if self.storage != 'zstd':
+            return (None, False, render_html)
+        
+        dict_data = self.get_meta('zstd_dict')
+        if dict_data is None:
+            samples = []
+            sampled = 0
+            with open(jsonl_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if sampled >= ZSTD_SAMPLE_ARTICLES:
+                        break
+                    try:
+                        content = json.loads(line)['content']
+                    except (json.JSONDecodeError, KeyError):
+                        continue
+                    sampled += 1
+                    samples.append(content.encode('utf-8'))
+                    if render_html:
+                        samples.append(convert_to_html(content).encode('utf-8'))
+            
+            print(f"🗜️  Training zstd dictionary on {sampled} articles...")
+            try:
+                dict_data = zstandard.train_dictionary(ZSTD_DICT_SIZE, samples).as_bytes()
+                self.set_meta('zstd_dict', dict_data)
+                print(f"✅ Dictionary trained ({len(dict_data) // 1024} KiB)")
+            except zstandard.ZstdError as e:
+                dict_data = b''
+                self.set_meta('zstd_dict', dict_data)
+                print(f"⚠️  Dictionary training failed ({e}); compressing without a dictionary")
+            self.conn.commit()
+            self._load_storage()
+        
+        return (dict_data, True, render_html)
+    
+    def _create_fts(self, tokenizer: Optional[str] = None):
+        """Create the FTS5 indexes over the NodesFTSContent view.
+        
+        External content 테이블은 FTS 컬럼명(title, content)과 같은 컬럼을 가져야
+        'rebuild'와 snippet()이 동작하므로, raw_content를 content로 노출하는 뷰를 둡니다.
+        
+        NodesFTS(unicode61)는 항상 만들고, tokenizer='trigram'이면 NodesTrigram을
+        추가합니다. unicode61은 어절 하나("컴퓨터의")가 토큰이라 접두사로만 찾을 수
+        있고, trigram은 어절 안의 부분 문자열도 찾지만 3글자 미만 검색어는 처리하지
+        못하므로(한국어 명사는 두 음절이 흔함) 짧은 검색어는 NodesFTS가 맡습니다.
+        """
+        self.cursor.execute(f"""
+            CREATE VIEW IF NOT EXISTS NodesFTSContent AS
+            SELECT id, title, {self._content_expr('raw_content')} AS content FROM Nodes
+        """)
+        
+        # v0.2.0 이하 DB: content='Nodes'로 생성된 인덱스는 뷰 기반으로 재생성
+        self.cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'NodesFTS'"
+        )
+        row = self.cursor.fetchone()
+        if row and 'NodesFTSContent' not in row['sql']:
+            self.cursor.execute("DROP TABLE NodesFTS")
+            rebuild = ['NodesFTS']
+        else:
+            rebuild = []
+        
+        stored = self.get_meta('fts_tokenizer', 'unicode61')
+        if tokenizer is not None and tokenizer != stored:
+            if tokenizer not in FTS_TOKENIZERS:
+                raise ValueError(f"Unknown tokenizer '{tokenizer}' (choose from {', '.join(FTS_TOKENIZERS)})")
+            print(f"🔤 Switching full-text index: {stored} -> {tokenizer}")
+            self.cursor.execute("DROP TABLE IF EXISTS NodesTrigram")
+            # 트리거가 갱신할 FTS 테이블 목록이 바뀌므로 _create_triggers가 다시 만들게 한다
+            for trigger in ('nodes_ai', 'nodes_ad', 'nodes_au'):
+                self.cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            if tokenizer == 'trigram':
+                rebuild.append('NodesTrigram')
+            self.set_meta('fts_tokenizer', tokenizer)
+            self.fts_tokenizer = tokenizer
+        
         self.cursor.execute("""
             CREATE VIRTUAL TABLE IF NOT EXISTS NodesFTS USING fts5(
                 title, 
                 content,
-                content='Nodes',
+                content='NodesFTSContent',
                 content_rowid='id',
                 tokenize='unicode61'
             )
         """)
         
-        # Triggers to keep FTS in sync
-        self.cursor.execute("""
+        if self.fts_tokenizer == 'trigram':
+            try:
+                self.cursor.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS NodesTrigram USING fts5(
+                        title,
+                        content,
+                        content='NodesFTSContent',
+                        content_rowid='id',
+                        tokenize='trigram'
+                    )
+                """)
+            except sqlite3.OperationalError as e:
+                raise RuntimeError(f"--tokenizer trigram requires SQLite 3.34+ "
+                                   f"(found {sqlite3.sqlite_version}): {e}") from None
+        
+        for table in rebuild:
+            self.cursor.execute(f"INSERT INTO {table}({table}) VALUES('rebuild')")
+    
+    def _fts_tables(self) -> List[str]:
+        """FTS5 tables that mirror Nodes (kept in sync by triggers / bulk rebuild)"""
+        return ['NodesFTS', 'NodesTrigram'] if self.fts_tokenizer == 'trigram' else ['NodesFTS']
+    
+    def _create_triggers(self):
+        """Create the triggers that keep the FTS tables in sync with Nodes
+        
+        External content FTS5는 인덱스에서 지울 때 옛 값이 필요합니다. AFTER 트리거
+        시점에는 Nodes(뷰)에 새 값만 남아 있으므로 DELETE/UPDATE 대신 'delete'
+        명령에 old 값을 직접 넘깁니다.
+        """
+        # v0.2.0 이하 DB: DELETE/UPDATE 문을 쓰던 트리거 교체
+        self.cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'nodes_ad'"
+        )
+        row = self.cursor.fetchone()
+        if row and "'delete'" not in row['sql']:
+            self.cursor.execute("DROP TRIGGER nodes_ad")
+            self.cursor.execute("DROP TRIGGER IF EXISTS nodes_au")
+        
+        new_content = self._content_expr('new.raw_content')
+        old_content = self._content_expr('old.raw_content')
+        insert_new = '\n                '.join(
+            f"INSERT INTO {table}(rowid, title, content) VALUES (new.id, new.title, {new_content});"
+            for table in self._fts_tables()
+        )
+        delete_old = '\n                '.join(
+            f"INSERT INTO {table}({table}, rowid, title, content) "
+            f"VALUES ('delete', old.id, old.title, {old_content});"
+            for table in self._fts_tables()
+        )
+        
+        self.cursor.execute(f"""
             CREATE TRIGGER IF NOT EXISTS nodes_ai AFTER INSERT ON Nodes BEGIN
-                INSERT INTO NodesFTS(rowid, title, content)
-                VALUES (new.id, new.title, new.raw_content);
+                {insert_new}
             END
         """)
         
-        self.cursor.execute("""
+        self.cursor.execute(f"""
             CREATE TRIGGER IF NOT EXISTS nodes_ad AFTER DELETE ON Nodes BEGIN
-                DELETE FROM NodesFTS WHERE rowid = old.id;
+                {delete_old}
             END
         """)
         
-        self.cursor.execute("""
-            CREATE TRIGGER IF NOT EXISTS nodes_au AFTER UPDATE ON Nodes BEGIN
-                UPDATE NodesFTS SET title = new.title, content = new.raw_content
-                WHERE rowid = new.id;
+        self.cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS nodes_au AFTER UPDATE OF title, raw_content ON Nodes BEGIN
+                {delete_old}
+                {insert_new}
             END
         """)
+    
+    def _create_stats(self):
+        """
+        Create the Stats / NodeDegree tables
         
-        # Indexes for performance
+        get_statistics()가 Edges 전체를 집계하지 않도록 전체 개수(Stats)와 문서별
+        차수(NodeDegree, red link는 RedLinks.ref_count)를 저장해 두고,
+        resolve_edges()가 새로 추가된 노드·엣지만큼 증분 갱신합니다.
+        Stats가 비어 있으면(새 DB 또는 이전 버전 DB) 한 번 전체 집계합니다.
+        """
         self.cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_nodes_title ON Nodes(title)
+            CREATE TABLE IF NOT EXISTS Stats (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
         """)
         
         self.cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_edges_source ON Edges(source_id)
+            CREATE TABLE IF NOT EXISTS NodeDegree (
+                node_id INTEGER PRIMARY KEY,
+                in_degree INTEGER NOT NULL DEFAULT 0,
+                out_degree INTEGER NOT NULL DEFAULT 0,
+                FOREIGN KEY (node_id) REFERENCES Nodes(id) ON DELETE CASCADE
+            )
         """)
         
+        if 'ref_count' not in self._table_columns('RedLinks'):
+            self.cursor.execute("ALTER TABLE RedLinks ADD COLUMN ref_count INTEGER NOT NULL DEFAULT 0")
+        
+        self.cursor.execute("SELECT EXISTS (SELECT 1 FROM Stats)")
+        if not self.cursor.fetchone()[0]:
+            self.rebuild_stats()
+        self._has_stats = None
+    
+    def rebuild_stats(self):
+        """Recompute Stats, NodeDegree and RedLinks.ref_count from scratch"""
+        self.cursor.execute("DELETE FROM NodeDegree")
         self.cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_edges_target ON Edges(target_title)
+            INSERT INTO NodeDegree (node_id, in_degree, out_degree)
+            SELECT n.id, COALESCE(i.c, 0), COALESCE(o.c, 0)
+            FROM Nodes n
+            LEFT JOIN (
+                SELECT target_id, COUNT(*) AS c FROM Edges
+                WHERE target_id IS NOT NULL GROUP BY target_id
+            ) i ON i.target_id = n.id
+            LEFT JOIN (
+                SELECT source_id, COUNT(*) AS c FROM Edges GROUP BY source_id
+            ) o ON o.source_id = n.id
+        """)
+        self.cursor.execute("""
+            UPDATE RedLinks SET ref_count = COALESCE(
+                (SELECT c FROM (
+                    SELECT redlink_id, COUNT(*) AS c FROM Edges
+                    WHERE redlink_id IS NOT NULL GROUP BY redlink_id
+                ) e WHERE e.redlink_id = RedLinks.id), 0)
         """)
         
+        self.cursor.execute("DELETE FROM Stats")
+        for key, table in (('total_nodes', 'Nodes'), ('total_edges', 'Edges'), ('total_redlinks', 'RedLinks')):
+            self.cursor.execute(f"INSERT INTO Stats (key, value) SELECT ?, COUNT(*) FROM {table}", (key,))
+    
+    def _create_suggest(self):
+        """Create the autocomplete tables: normalized title keys and top-K per short prefix"""
+        # 파생 데이터라 옛 형식(한글 키 없음)은 지우고 build_suggest로 다시 채운다
+        columns = self._table_columns('TitleKeys')
+        if columns and 'choseong_key' not in columns:
+            self.cursor.execute("DROP TABLE TitleKeys")
+            self.cursor.execute("DROP TABLE IF EXISTS SuggestTop")
+        
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS TitleKeys (
+                node_id INTEGER PRIMARY KEY,
+                title_key TEXT NOT NULL,
+                jamo_key TEXT NOT NULL,
+                choseong_key TEXT NOT NULL
+            )
+        """)
+        
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS SuggestTop (
+                kind INTEGER NOT NULL,
+                prefix TEXT NOT NULL,
+                rank INTEGER NOT NULL,
+                node_id INTEGER NOT NULL,
+                PRIMARY KEY (kind, prefix, rank)
+            ) WITHOUT ROWID
+        """)
+        self._has_suggest = None
+    
+    def build_suggest(self, incremental: bool = False):
+        """
+        Rebuild the title autocomplete index
+        
+        TitleKeys에 제목마다 정규화 키·자모 분해 키·초성 키를 다시 채우고, 키 종류별로
+        짧은 접두사(KEY_PREFIX_CHARS 글자 이하)마다 in-degree 상위 SUGGEST_TOP_K개를
+        SuggestTop에 미리 계산합니다. 짧은 접두사는 후보가 수만 개라 조회 시 정렬하면
+        느리기 때문입니다.
+        
+        incremental=True(--incremental 동기화)이면 sync_jsonl이 남긴 in-degree
+        스냅숏(DegreeBefore)과 비교해 바뀐 부분만 갱신합니다 (_update_suggest).
+        """
+        for func in (title_key, jamo_key, choseong_key):
+            self.conn.create_function(func.__name__, 1, func, deterministic=True)
+        
+        self.cursor.execute("SELECT EXISTS (SELECT 1 FROM TitleKeys)")
+        if incremental and self.cursor.fetchone()[0]:
+            self._update_suggest()
+        else:
+            self._rebuild_suggest()
+        self.cursor.execute("DELETE FROM Meta WHERE key = 'suggest_stale'")
         self.conn.commit()
-        print("✅ Schema created successfully")
+        self._has_suggest = None
     
-    def extract_wiki_links(self, text: str) -> List[WikiLink]:
+    def _rebuild_suggest(self):
+        print("🔤 Building title autocomplete index...")
+        for column in KEY_COLUMNS.values():
+            self.cursor.execute(f"DROP INDEX IF EXISTS idx_titlekeys_{column}")
+        self.cursor.execute("DELETE FROM TitleKeys")
+        self.cursor.execute("""
+            INSERT INTO TitleKeys (node_id, title_key, jamo_key, choseong_key)
+            SELECT id, title_key(title), jamo_key(title), choseong_key(title) FROM Nodes
+        """)
+        for column in KEY_COLUMNS.values():
+            self.cursor.execute(f"CREATE INDEX idx_titlekeys_{column} ON TitleKeys({column})")
+        
+        prefixes = " UNION ALL ".join(
+            f"SELECT {kind} AS kind, substr({column}, 1, {n}) AS prefix, node_id, title_key"
+            f" FROM TitleKeys WHERE length({column}) >= {n}"
+            for kind, column in KEY_COLUMNS.items()
+            for n in range(1, KEY_PREFIX_CHARS[kind] + 1)
+        )
+        self.cursor.execute("DELETE FROM SuggestTop")
+        self.cursor.execute(f"""
+            INSERT INTO SuggestTop (kind, prefix, rank, node_id)
+            SELECT kind, prefix, rnk, node_id FROM (
+                SELECT p.kind, p.prefix, p.node_id,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY p.kind, p.prefix
+                           ORDER BY d.in_degree DESC, length(p.title_key), p.title_key
+                       ) AS rnk
+                FROM ({prefixes}) p
+                JOIN NodeDegree d ON d.node_id = p.node_id
+            )
+            WHERE rnk <= ?
+        """, (SUGGEST_TOP_K,))
+    
+    def _update_suggest(self):
         """
-        Extract [[WikiLink]] and [[Target|Display]] patterns from text
+        Update the autocomplete index after an --incremental sync
         
-        Examples:
-            [[컴퓨터]] -> WikiLink("컴퓨터")
-            [[CPU|중앙처리장치]] -> WikiLink("CPU", "중앙처리장치")
+        추가·삭제된 제목과 in-degree가 바뀐(순위가 움직일 수 있는) 노드만 골라, 그 키에서
+        나오는 접두사의 SuggestTop 목록만 다시 계산합니다. 본문만 바뀐 문서는 제목이
+        같아 키가 그대로입니다. 결과는 전체 재구축과 같습니다.
         """
-        # Pattern: [[target]] or [[target|display]]
-        pattern = r'\[\[([^\]|]+)(?:\|([^\]]+))?\]\]'
+        self.conn.create_function('prefix_end', 1, lambda key: prefix_range(key)[1], deterministic=True)
+        for table in ('DirtyNodes', 'DirtyPrefixes'):
+            self.cursor.execute(f"DROP TABLE IF EXISTS temp.{table}")
+        self.cursor.execute("CREATE TEMP TABLE DirtyNodes (node_id INTEGER PRIMARY KEY)")
+        self.cursor.execute("""
+            CREATE TEMP TABLE DirtyPrefixes (
+                kind INTEGER NOT NULL,
+                prefix TEXT NOT NULL,
+                PRIMARY KEY (kind, prefix)
+            ) WITHOUT ROWID
+        """)
         
-        links = []
-        for match in re.finditer(pattern, text):
-            target = match.group(1)
-            display = match.group(2)
-            
-            # Skip File/Image links (should be already cleaned by Rust parser)
-            if target.startswith(('File:', 'Image:', '파일:', '그림:')):
-                continue
-            
-            # Normalize target (capitalize first letter)
-            target = target.strip()
-            if target:
-                target = target[0].upper() + target[1:]
-                links.append(WikiLink(target, display))
+        self.cursor.execute("""
+            INSERT INTO DirtyNodes (node_id)
+            SELECT d.node_id FROM NodeDegree d
+            LEFT JOIN DegreeBefore b ON b.node_id = d.node_id
+            WHERE b.in_degree IS NOT d.in_degree
+        """)
+        self.cursor.execute("""
+            INSERT OR IGNORE INTO DirtyNodes (node_id)
+            SELECT node_id FROM TitleKeys WHERE node_id NOT IN (SELECT id FROM Nodes)
+        """)
+        self.cursor.execute("""
+            INSERT OR IGNORE INTO DirtyNodes (node_id)
+            SELECT id FROM Nodes WHERE id NOT IN (SELECT node_id FROM TitleKeys)
+        """)
+        self.cursor.execute("SELECT COUNT(*) FROM DirtyNodes")
+        dirty_nodes = self.cursor.fetchone()[0]
+        
+        prefixes = " UNION ALL ".join(
+            f"SELECT {kind}, substr(t.{column}, 1, {n}) FROM TitleKeys t"
+            f" JOIN DirtyNodes x ON x.node_id = t.node_id WHERE length(t.{column}) >= {n}"
+            for kind, column in KEY_COLUMNS.items()
+            for n in range(1, KEY_PREFIX_CHARS[kind] + 1)
+        )
+        # 삭제될 제목의 키는 지우기 전에, 새 제목의 키는 넣은 뒤에 접두사를 모은다
+        self.cursor.execute(f"INSERT OR IGNORE INTO DirtyPrefixes (kind, prefix) {prefixes}")
+        self.cursor.execute("DELETE FROM TitleKeys WHERE node_id NOT IN (SELECT id FROM Nodes)")
+        self.cursor.execute("""
+            INSERT INTO TitleKeys (node_id, title_key, jamo_key, choseong_key)
+            SELECT id, title_key(title), jamo_key(title), choseong_key(title) FROM Nodes
+            WHERE id NOT IN (SELECT node_id FROM TitleKeys)
+        """)
+        self.cursor.execute(f"INSERT OR IGNORE INTO DirtyPrefixes (kind, prefix) {prefixes}")
+        self.cursor.execute("SELECT COUNT(*) FROM DirtyPrefixes")
+        dirty_prefixes = self.cursor.fetchone()[0]
+        print(f"🔤 Updating title autocomplete index ({dirty_nodes:,} nodes, {dirty_prefixes:,} prefixes)...")
+        
+        self.cursor.execute("""
+            DELETE FROM SuggestTop
+            WHERE (kind, prefix) IN (SELECT kind, prefix FROM DirtyPrefixes)
+        """)
+        for kind, column in KEY_COLUMNS.items():
+            # 접두사마다 키 인덱스 범위 검색으로 후보를 모아 전체 재구축과 같은 순서로 순위
+            self.cursor.execute(f"""
+                INSERT INTO SuggestTop (kind, prefix, rank, node_id)
+                SELECT kind, prefix, rnk, node_id FROM (
+                    SELECT p.kind, p.prefix, t.node_id,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY p.kind, p.prefix
+                               ORDER BY d.in_degree DESC, length(t.title_key), t.title_key
+                           ) AS rnk
+                    FROM DirtyPrefixes p
+                    JOIN TitleKeys t ON t.{column} >= p.prefix AND t.{column} < prefix_end(p.prefix)
+                    JOIN NodeDegree d ON d.node_id = t.node_id
+                    WHERE p.kind = ?
+                )
+                WHERE rnk <= ?
+            """, (kind, SUGGEST_TOP_K))
         
-        return links
+        for table in ('DirtyNodes', 'DirtyPrefixes', 'DegreeBefore'):
+            self.cursor.execute(f"DROP TABLE IF EXISTS temp.{table}")
     
-    def convert_to_html(self, text: str, title: str) -> str:
+    def _create_scores(self, prior: Optional[str] = None):
+        """Create NodeScore: per-node search ranking prior (and PageRank when enabled)"""
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS NodeScore (
+                node_id INTEGER PRIMARY KEY,
+                prior REAL NOT NULL DEFAULT 0,
+                pagerank REAL
+            )
+        """)
+        if 'pagerank' not in self._table_columns('NodeScore'):
+            self.cursor.execute("ALTER TABLE NodeScore ADD COLUMN pagerank REAL")
+        self._has_scores = None
+        
+        if prior is not None and prior != self.get_meta('score_prior', 'in_degree'):
+            if prior not in SCORE_PRIORS:
+                raise ValueError(f"Unknown prior '{prior}' (choose from {', '.join(SCORE_PRIORS)})")
+            self.set_meta('score_prior', prior)
+        if self.get_meta('score_prior') == 'pagerank' and graph.np is None:
+            raise RuntimeError("--prior pagerank requires the 'numpy' package: pip install numpy")
+    
+    def build_scores(self, link_graph: Optional[graph.CSRGraph] = None):
+        """
+        Recompute the popularity prior used by search ranking
+        
+        prior = log(1 + in_degree) / log(1 + 최대 in_degree), 0~1. 검색 시에는
+        NodeScore를 기본 키로 조인만 하므로 쿼리당 추가 집계가 없습니다.
+        Meta score_prior가 'pagerank'이면 graph.py로 PageRank를 계산해 함께 저장하고
+        사전 점수도 PageRank에서 만듭니다.
+        """
+        if self.get_meta('score_prior') == 'pagerank':
+            self._build_pagerank_scores(link_graph or graph.load_graph(self.conn))
+            return
+        
+        print("⭐ Computing search ranking prior...")
+        self.cursor.execute("SELECT MAX(in_degree) FROM NodeDegree")
+        max_in_degree = self.cursor.fetchone()[0] or 0
+        scale = 1 / math.log1p(max_in_degree) if max_in_degree else 0.0
+        
+        self.conn.create_function('log1p', 1, math.log1p, deterministic=True)
+        self.cursor.execute("DELETE FROM NodeScore")
+        self.cursor.execute("""
+            INSERT INTO NodeScore (node_id, prior)
+            SELECT node_id, log1p(in_degree) * ? FROM NodeDegree
+        """, (scale,))
+        self.conn.commit()
+        self._has_scores = None
+    
+    def _build_pagerank_scores(self, link_graph: graph.CSRGraph):
+        """PageRank over the node-to-node graph (NumPy CSR) -> NodeScore.pagerank / prior"""
+        print("🕸️  Computing PageRank...")
+        start = time.perf_counter()
+        scores, iterations = graph.pagerank(link_graph)
+        prior = graph.pagerank_prior(scores)
+        computed = time.perf_counter()
+        
+        self.cursor.execute("DELETE FROM NodeScore")
+        self.cursor.executemany(
+            "INSERT INTO NodeScore (node_id, prior, pagerank) VALUES (?, ?, ?)",
+            zip(link_graph.node_ids.tolist(), prior.tolist(), scores.tolist())
+        )
+        self.conn.commit()
+        self._has_scores = None
+        print(f"   PageRank {computed - start:.1f}s ({iterations} iterations), "
+              f"write {time.perf_counter() - computed:.1f}s")
+    
+    def export_graph(self, link_graph: Optional[graph.CSRGraph] = None):
+        """
+        Write forward/reverse CSR adjacency arrays to <db>.csr/<stamp>/ for GraphStore
+        
+        내보내기와 Meta graph_stamp에 같은 값을 기록해, DB가 다시 구축되었는데
+        내보내기가 갱신되지 않은 경우 조회 쪽이 오래된 배열을 쓰지 않게 합니다.
+        """
+        link_graph = link_graph or graph.load_graph(self.conn)
+        path = graph.graph_dir(self.db_path)
+        print(f"🕸️  Exporting CSR graph to {path}...")
+        start = time.perf_counter()
+        stamp = uuid.uuid4().hex
+        graph.export_graph(link_graph, path, stamp)
+        self.set_meta('graph_stamp', stamp)
+        self.conn.commit()
+        # 새 버전으로 전환된 뒤에 이전 버전 정리 (뷰어가 열고 있으면 다음 기회에)
+        graph.prune_graph_exports(path, stamp)
+        print(f"   {link_graph.num_nodes:,} nodes, {link_graph.num_edges:,} edges "
+              f"({time.perf_counter() - start:.1f}s)")
+    
+    def _finish_import(self, incremental: bool = False):
+        """Derived data after an import: ranking prior / PageRank, CSR export, autocomplete, build id"""
+        link_graph = None
+        export = bool(self.get_meta('graph_export'))
+        if export or self.get_meta('score_prior') == 'pagerank':
+            # PageRank과 내보내기가 같은 배열을 쓰므로 Edges는 한 번만 읽는다
+            print("🕸️  Loading link graph...")
+            start = time.perf_counter()
+            link_graph = graph.load_graph(self.conn)
+            print(f"   {link_graph.num_nodes:,} nodes, {link_graph.num_edges:,} edges "
+                  f"({time.perf_counter() - start:.1f}s)")
+        
+        self.build_scores(link_graph)
+        if export:
+            self.export_graph(link_graph)
+        self.build_suggest(incremental)
+        
+        # 임포트마다 새 빌드 id - 뷰어 응답 캐시·ETag가 이 값으로 무효화됨
+        self.set_meta('build_id', uuid.uuid4().hex)
+        self.conn.commit()
+    
+    def _add_stat(self, key: str, delta: int):
+        if delta:
+            self.cursor.execute("UPDATE Stats SET value = value + ? WHERE key = ?", (delta, key))
+    
+    def _create_indexes(self):
+        """Create secondary indexes (dropped during bulk loads)"""
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_nodes_title ON Nodes(title)
+        """)
+        
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_edges_source ON Edges(source_id)
+        """)
+        
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_edges_target ON Edges(target_id)
+        """)
+        
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_edges_redlink ON Edges(redlink_id)
+            WHERE redlink_id IS NOT NULL
+        """)
+        
+        # 통계 상위 N개 조회용
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_degree_in ON NodeDegree(in_degree)
+        """)
+        
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_degree_out ON NodeDegree(out_degree)
+        """)
+        
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_redlinks_refs ON RedLinks(ref_count)
+        """)
+        
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_score_pagerank ON NodeScore(pagerank)
+            WHERE pagerank IS NOT NULL
+        """)
+    
+    def resolve_edges(self):
         """
-        Convert wiki markup to HTML with dict:// protocol links
+        Resolve staged link titles to integer node ids
         
-        - [[Link]] -> <a href="dict://Link">Link</a>
-        - [[Target|Display]] -> <a href="dict://Target">Display</a>
-        - '''Bold''' -> <strong>Bold</strong>
-        - ''Italic'' -> <em>Italic</em>
+        1. 이번 임포트로 생긴 문서를 가리키던 red link를 target_id로 승격
+        2. 스테이징의 제목을 Nodes.id로 해석, 없는 제목은 RedLinks에 등록
+        3. 새 노드·엣지만큼 Stats / NodeDegree 증분 갱신
+        4. 스테이징 비우기
         """
-        html = text
+        self.cursor.execute("SELECT COUNT(*) FROM EdgeStaging")
+        staged = self.cursor.fetchone()[0]
+        print(f"🔗 Resolving {staged} link targets to node ids...")
         
-        # Convert [[Target|Display]] first (before simple [[Target]])
-        def replace_piped_link(match):
-            target = match.group(1).strip()
-            display = match.group(2).strip()
-            target = target[0].upper() + target[1:] if target else target
-            return f'<a href="dict://{target}" class="dict-link">{display}</a>'
+        # 새 노드의 차수 행 (노드 id는 단조 증가)
+        self.cursor.execute("""
+            INSERT INTO NodeDegree (node_id)
+            SELECT id FROM Nodes
+            WHERE id > (SELECT COALESCE(MAX(node_id), 0) FROM NodeDegree)
+        """)
+        self._add_stat('total_nodes', self.cursor.rowcount)
         
-        html = re.sub(r'\[\[([^\]|]+)\|([^\]]+)\]\]', replace_piped_link, html)
+        # 1. red link -> 실제 문서 승격 (누적 참조 수도 문서로 이전)
+        self.cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS PromotedLinks AS
+            SELECT r.id AS redlink_id, n.id AS node_id, r.ref_count
+            FROM RedLinks r JOIN Nodes n ON n.title = r.title
+        """)
+        self.cursor.execute("""
+            UPDATE Edges
+            SET target_id = (SELECT node_id FROM PromotedLinks p WHERE p.redlink_id = Edges.redlink_id),
+                redlink_id = NULL
+            WHERE redlink_id IN (SELECT redlink_id FROM PromotedLinks)
+        """)
+        self.cursor.execute("""
+            UPDATE NodeDegree
+            SET in_degree = in_degree + (SELECT ref_count FROM PromotedLinks p WHERE p.node_id = NodeDegree.node_id)
+            WHERE node_id IN (SELECT node_id FROM PromotedLinks)
+        """)
+        self.cursor.execute("DELETE FROM RedLinks WHERE id IN (SELECT redlink_id FROM PromotedLinks)")
+        self._add_stat('total_redlinks', -self.cursor.rowcount)
+        self.cursor.execute("DROP TABLE PromotedLinks")
         
-        # Convert [[Target]]
-        def replace_simple_link(match):
-            target = match.group(1).strip()
-            target = target[0].upper() + target[1:] if target else target
-            return f'<a href="dict://{target}" class="dict-link">{target}</a>'
+        # 2. 스테이징 해석
+        self.cursor.execute("SELECT COALESCE(MAX(id), 0) FROM Edges")
+        last_edge_id = self.cursor.fetchone()[0]
         
-        html = re.sub(r'\[\[([^\]]+)\]\]', replace_simple_link, html)
+        self.cursor.execute("""
+            INSERT OR IGNORE INTO RedLinks (title)
+            SELECT DISTINCT s.target_title
+            FROM EdgeStaging s
+            WHERE NOT EXISTS (SELECT 1 FROM Nodes n WHERE n.title = s.target_title)
+        """)
+        self._add_stat('total_redlinks', self.cursor.rowcount)
+        self.cursor.execute("""
+            INSERT INTO Edges (source_id, target_id, redlink_id)
+            SELECT s.source_id, n.id, CASE WHEN n.id IS NULL THEN r.id END
+            FROM EdgeStaging s
+            LEFT JOIN Nodes n ON n.title = s.target_title
+            LEFT JOIN RedLinks r ON r.title = s.target_title
+            ORDER BY s.rowid
+        """)
+        self._add_stat('total_edges', self.cursor.rowcount)
         
-        # Bold: '''text''' -> <strong>text</strong>
-        html = re.sub(r"'''([^']+)'''", r'<strong>\1</strong>', html)
+        # 3. 새 엣지(id > last_edge_id)만 집계해 차수에 더함
+        self._add_degrees('id > ?', (last_edge_id,))
         
-        # Italic: ''text'' -> <em>text</em>
-        html = re.sub(r"''([^']+)''", r'<em>\1</em>', html)
+        # 4. 스테이징 비우기
+        self.cursor.execute("DELETE FROM EdgeStaging")
+        self.conn.commit()
         
-        # Convert newlines to <br> and paragraphs
-        html = html.replace('\r\n', '\n').replace('\r', '\n')
-        paragraphs = html.split('\n\n')
-        html = '<p>' + '</p>\n<p>'.join(p.replace('\n', '<br>') for p in paragraphs if p.strip()) + '</p>'
+        self.cursor.execute("SELECT COUNT(*) FROM RedLinks")
+        print(f"✅ Edges resolved ({self.cursor.fetchone()[0]} red-link targets)")
+    
+    def _add_degrees(self, edge_filter: str, params: Tuple = (), sign: int = 1):
+        """
+        Add (sign=1) or subtract (sign=-1) the degrees of the edges matching
+        `edge_filter` (a condition on Edges) to NodeDegree / RedLinks.ref_count
+        """
+        for column, degree in (('target_id', 'in_degree'), ('source_id', 'out_degree')):
+            self.cursor.execute(f"""
+                INSERT INTO NodeDegree (node_id, {degree})
+                SELECT {column}, {sign} * COUNT(*) FROM Edges
+                WHERE {edge_filter} AND {column} IS NOT NULL
+                GROUP BY {column}
+                ON CONFLICT(node_id) DO UPDATE SET {degree} = {degree} + excluded.{degree}
+            """, params)
         
-        return html
+        # RedLinks는 title이 NOT NULL이라 upsert 대신 임시 집계 테이블을 거칩니다
+        self.cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS RedLinkDelta (
+                redlink_id INTEGER PRIMARY KEY,
+                c INTEGER NOT NULL
+            )
+        """)
+        self.cursor.execute(f"""
+            INSERT INTO RedLinkDelta (redlink_id, c)
+            SELECT redlink_id, {sign} * COUNT(*) FROM Edges
+            WHERE {edge_filter} AND redlink_id IS NOT NULL
+            GROUP BY redlink_id
+        """, params)
+        self.cursor.execute("""
+            UPDATE RedLinks
+            SET ref_count = ref_count + (SELECT c FROM RedLinkDelta d WHERE d.redlink_id = RedLinks.id)
+            WHERE id IN (SELECT redlink_id FROM RedLinkDelta)
+        """)
+        self.cursor.execute("DROP TABLE RedLinkDelta")
+    
+    def _delete_edges(self, edge_filter: str, params: Tuple = ()):
+        """Delete edges matching `edge_filter`, keeping Stats / NodeDegree in step"""
+        self._add_degrees(edge_filter, params, sign=-1)
+        self.cursor.execute(f"DELETE FROM Edges WHERE {edge_filter}", params)
+        self._add_stat('total_edges', -self.cursor.rowcount)
+    
+    def extract_wiki_links(self, text: str) -> List[WikiLink]:
+        """Extract [[WikiLink]] patterns (see wikitext.extract_wiki_links)"""
+        return extract_wiki_links(text)
     
-    def process_jsonl(self, jsonl_path: str) -> Tuple[int, int]:
+    def convert_to_html(self, text: str, title: str) -> str:
+        """Convert wiki markup to HTML (see wikitext.convert_to_html)"""
+        return convert_to_html(text)
+    
+    def _iter_articles(self, f, workers: int = 1, worker_args: Tuple = (), start_line: int = 1):
+        """
+        Decode JSONL lines and prepare each article for insertion
+        
+        f는 바이너리 모드로 열린 파일이며, 현재 위치(start_line번째 줄)부터 읽습니다.
+        workers > 1이면 JSON 디코딩·HTML 변환·링크 추출을 프로세스 풀에서 수행하고,
+        결과는 입력 순서대로 돌려받아 이 스레드(단일 SQLite writer)가 적재합니다.
+        
+        Yields: (line_num, end_offset, title, raw_content, html_content, targets, content_hash)
+        """
+        chunks = iter_chunks(iter_lines(f, start_line), PREPARE_CHUNK_SIZE)
+        
+        if workers > 1:
+            pool = Pool(workers, initializer=init_worker, initargs=worker_args)
+            results = ordered_imap(pool, prepare_chunk, chunks, window=workers * 4)
+        else:
+            pool = None
+            init_worker(*worker_args)
+            results = map(prepare_chunk, chunks)
+        
+        try:
+            for rows in results:
+                for line_num, end_offset, article, error in rows:
+                    if error is not None:
+                        print(f"\n❌ JSON error at line {line_num}: {error}")
+                        continue
+                    yield (line_num, end_offset, *article)
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+    
+    def process_jsonl(self, jsonl_path: str, bulk: bool = False, workers: int = 1,
+                      resume: bool = False) -> Tuple[int, int]:
         """
         Process JSONL file and insert nodes into database
         
+        커밋마다 체크포인트(줄 번호, 바이트 오프셋)를 같은 트랜잭션으로 Meta에 기록하고,
+        resume=True이면 마지막 체크포인트 위치로 바로 이동해 이어서 적재합니다.
+        
         Returns: (nodes_count, edges_count)
         """
+        if bulk:
+            return self.bulk_load(jsonl_path, workers, resume)
+        
         print(f"📖 Reading JSONL from: {jsonl_path}")
+        if workers > 1:
+            print(f"⚡ Preparing articles in {workers} processes")
+        worker_args = self._worker_args(jsonl_path)
         
         nodes_count = 0
         edges_count = 0
         
-        with open(jsonl_path, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if not line:
-                    continue
+        with open(jsonl_path, 'rb') as f:
+            position = self._start_position(f, jsonl_path, bulk, resume)
+            for line_num, offset, title, raw_content, html_content, targets, digest in self._iter_articles(
+                    f, workers, worker_args, position[0]):
+                position = (line_num + 1, offset)
                 
+                # Insert node
                 try:
-                    data = json.loads(line)
-                    title = data['title']
-                    raw_content = data['content']
-                    
-                    # Convert to HTML
-                    html_content = self.convert_to_html(raw_content, title)
-                    
-                    # Extract links for edge creation
-                    links = self.extract_wiki_links(raw_content)
+                    self.cursor.execute(
+                        "INSERT INTO Nodes (title, raw_content, html_content, content_hash) VALUES (?, ?, ?, ?)",
+                        (title, raw_content, html_content, digest)
+                    )
+                    node_id = self.cursor.lastrowid
+                    nodes_count += 1
                     
-                    # Insert node
-                    try:
+                    # Insert edges
+                    for target in targets:
                         self.cursor.execute(
-                            "INSERT INTO Nodes (title, raw_content, html_content) VALUES (?, ?, ?)",
-                            (title, raw_content, html_content)
+                            "INSERT INTO EdgeStaging (source_id, target_title) VALUES (?, ?)",
+                            (node_id, target)
                         )
-                        node_id = self.cursor.lastrowid
-                        nodes_count += 1
-                        
-                        # Insert edges
-                        for link in links:
-                            self.cursor.execute(
-                                "INSERT INTO Edges (source_id, target_title) VALUES (?, ?)",
-                                (node_id, link.target)
-                            )
-                            edges_count += 1
-                        
-                        if nodes_count % 100 == 0:
-                            print(f"\r📊 Processed: {nodes_count} nodes, {edges_count} edges", end='', flush=True)
-                        
-                        # 1,000건마다 중간 커밋 — 장애 시 손실 최소화 (#6)
-                        if nodes_count % 1000 == 0:
-                            self.conn.commit()
+                        edges_count += 1
                     
-                    except sqlite3.IntegrityError as e:
-                        print(f"\n⚠️  Duplicate title at line {line_num}: {title}")
-                        continue
+                    if nodes_count % 100 == 0:
+                        print(f"\r📊 Processed: {nodes_count} nodes, {edges_count} edges", end='', flush=True)
+                    
+                    # 1,000건마다 중간 커밋 — 장애 시 손실 최소화 (#6)
+                    if nodes_count % 1000 == 0:
+                        self._save_checkpoint(jsonl_path, position, bulk)
+                        self.conn.commit()
                 
-                except json.JSONDecodeError as e:
-                    print(f"\n❌ JSON error at line {line_num}: {e}")
+                except sqlite3.IntegrityError as e:
+                    print(f"\n⚠️  Duplicate title at line {line_num}: {title}")
                     continue
+            
+            self._save_checkpoint(jsonl_path, position, bulk)
         
         self.conn.commit()  # 잔여분 최종 커밋
         print(f"\n✅ Imported {nodes_count} nodes and {edges_count} edges")
         
+        self.resolve_edges()
+        self._finish_import()
+        
+        return nodes_count, edges_count
+    
+    def sync_jsonl(self, jsonl_path: str, workers: int = 1) -> Dict[str, int]:
+        """
+        Incrementally sync the database with a new JSONL (--incremental)
+        
+        본문 해시(content_hash)를 비교해 바뀐 문서만 갱신하고, 새 문서는 추가,
+        JSONL에 없는 문서는 삭제합니다. 엣지는 바뀐/삭제된 문서의 나가는 엣지만
+        다시 쓰고, 삭제된 문서를 가리키던 엣지는 red link로 돌립니다.
+        
+        Returns: {'added', 'changed', 'unchanged', 'deleted'} counts
+        """
+        print(f"📖 Reading JSONL from: {jsonl_path} (incremental)")
+        if workers > 1:
+            print(f"⚡ Preparing articles in {workers} processes")
+        worker_args = self._worker_args(jsonl_path)
+        
+        # 자동완성 증분 갱신의 기준: 동기화 전 in-degree. 이전 동기화가 자동완성 갱신 전에
+        # 중단되었으면(suggest_stale) 이미 어긋나 있으므로 이번에는 전체 재구축
+        incremental_suggest = self.get_meta('suggest_stale') is None
+        self.cursor.execute("DROP TABLE IF EXISTS temp.DegreeBefore")
+        self.cursor.execute("CREATE TEMP TABLE DegreeBefore (node_id INTEGER PRIMARY KEY, in_degree INTEGER)")
+        self.cursor.execute("INSERT INTO DegreeBefore SELECT node_id, in_degree FROM NodeDegree")
+        self.set_meta('suggest_stale', '1')
+        self.conn.commit()
+        
+        # 마이그레이션·중단된 임포트가 남긴 스테이징 엣지를 먼저 해석해 둡니다
+        # (삭제될 문서의 엣지가 나중에 되살아나지 않도록)
+        self.cursor.execute("SELECT EXISTS (SELECT 1 FROM EdgeStaging)")
+        if self.cursor.fetchone()[0]:
+            self.resolve_edges()
+        
+        # 제목 -> (id, 해시); 해시가 없는(이전 버전) 행은 항상 변경으로 취급
+        self.cursor.execute("SELECT id, title, content_hash FROM Nodes")
+        existing = {row['title']: (row['id'], row['content_hash']) for row in self.cursor.fetchall()}
+        seen_titles = set()
+        counts = {'added': 0, 'changed': 0, 'unchanged': 0, 'deleted': 0}
+        writes = 0
+        
+        with open(jsonl_path, 'rb') as f:
+            for line_num, _, title, raw_content, html_content, targets, digest in self._iter_articles(f, workers, worker_args):
+                if title in seen_titles:
+                    print(f"\n⚠️  Duplicate title at line {line_num}: {title}")
+                    continue
+                seen_titles.add(title)
+                
+                node = existing.get(title)
+                if node is None:
+                    self.cursor.execute(
+                        "INSERT INTO Nodes (title, raw_content, html_content, content_hash) VALUES (?, ?, ?, ?)",
+                        (title, raw_content, html_content, digest)
+                    )
+                    node_id = self.cursor.lastrowid
+                    counts['added'] += 1
+                elif node[1] == digest:
+                    counts['unchanged'] += 1
+                    continue
+                else:
+                    node_id = node[0]
+                    # 옛 나가는 엣지 제거 (노드 갱신·새 엣지 스테이징과 같은 커밋에 포함)
+                    self._delete_edges("source_id = ?", (node_id,))
+                    self.cursor.execute(
+                        "UPDATE Nodes SET raw_content = ?, html_content = ?, content_hash = ? WHERE id = ?",
+                        (raw_content, html_content, digest, node_id)
+                    )
+                    counts['changed'] += 1
+                
+                self.cursor.executemany(
+                    "INSERT INTO EdgeStaging (source_id, target_title) VALUES (?, ?)",
+                    ((node_id, target) for target in targets)
+                )
+                
+                writes += 1
+                if writes % 100 == 0:
+                    print(f"\r📊 Added: {counts['added']}, changed: {counts['changed']}, "
+                          f"unchanged: {counts['unchanged']}", end='', flush=True)
+                if writes % 1000 == 0:
+                    self.conn.commit()
+        
+        vanished = [(node_id, title) for title, (node_id, _) in existing.items() if title not in seen_titles]
+        counts['deleted'] = self._delete_nodes(vanished)
+        
+        # 더 이상 아무도 가리키지 않는 red link 정리
+        self.cursor.execute("DELETE FROM RedLinks WHERE ref_count <= 0")
+        self._add_stat('total_redlinks', -self.cursor.rowcount)
+        self.conn.commit()
+        
+        print(f"\n✅ Added {counts['added']}, changed {counts['changed']}, "
+              f"deleted {counts['deleted']}, unchanged {counts['unchanged']} nodes")
+        
+        self.resolve_edges()
+        self._finish_import(incremental=incremental_suggest)
+        
+        return counts
+    
+    def _delete_nodes(self, nodes: List[Tuple[int, str]]) -> int:
+        """
+        Delete (id, title) nodes with their outgoing edges
+        
+        들어오던 엣지는 지우지 않고 같은 제목의 red link로 돌려, 문서가 다시 생기면
+        resolve_edges()가 승격할 수 있게 합니다.
+        """
+        if not nodes:
+            return 0
+        
+        self.cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS Vanished (
+                node_id INTEGER PRIMARY KEY,
+                title TEXT NOT NULL
+            )
+        """)
+        self.cursor.executemany("INSERT INTO Vanished (node_id, title) VALUES (?, ?)", nodes)
+        
+        self._delete_edges("source_id IN (SELECT node_id FROM Vanished)")
+        
+        # 남은 들어오는 엣지 -> red link
+        self.cursor.execute("""
+            INSERT INTO RedLinks (title, ref_count)
+            SELECT v.title, d.in_degree
+            FROM Vanished v JOIN NodeDegree d ON d.node_id = v.node_id
+            WHERE d.in_degree > 0
+        """)
+        self._add_stat('total_redlinks', self.cursor.rowcount)
+        self.cursor.execute("""
+            UPDATE Edges
+            SET redlink_id = (
+                    SELECT r.id FROM Vanished v JOIN RedLinks r ON r.title = v.title
+                    WHERE v.node_id = Edges.target_id
+                ),
+                target_id = NULL
+            WHERE target_id IN (SELECT node_id FROM Vanished)
+        """)
+        
+        self.cursor.execute("DELETE FROM NodeDegree WHERE node_id IN (SELECT node_id FROM Vanished)")
+        self.cursor.execute("DELETE FROM Nodes WHERE id IN (SELECT node_id FROM Vanished)")
+        deleted = self.cursor.rowcount
+        self._add_stat('total_nodes', -deleted)
+        self.cursor.execute("DROP TABLE Vanished")
+        
+        return deleted
+    
+    def _save_checkpoint(self, jsonl_path: str, position: Tuple[int, int], bulk: bool):
+        """Record (next line, byte offset) in Meta; call inside the transaction being committed"""
+        next_line, offset = position
+        self.set_meta('import_checkpoint', json.dumps({
+            'source': str(Path(jsonl_path).resolve()),
+            'size': os.path.getsize(jsonl_path),
+            'line': next_line,
+            'offset': offset,
+            'bulk': bulk,
+        }))
+    
+    def _start_position(self, f, jsonl_path: str, bulk: bool, resume: bool) -> Tuple[int, int]:
+        """
+        Seek f to where the import should start and return (line, offset)
+        
+        --resume이면 같은 JSONL(경로·크기)의 체크포인트로 이동합니다. 체크포인트가
+        기록된 커밋까지의 노드·스테이징 엣지는 이미 DB에 있으므로 중복 없이 이어집니다.
+        """
+        if not resume:
+            return 1, 0
+        
+        checkpoint = self.get_meta('import_checkpoint')
+        if checkpoint is None:
+            print("⚠️  No checkpoint found; starting from line 1")
+            return 1, 0
+        
+        checkpoint = json.loads(checkpoint)
+        if (checkpoint['source'] != str(Path(jsonl_path).resolve())
+                or checkpoint['size'] != os.path.getsize(jsonl_path)):
+            raise ValueError(f"Checkpoint belongs to {checkpoint['source']} "
+                             f"({checkpoint['size']:,} bytes); cannot resume with this file")
+        if checkpoint['bulk'] != bulk:
+            # 벌크 적재 중단 후 일반 모드로 이어 쓰면 FTS 인덱스가 어긋납니다
+            mode = '--bulk' if checkpoint['bulk'] else 'without --bulk'
+            raise ValueError(f"Checkpoint was written by an import {mode}; resume the same way")
+        
+        f.seek(checkpoint['offset'])
+        print(f"⏩ Resuming at line {checkpoint['line']:,} (byte offset {checkpoint['offset']:,})")
+        return checkpoint['line'], checkpoint['offset']
+    
+    def _begin_bulk(self):
+        """Switch to bulk-load settings: drop FTS triggers and secondary indexes"""
+        self.cursor.execute(f"PRAGMA cache_size=-{BULK_CACHE_KIB}")
+        self.cursor.execute("PRAGMA temp_store=MEMORY")
+        self.cursor.execute("PRAGMA locking_mode=EXCLUSIVE")
+        
+        for trigger in ('nodes_ai', 'nodes_ad', 'nodes_au'):
+            self.cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        for index in ('idx_nodes_title', 'idx_edges_source', 'idx_edges_target', 'idx_edges_redlink',
+                      'idx_degree_in', 'idx_degree_out', 'idx_redlinks_refs', 'idx_score_pagerank'):
+            self.cursor.execute(f"DROP INDEX IF EXISTS {index}")
+        self.conn.commit()
+    
+    def _end_bulk(self):
+        """Release the exclusive lock taken by _begin_bulk"""
+        self.cursor.execute("PRAGMA locking_mode=NORMAL")
+        # locking_mode=NORMAL은 다음 DB 접근 시점에 잠금을 해제합니다
+        self.cursor.execute("SELECT 1 FROM Nodes LIMIT 1")
+    
+    def bulk_load(self, jsonl_path: str, workers: int = 1, resume: bool = False) -> Tuple[int, int]:
+        """
+        Bulk-load JSONL into the database (--bulk)
+        
+        FTS 트리거와 보조 인덱스를 내린 상태에서 executemany로 일괄 적재한 뒤,
+        NodesFTS를 'rebuild'로 한 번에 재구축하고 인덱스/트리거를 복원합니다.
+        
+        Returns: (nodes_count, edges_count)
+        """
+        print(f"📖 Reading JSONL from: {jsonl_path} (bulk mode)")
+        if workers > 1:
+            print(f"⚡ Preparing articles in {workers} processes")
+        worker_args = self._worker_args(jsonl_path)
+        
+        timings = {}
+        phase_start = time.perf_counter()
+        
+        self._begin_bulk()
+        
+        # executemany는 lastrowid를 돌려주지 않으므로 노드 id를 직접 부여합니다
+        self.cursor.execute("SELECT COALESCE(MAX(id), 0) FROM Nodes")
+        next_id = self.cursor.fetchone()[0] + 1
+        self.cursor.execute("SELECT title FROM Nodes")
+        seen_titles = {row[0] for row in self.cursor.fetchall()}
+        timings['prepare'] = time.perf_counter() - phase_start
+        
+        phase_start = time.perf_counter()
+        nodes_count = 0
+        edges_count = 0
+        node_rows = []
+        edge_rows = []
+        
+        position = None
+        
+        def flush():
+            self.cursor.executemany(
+                "INSERT INTO Nodes (id, title, raw_content, html_content, content_hash) VALUES (?, ?, ?, ?, ?)",
+                node_rows
+            )
+            self.cursor.executemany(
+                "INSERT INTO EdgeStaging (source_id, target_title) VALUES (?, ?)",
+                edge_rows
+            )
+            self._save_checkpoint(jsonl_path, position, bulk=True)
+            self.conn.commit()
+            node_rows.clear()
+            edge_rows.clear()
+        
+        try:
+            with open(jsonl_path, 'rb') as f:
+                position = self._start_position(f, jsonl_path, True, resume)
+                for line_num, offset, title, raw_content, html_content, targets, digest in self._iter_articles(
+                        f, workers, worker_args, position[0]):
+                    position = (line_num + 1, offset)
+                    if title in seen_titles:
+                        print(f"\n⚠️  Duplicate title at line {line_num}: {title}")
+                        continue
+                    seen_titles.add(title)
+                    
+                    node_rows.append((next_id, title, raw_content, html_content, digest))
+                    edge_rows.extend((next_id, target) for target in targets)
+                    next_id += 1
+                    nodes_count += 1
+                    edges_count += len(targets)
+                    
+                    if len(node_rows) >= BULK_BATCH_SIZE:
+                        flush()
+                        print(f"\r📊 Processed: {nodes_count} nodes, {edges_count} edges", end='', flush=True)
+            
+            flush()
+            timings['insert'] = time.perf_counter() - phase_start
+            print(f"\n✅ Imported {nodes_count} nodes and {edges_count} edges")
+            
+            phase_start = time.perf_counter()
+            self.resolve_edges()
+            timings['resolve_edges'] = time.perf_counter() - phase_start
+            
+            # FTS5 인덱스를 한 번에 재구축 (행 단위 트리거 대비 수십 배 빠름)
+            phase_start = time.perf_counter()
+            for table in self._fts_tables():
+                print(f"🔎 Rebuilding {table}...")
+                self.cursor.execute(f"INSERT INTO {table}({table}) VALUES('rebuild')")
+            self.conn.commit()
+            timings['fts_rebuild'] = time.perf_counter() - phase_start
+            
+            phase_start = time.perf_counter()
+            self._finish_import()
+            timings['derived'] = time.perf_counter() - phase_start
+        except BaseException:
+            # 체크포인트와 함께 커밋되지 않은 배치(반쯤 적재된 Nodes/EdgeStaging)는 버림 -
+            # 아래 복원 커밋에 섞이면 --resume이 같은 문서를 다시 읽어 중복·링크 유실
+            self.conn.rollback()
+            raise
+        finally:
+            # 실패하더라도 인덱스/트리거는 복원해 둡니다
+            print("🗂️  Recreating indexes and triggers...")
+            phase_start = time.perf_counter()
+            self._create_indexes()
+            self._create_triggers()
+            self.conn.commit()
+            self._end_bulk()
+            timings['indexes'] = time.perf_counter() - phase_start
+        
+        print("⏱️  Bulk load timings:")
+        for phase, seconds in timings.items():
+            print(f"   {phase:12s} {seconds:8.1f}s")
+        
         return nodes_count, edges_count
     
     # 읽기 전용 쿼리 메서드(get_backlinks, search_titles, get_statistics)는
@@ -269,9 +1366,36 @@ def main():
     parser.add_argument('output', help='Output SQLite database path')
     parser.add_argument('--reset', action='store_true', help='Reset database (delete if exists)')
     parser.add_argument('--stats', action='store_true', help='Show statistics after import')
+    parser.add_argument('--bulk', action='store_true',
+                        help='Bulk-load mode: drop FTS triggers/indexes, batch inserts, rebuild at the end')
+    parser.add_argument('--compress', action='store_true',
+                        help='Store article content as zstd BLOBs with a trained dictionary (new DBs only)')
+    parser.add_argument('--lazy-html', action='store_true',
+                        help='Do not store html_content; render it on read (new DBs only)')
+    parser.add_argument('--tokenizer', choices=FTS_TOKENIZERS,
+                        help='Full-text index: unicode61 (word prefixes, default) or trigram '
+                             '(adds a substring index for Korean inflected/compound forms)')
+    parser.add_argument('--prior', choices=SCORE_PRIORS,
+                        help='Search ranking prior: in_degree (default) or pagerank (needs numpy)')
+    parser.add_argument('--export-graph', action='store_true',
+                        help='Export memory-mapped CSR adjacency (<db>.csr/) for multi-hop queries (needs numpy)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted import from its last committed checkpoint')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Sync an existing DB: update changed articles, add new ones, delete vanished ones')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processes for JSON decoding/HTML rendering/link extraction (0 = all cores, default: 1)')
     
     args = parser.parse_args()
     
+    # 플래그 조합 검사는 출력 파일을 건드리기(--reset 삭제) 전에
+    if args.incremental and (args.reset or args.bulk or args.resume):
+        print("❌ --incremental cannot be combined with --reset, --bulk or --resume")
+        sys.exit(1)
+    if args.resume and args.reset:
+        print("❌ --resume cannot be combined with --reset")
+        sys.exit(1)
+    
     # Check input file
     if not Path(args.input).exists():
         print(f"❌ Input file not found: {args.input}")
@@ -282,6 +1406,8 @@ def main():
         print(f"🗑️  Deleting existing database: {args.output}")
         Path(args.output).unlink()
     
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    
     # Process
     print("🐍 GurupiaDict Synthesizer v0.1.0")
     print(f"📥 Input:  {args.input}")
@@ -289,8 +1415,21 @@ def main():
     print()
     
     with GurupiaSynthesizer(args.output) as synth:
-        synth.create_schema()
-        nodes_count, edges_count = synth.process_jsonl(args.input)
+        try:
+            synth.create_schema(compress=args.compress, lazy_html=args.lazy_html,
+                                tokenizer=args.tokenizer, prior=args.prior,
+                                export_graph=args.export_graph)
+        except (ValueError, RuntimeError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        if args.incremental:
+            synth.sync_jsonl(args.input, workers=workers)
+        else:
+            try:
+                synth.process_jsonl(args.input, bulk=args.bulk, workers=workers, resume=args.resume)
+            except ValueError as e:
+                print(f"❌ {e}")
+                sys.exit(1)
         
         if args.stats:
             print("\n📊 Database Statistics:")
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+GurupiaDict Wikitext helpers
+
+Pure functions for wiki markup -> HTML conversion and [[WikiLink]]
+extraction. They hold no database state, so the synthesizer can run them
+in worker processes and the query side can reuse them.
+"""
+
+import re
+from typing import List
+
+# 정규식 모듈 레벨 캐싱 - 문서마다 재컴파일 방지
+RE_WIKI_LINK = re.compile(r'\[\[([^\]|]+)(?:\|([^\]]+))?\]\]')
+RE_PIPED_LINK = re.compile(r'\[\[([^\]|]+)\|([^\]]+)\]\]')
+RE_SIMPLE_LINK = re.compile(r'\[\[([^\]]+)\]\]')
+RE_BOLD = re.compile(r"'''([^']+)'''")
+RE_ITALIC = re.compile(r"''([^']+)''")
+
+# 단일 패스 렌더러용 - 리터럴 접두사로 시작해야 re의 빠른 검색 경로를 탄다
+RE_LINK_TOKEN = re.compile(r'\[\[(?:([^\]|]+)\|([^\]]+)|([^\]]+))\]\]')
+RE_QUOTE_RUN = re.compile(r"(''*)")
+RE_NESTED_LINK = re.compile(r'\[\[[^\]]*\[\[')
+
+SKIP_LINK_PREFIXES = ('File:', 'Image:', '파일:', '그림:')
+
+# 링크 HTML 메모 (프로세스별) - 같은 링크가 여러 문서에 반복해서 나온다
+LINK_CACHE_SIZE = 65536
+_link_html = {}
+
+
+class WikiLink:
+    """Represents a wiki link extracted from text"""
+
+    def __init__(self, target: str, display: str = None):
+        self.target = target.strip()
+        self.display = display.strip() if display else self.target
+
+    def __repr__(self):
+        return f"WikiLink({self.target!r}, {self.display!r})"
+
+
+def extract_wiki_links(text: str) -> List[WikiLink]:
+    """
+    Extract [[WikiLink]] and [[Target|Display]] patterns from text
+
+    Examples:
+        [[컴퓨터]] -> WikiLink("컴퓨터")
+        [[CPU|중앙처리장치]] -> WikiLink("CPU", "중앙처리장치")
+    """
+    links = []
+    for match in RE_WIKI_LINK.finditer(text):
+        target = match.group(1)
+        display = match.group(2)
+
+        # Skip File/Image links (should be already cleaned by Rust parser)
+        if target.startswith(SKIP_LINK_PREFIXES):
+            continue
+
+        # Normalize target (capitalize first letter)
+        target = target.strip()
+        if target:
+            target = target[0].upper() + target[1:]
+            links.append(WikiLink(target, display))
+
+    return links
+
+
+def _replace_piped_link(match):
+    target = match.group(1).strip()
+    display = match.group(2).strip()
+    target = target[0].upper() + target[1:] if target else target
+    return f'<a href="dict://{target}" class="dict-link">{display}</a>'
+
+
+def _replace_simple_link(match, group=1):
+    target = match.group(group).strip()
+    target = target[0].upper() + target[1:] if target else target
+    return f'<a href="dict://{target}" class="dict-link">{target}</a>'
+
+
+def _replace_link_token(match):
+    """RE_LINK_TOKEN match -> <a> tag, memoized by the link's source text"""
+    source = match.group(0)
+    html = _link_html.get(source)
+    if html is None:
+        if match.group(3) is not None:
+            html = _replace_simple_link(match, 3)
+        else:
+            html = _replace_piped_link(match)
+        if len(_link_html) >= LINK_CACHE_SIZE:
+            _link_html.clear()
+        _link_html[source] = html
+    return html
+
+
+def _pair_quote_runs(lengths, width):
+    """
+    Pair quote runs exactly like re.sub("'{width}([^']+)'{width}") would
+
+    Neighbouring runs are separated by non-empty quote-free text, so every
+    match spans run k and run k+1: it takes the last `width` quotes of run k
+    (after whatever an earlier match took from its front) and the first
+    `width` of run k+1. Returns (remaining, opens, closes) per run.
+    """
+    remaining = list(lengths)
+    opens = [False] * len(lengths)
+    closes = [False] * len(lengths)
+    for k in range(len(lengths) - 1):
+        if remaining[k] >= width and lengths[k + 1] >= width:
+            opens[k] = closes[k + 1] = True
+            remaining[k] -= width
+            remaining[k + 1] -= width
+    return remaining, opens, closes
+
+
+def _replace_quote_runs(parts):
+    """Rewrite the quote runs at the odd indexes of `parts` into tags, in place"""
+    lengths = [len(run) for run in parts[1::2]]
+
+    # Bold first, then italic over the quotes bold left behind
+    remaining, bold_open, bold_close = _pair_quote_runs(lengths, 3)
+    live = [k for k, n in enumerate(remaining) if n]
+    leftover, em_open, em_close = _pair_quote_runs([remaining[k] for k in live], 2)
+
+    inner = [''] * len(lengths)
+    for j, k in enumerate(live):
+        inner[k] = ('</em>' if em_close[j] else '') + "'" * leftover[j] + ('<em>' if em_open[j] else '')
+
+    for k in range(len(lengths)):
+        parts[2 * k + 1] = (('</strong>' if bold_close[k] else '') + inner[k]
+                            + ('<strong>' if bold_open[k] else ''))
+
+
+def _to_paragraphs(html: str) -> str:
+    # Convert newlines to <br> and paragraphs
+    html = html.replace('\r\n', '\n').replace('\r', '\n')
+    paragraphs = html.split('\n\n')
+    return '<p>' + '</p>\n<p>'.join(p.replace('\n', '<br>') for p in paragraphs if p.strip()) + '</p>'
+
+
+def convert_to_html(text: str) -> str:
+    """
+    Convert wiki markup to HTML with dict:// protocol links
+
+    - [[Link]] -> <a href="dict://Link">Link</a>
+    - [[Target|Display]] -> <a href="dict://Target">Display</a>
+    - '''Bold''' -> <strong>Bold</strong>
+    - ''Italic'' -> <em>Italic</em>
+
+    One pass converts both link forms, one split over the quote runs
+    resolves bold and italic together. The output is identical to
+    `convert_to_html_chained`, which still handles text with a `[[` nested
+    inside a link (the chain rewrites those in two stages).
+    """
+    if '[[' in text:
+        if RE_NESTED_LINK.search(text):
+            return convert_to_html_chained(text)
+        text = RE_LINK_TOKEN.sub(_replace_link_token, text)
+
+    if "''" in text:
+        parts = RE_QUOTE_RUN.split(text)
+        _replace_quote_runs(parts)
+        text = ''.join(parts)
+
+    return _to_paragraphs(text)
+
+
+def convert_to_html_chained(text: str) -> str:
+    """Reference converter: one regex pass per markup type"""
+    # Convert [[Target|Display]] first (before simple [[Target]])
+    html = RE_PIPED_LINK.sub(_replace_piped_link, text)
+
+    # Convert [[Target]]
+    html = RE_SIMPLE_LINK.sub(_replace_simple_link, html)
+
+    # Bold: '''text''' -> <strong>text</strong>
+    html = RE_BOLD.sub(r'<strong>\1</strong>', html)
+
+    # Italic: ''text'' -> <em>text</em>
+    html = RE_ITALIC.sub(r'<em>\1</em>', html)
+
+    return _to_paragraphs(html)
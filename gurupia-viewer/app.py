@@ -5,19 +5,181 @@ Flask-based web interface for browsing the knowledge graph
 """
 
 import argparse
+import functools
+import hashlib
 import os
 import sys
+import threading
 import webbrowser
 from pathlib import Path
-from flask import Flask, current_app, jsonify, render_template_string, request, send_from_directory
+from flask import Flask, current_app, g, jsonify, render_template_string, request, send_file
 import sqlite3
 from typing import Dict, List, Optional
+from urllib.parse import quote
+from werkzeug.exceptions import HTTPException
 
 # Add synthesizer to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'gurupia-synthesizer'))
 from query import GurupiaQuery
+from pool import QueryPool
+from lru import ByteLRUCache
+from audio_manifest import AudioManifest
+
+# --asgi 서빙 모드에서만 필요한 선택 의존성
+try:
+    import uvicorn
+except ImportError:
+    uvicorn = None
 
 app = Flask(__name__, static_folder='static')
+app.config.setdefault('POOL_SIZE', 8)
+# JSON 응답 캐시 상한 (0이면 캐시하지 않고 ETag만)
+app.config.setdefault('RESPONSE_CACHE_BYTES', 32 * 1024 * 1024)
+
+# POST /api/articles 한 번에 가져올 최대 문서 수
+MAX_BATCH_ARTICLES = 50
+
+# TTS 오디오 디렉터리 (tts_generator.py 출력, manifest.json 포함)
+AUDIO_DIR = Path(__file__).parent / 'audio'
+# ?v=<해시>로 버전이 붙은 오디오 URL은 내용이 바뀌지 않으므로 1년 캐시
+AUDIO_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+_init_lock = threading.Lock()
+
+
+def get_pool() -> QueryPool:
+    """App-wide pool of read-only connections, created on first use"""
+    pool = current_app.extensions.get('gurupia_pool')
+    if pool is None:
+        with _init_lock:
+            pool = current_app.extensions.get('gurupia_pool')
+            if pool is None:
+                pool = QueryPool(current_app.config['DB_PATH'], max_size=current_app.config['POOL_SIZE'])
+                current_app.extensions['gurupia_pool'] = pool
+    return pool
+
+
+def get_query() -> GurupiaQuery:
+    """Connection for the current request, checked out of the pool once"""
+    if 'gq' not in g:
+        g.gq = get_pool().acquire()
+    return g.gq
+
+
+@app.teardown_appcontext
+def release_query(error):
+    """Return the request's connection; drop it if the request died mid-query"""
+    gq = g.pop('gq', None)
+    if gq is not None:
+        get_pool().release(gq, discard=error is not None)
+
+
+def get_response_cache() -> ByteLRUCache:
+    """App-wide cache of serialized JSON responses: key -> (body, etag)"""
+    cache = current_app.extensions.get('gurupia_responses')
+    if cache is None:
+        with _init_lock:
+            cache = current_app.extensions.get('gurupia_responses')
+            if cache is None:
+                cache = ByteLRUCache(current_app.config['RESPONSE_CACHE_BYTES'],
+                                     sizeof=lambda entry: len(entry[0]))
+                current_app.extensions['gurupia_responses'] = cache
+    return cache
+
+
+def get_audio_manifest() -> AudioManifest:
+    """TTS audio manifest, loaded once per process (restart the viewer after generating audio)"""
+    manifest = current_app.extensions.get('gurupia_audio')
+    if manifest is None:
+        with _init_lock:
+            manifest = current_app.extensions.get('gurupia_audio')
+            if manifest is None:
+                manifest = AudioManifest.load(AUDIO_DIR)
+                current_app.extensions['gurupia_audio'] = manifest
+    return manifest
+
+
+def audio_info(title: str) -> Optional[Dict]:
+    """{'url', 'duration', 'size'} of an article's audio (versioned URL), None without audio"""
+    entry = get_audio_manifest().get(title)
+    if entry is None:
+        return None
+    return {
+        'url': f"/api/audio/{quote(title, safe='')}?v={entry['hash']}",
+        'duration': entry['duration'],
+        'size': entry['size'],
+    }
+
+
+def audio_cache_control(entry: Dict, version: Optional[str]) -> str:
+    """Long-lived caching for URLs versioned with the current hash, else revalidate by ETag"""
+    if version == entry['hash']:
+        return f'public, max-age={AUDIO_IMMUTABLE_MAX_AGE}, immutable'
+    return 'no-cache'
+
+
+def get_build_id() -> str:
+    """
+    Build id of the DB (Meta 'build_id', new on every synthesizer import)
+    
+    DB 파일(과 -wal)의 inode/mtime/크기가 바뀔 때만 Meta를 다시 읽으므로, 평소에는
+    SQLite에 접근하지 않습니다. build_id가 없는 이전 DB는 파일 상태를 대신 사용.
+    파일이 교체되었거나(--reset 재구축) build_id가 바뀌면 연결 풀을 다시 엽니다.
+    """
+    db_path = current_app.config['DB_PATH']
+    files = []
+    for path in (db_path, db_path + '-wal'):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        files.append((path, st.st_ino, st.st_mtime_ns, st.st_size))
+    files = tuple(files)
+    
+    state = current_app.extensions.get('gurupia_build')
+    if state is None or state[0] != files:
+        inode = next((ino for path, ino, _, _ in files if path == db_path), None)
+        replaced = state is not None and state[2] != inode
+        if replaced:
+            # 풀의 연결은 삭제된 이전 DB 파일을 계속 가리키므로 Meta를 읽기 전에 교체
+            get_pool().reset()
+        build_id = get_query().get_meta('build_id') or '-'.join(f'{m}.{n}' for _, _, m, n in files)
+        if state is not None and state[1] != build_id:
+            # 다시 구축된 DB - 이전 빌드의 응답·렌더링된 HTML·연결은 더 이상 쓰지 않음
+            get_response_cache().clear()
+            GurupiaQuery.html_cache.clear()
+            if not replaced:
+                get_pool().reset()
+        current_app.extensions['gurupia_build'] = state = (files, build_id, inode)
+    return state[1]
+
+
+def cached_response(view):
+    """
+    Serve a JSON route from the response cache, with a strong ETag
+    
+    Key: (build id, path, query args). Only 200 responses are cached; the body
+    hash is the ETag, so browsers revalidate (Cache-Control: no-cache) and get
+    304 without a body. A hit does not check out a database connection.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = (get_build_id(), request.path, tuple(sorted(request.args.items(multi=True))))
+        cache = get_response_cache()
+        entry = cache.get(key)
+        if entry is None:
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            body = response.get_data()
+            entry = (body, hashlib.blake2b(body, digest_size=16).hexdigest())
+            cache.put(key, entry)
+        
+        response = current_app.response_class(entry[0], mimetype='application/json')
+        response.set_etag(entry[1])
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+    return wrapper
 
 
 @app.route('/')
@@ -31,74 +193,156 @@ def index():
 
 
 @app.route('/api/search')
+@cached_response
 def api_search():
-    """Search for articles by title"""
+    """Search for articles by title (rank=popular|bm25)"""
     query = request.args.get('q', '')
     limit = request.args.get('limit', 20, type=int)
+    ranking = request.args.get('rank', 'popular')
     
     if not query:
         return jsonify({'results': []})
     
     try:
-        with GurupiaQuery(current_app.config['DB_PATH']) as gq:
-            results = gq.search_titles(query, limit)
-            return jsonify({'results': results})
+        results = get_query().search_titles(query, limit, ranking)
+        return jsonify({'results': results})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/suggest')
+@cached_response
+def api_suggest():
+    """Title autocomplete, ranked by inbound links"""
+    query = request.args.get('q', '')
+    limit = min(request.args.get('limit', 10, type=int), 20)
+    
+    if not query:
+        return jsonify({'results': []})
+    
+    try:
+        results = get_query().suggest_titles(query, limit)
+        return jsonify({'results': results})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/api/article/<path:title>')
+@cached_response
 def api_article(title):
-    """Get article by title"""
+    """Get article by title, with its links (outgoing links flagged exists/red)"""
+    try:
+        # 본문·참조(존재 여부 포함)·역참조를 노드 id 한 번 조회로
+        bundle = get_query().get_article_with_links(title, backlink_limit=50)
+        
+        if not bundle:
+            return jsonify({'error': 'Article not found'}), 404
+        
+        bundle['audio'] = audio_info(title)
+        return jsonify(bundle)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/articles', methods=['POST'])
+def api_articles():
+    """Get several articles with their links at once (body: {"titles": [...]})"""
+    payload = request.get_json(silent=True) or {}
+    titles = payload.get('titles')
+    
+    if not isinstance(titles, list) or not all(isinstance(t, str) for t in titles):
+        return jsonify({'error': "'titles' must be a list of strings"}), 400
+    if len(titles) > MAX_BATCH_ARTICLES:
+        return jsonify({'error': f"At most {MAX_BATCH_ARTICLES} titles per request"}), 400
+    
     try:
-        with GurupiaQuery(current_app.config['DB_PATH']) as gq:
-            article = gq.get_article(title)
-            
-            if not article:
-                return jsonify({'error': 'Article not found'}), 404
-            
-            # Get outgoing links and backlinks
-            outgoing = gq.get_outgoing_links(title)
-            backlinks = gq.get_backlinks(title, limit=50)
-            
-            return jsonify({
-                'article': dict(article),
-                'outgoing_links': outgoing,
-                'backlinks': backlinks
-            })
+        articles = get_query().get_articles(titles, backlink_limit=50)
+        for title, bundle in articles.items():
+            bundle['audio'] = audio_info(title)
+        return jsonify({
+            'articles': articles,
+            'missing': [t for t in dict.fromkeys(titles) if t not in articles],
+        })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/api/stats')
+@cached_response
 def api_stats():
     """Get database statistics"""
     try:
-        with GurupiaQuery(current_app.config['DB_PATH']) as gq:
-            stats = gq.get_statistics()
-            return jsonify(stats)
+        stats = get_query().get_statistics()
+        return jsonify(stats)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/path')
+@cached_response
+def api_path():
+    """Shortest link path between two articles (how is A related to B)"""
+    from_title = request.args.get('from', '')
+    to_title = request.args.get('to', '')
+    max_depth = min(request.args.get('max_depth', 6, type=int), 10)
+    
+    if not from_title or not to_title:
+        return jsonify({'error': "Both 'from' and 'to' are required"}), 400
+    
+    try:
+        gq = get_query()
+        missing = [t for t in (from_title, to_title) if gq.get_node_id(t) is None]
+        if missing:
+            return jsonify({'error': f"Article not found: {missing[0]}"}), 404
+        
+        path = gq.find_path(from_title, to_title, max_depth)
+        return jsonify({
+            'from': from_title,
+            'to': to_title,
+            'path': path,
+            'length': len(path) - 1 if path else None,
+        })
+    except RuntimeError as e:
+        # 그래프 내보내기(--export-graph)가 없는 DB
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/pool')
+def api_pool():
+    """Connection pool, rendered-HTML cache and response cache statistics"""
+    return jsonify({
+        'pool': get_pool().stats(),
+        'html_cache': GurupiaQuery.html_cache.stats(),
+        'response_cache': get_response_cache().stats(),
+    })
+
+
 @app.route('/api/audio/<path:title>')
 def api_audio(title):
-    """Get TTS audio file if available"""
+    """
+    Get TTS audio file if available (the ASGI server streams this route itself)
+    
+    Range 요청은 206으로 응답해 <audio> 탐색 시 필요한 부분만 받습니다.
+    """
     try:
-        # Create safe filename
-        safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()
-        safe_title = safe_title[:100]
+        manifest = get_audio_manifest()
+        entry = manifest.get(title)
         
-        audio_path = Path(__file__).parent / 'audio' / f"{safe_title}.mp3"
-        
-        if audio_path.exists():
-            return send_from_directory(
-                Path(__file__).parent / 'audio',
-                f"{safe_title}.mp3",
-                mimetype='audio/mpeg'
-            )
-        else:
+        if entry is None:
             return jsonify({'error': 'Audio file not found'}), 404
+        
+        response = send_file(manifest.file_path(entry), mimetype='audio/mpeg',
+                             conditional=True, etag=entry['hash'])
+        response.headers['Cache-Control'] = audio_cache_control(entry, request.args.get('v'))
+        return response
+    except HTTPException:
+        raise  # 416 Range Not Satisfiable
+    except FileNotFoundError:
+        return jsonify({'error': 'Audio file not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -107,12 +351,11 @@ def api_audio(title):
 def api_random():
     """Get a random article (#2: GurupiaQuery 사용으로 통일)"""
     try:
-        with GurupiaQuery(current_app.config['DB_PATH']) as gq:
-            title = gq.get_random_title()
-            if title:
-                return jsonify({'title': title})
-            else:
-                return jsonify({'error': 'No articles found'}), 404
+        title = get_query().get_random_title()
+        if title:
+            return jsonify({'title': title})
+        else:
+            return jsonify({'error': 'No articles found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -126,6 +369,14 @@ def main():
     parser.add_argument('--host', default='127.0.0.1', help='Host to bind to (default: 127.0.0.1)')
     parser.add_argument('--no-browser', action='store_true', help='Don\'t open browser automatically')
     parser.add_argument('--debug', action='store_true', help='Run in debug mode')
+    parser.add_argument('--pool-size', type=int, default=8,
+                        help='Max read-only database connections (default: 8)')
+    parser.add_argument('--cache-mb', type=int, default=32,
+                        help='JSON response cache size in MiB, 0 to disable (default: 32)')
+    parser.add_argument('--asgi', action='store_true',
+                        help='Serve with uvicorn (ASGI) instead of the Flask development server')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Server processes in --asgi mode, each with its own pool (default: 1)')
     
     args = parser.parse_args()
     
@@ -142,11 +393,26 @@ def main():
     
     # #2: app.config에 DB 경로 저장 (전역 변수 대신)
     app.config['DB_PATH'] = str(db_path)
+    app.config['POOL_SIZE'] = max(1, args.pool_size)
+    app.config['RESPONSE_CACHE_BYTES'] = max(0, args.cache_mb) * 1024 * 1024
+    
+    if args.workers > 1 and not args.asgi:
+        print("❌ --workers requires --asgi")
+        sys.exit(1)
+    if args.asgi and uvicorn is None:
+        print("❌ --asgi requires the 'uvicorn' package: pip install uvicorn")
+        sys.exit(1)
     
     print("\n" + "="*60)
     print("🌐 GurupiaDict Web Viewer")
     print("="*60)
     print(f"📁 Database: {args.database}")
+    print(f"🔌 Connection pool: {app.config['POOL_SIZE']} read-only")
+    print(f"🗃️  Response cache: {args.cache_mb} MiB")
+    with app.app_context():
+        print(f"🔊 Audio: {len(get_audio_manifest())} articles")
+    if args.asgi:
+        print(f"⚡ ASGI (uvicorn): {args.workers} worker(s) x {app.config['POOL_SIZE']} threads")
     print(f"🌍 URL: http://{args.host}:{args.port}")
     print("="*60)
     print("\n💡 Press Ctrl+C to stop the server\n")
@@ -158,7 +424,17 @@ def main():
         webbrowser.open(url)
     
     # Run server
-    app.run(host=args.host, port=args.port, debug=args.debug)
+    if args.asgi:
+        # 워커 프로세스는 asgi.create_app()이 환경 변수로 같은 설정을 받아 앱을 만든다
+        os.environ['GURUPIA_DB_PATH'] = app.config['DB_PATH']
+        os.environ['GURUPIA_POOL_SIZE'] = str(app.config['POOL_SIZE'])
+        os.environ['GURUPIA_CACHE_BYTES'] = str(app.config['RESPONSE_CACHE_BYTES'])
+        os.environ['GURUPIA_WORKERS'] = str(args.workers)
+        uvicorn.run('asgi:create_app', factory=True, host=args.host, port=args.port,
+                    workers=args.workers, app_dir=str(Path(__file__).parent),
+                    log_level='debug' if args.debug else 'warning')
+    else:
+        app.run(host=args.host, port=args.port, debug=args.debug)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+GurupiaDict Web Viewer - ASGI serving mode
+
+Serves the same Flask routes under an ASGI server (uvicorn) for several
+concurrent users, which Flask's development server handles poorly:
+
+- Flask views (blocking SQLite reads) run on a bounded thread pool, one
+  thread per pooled read-only connection, so the event loop never blocks
+  and a burst of requests queues instead of opening unbounded connections
+- /api/audio/<title> is streamed by the event loop in chunks, so long
+  audio downloads do not hold a database thread; the file comes from the
+  audio manifest loaded at startup, with Range (206) and ETag (304) support
+
+Started by `app.py --asgi [--workers N]`, which passes its settings to the
+worker processes through GURUPIA_* environment variables.
+"""
+
+import asyncio
+import io
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qs
+
+from werkzeug.http import parse_etags, parse_range_header
+
+from app import app as flask_app, audio_cache_control, get_audio_manifest, get_pool
+
+# 오디오 스트리밍 청크 크기
+AUDIO_CHUNK_BYTES = 64 * 1024
+
+# Flask로 넘길 요청 본문 상한 (POST /api/articles 등 JSON 본문만 받음)
+MAX_BODY_BYTES = 1024 * 1024
+
+AUDIO_PREFIX = '/api/audio/'
+
+
+class GurupiaASGI:
+    """ASGI application: Flask views on a bounded thread pool, audio streamed asynchronously"""
+
+    def __init__(self, wsgi_app, threads: int = 8, multiprocess: bool = False):
+        self.wsgi_app = wsgi_app
+        self.threads = threads
+        self.multiprocess = multiprocess
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='gurupia-db')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            if scope['path'].startswith(AUDIO_PREFIX) and scope['method'] in ('GET', 'HEAD'):
+                await self._serve_audio(scope, receive, send)
+            else:
+                await self._serve_wsgi(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                with flask_app.app_context():
+                    get_audio_manifest()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                with flask_app.app_context():
+                    get_pool().close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _serve_wsgi(self, scope, receive, send):
+        body = bytearray()
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+            if len(body) > MAX_BODY_BYTES:
+                await self._send_json(send, 413, {'error': 'Request body too large'})
+                return
+
+        environ = self._environ(scope, bytes(body))
+        loop = asyncio.get_running_loop()
+        status, headers, content = await loop.run_in_executor(self.executor, self._run_wsgi, environ)
+
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+        })
+        await send({'type': 'http.response.body', 'body': content})
+
+    def _environ(self, scope, body: bytes) -> Dict:
+        """PEP 3333 environ for an ASGI HTTP scope"""
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope['query_string'].decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'REMOTE_ADDR': client[0],
+            'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': self.multiprocess,
+            'wsgi.run_once': False,
+        }
+        for name, value in scope['headers']:
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name == 'CONTENT_TYPE':
+                environ[name] = value
+                continue
+            if name in ('CONTENT_LENGTH', 'TRANSFER_ENCODING'):
+                continue  # 본문은 이미 모두 읽었으므로 길이는 아래에서 설정
+            key = f'HTTP_{name}'
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+        # chunked 요청도 Flask가 본문을 읽도록 버퍼링한 본문의 길이를 넘긴다
+        environ['CONTENT_LENGTH'] = str(len(body))
+        return environ
+
+    def _run_wsgi(self, environ: Dict) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        """Run one request through Flask on a pool thread and collect the response"""
+        response = {}
+        chunks = []
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = headers
+            return chunks.append
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            for chunk in result:
+                chunks.append(chunk)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return response['status'], response['headers'], b''.join(chunks)
+
+    async def _serve_audio(self, scope, receive, send):
+        title = scope['path'][len(AUDIO_PREFIX):]
+        with flask_app.app_context():
+            manifest = get_audio_manifest()
+        entry = manifest.get(title)
+        if entry is None:
+            await self._send_json(send, 404, {'error': 'Audio file not found'})
+            return
+
+        headers = {name.decode('latin-1'): value.decode('latin-1') for name, value in scope['headers']}
+        version = parse_qs(scope['query_string'].decode('latin-1')).get('v', [None])[0]
+        etag = f'"{entry["hash"]}"'
+        common = [
+            (b'accept-ranges', b'bytes'),
+            (b'etag', etag.encode('latin-1')),
+            (b'cache-control', audio_cache_control(entry, version).encode('latin-1')),
+        ]
+        if parse_etags(headers.get('if-none-match')).contains(entry['hash']):
+            await send({'type': 'http.response.start', 'status': 304, 'headers': common})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        size = entry['size']
+        start, stop, status = 0, size, 200
+        byte_range = parse_range_header(headers.get('range'))
+        # If-Range가 현재 ETag와 다르면(파일이 바뀜) 전체를 보낸다
+        if byte_range is not None and headers.get('if-range', etag) == etag:
+            span = byte_range.range_for_length(size)
+            if span is None and len(byte_range.ranges) == 1:
+                await send({
+                    'type': 'http.response.start',
+                    'status': 416,
+                    'headers': common + [(b'content-range', f'bytes */{size}'.encode())],
+                })
+                await send({'type': 'http.response.body', 'body': b''})
+                return
+            if span is not None:
+                (start, stop), status = span, 206
+                common.append((b'content-range', f'bytes {start}-{stop - 1}/{size}'.encode()))
+
+        loop = asyncio.get_running_loop()
+        try:
+            f = await loop.run_in_executor(None, open, manifest.file_path(entry), 'rb')
+        except FileNotFoundError:
+            await self._send_json(send, 404, {'error': 'Audio file not found'})
+            return
+
+        # 클라이언트가 끊으면 남은 청크를 읽지 않도록 연결 상태를 따로 지켜본다
+        disconnected = asyncio.Event()
+
+        async def watch_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+            disconnected.set()
+
+        watcher = asyncio.create_task(watch_disconnect())
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': status,
+                'headers': common + [
+                    (b'content-type', b'audio/mpeg'),
+                    (b'content-length', str(stop - start).encode()),
+                ],
+            })
+            if scope['method'] == 'HEAD' or start == stop:
+                await send({'type': 'http.response.body', 'body': b''})
+                return
+
+            f.seek(start)
+            remaining = stop - start
+            while remaining > 0 and not disconnected.is_set():
+                chunk = await loop.run_in_executor(None, f.read, min(AUDIO_CHUNK_BYTES, remaining))
+                if not chunk:
+                    break  # 매니페스트 이후 파일이 줄어듦
+                remaining -= len(chunk)
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': remaining > 0})
+            if remaining > 0 and not disconnected.is_set():
+                await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            watcher.cancel()
+            f.close()
+
+    @staticmethod
+    async def _send_json(send, status: int, payload: Dict):
+        body = json.dumps(payload).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+def create_app() -> GurupiaASGI:
+    """ASGI app factory for uvicorn (settings from the GURUPIA_* variables set by app.py --asgi)"""
+    flask_app.config['DB_PATH'] = os.environ['GURUPIA_DB_PATH']
+    flask_app.config['POOL_SIZE'] = int(os.environ.get('GURUPIA_POOL_SIZE', '8'))
+    flask_app.config['RESPONSE_CACHE_BYTES'] = int(os.environ.get('GURUPIA_CACHE_BYTES', 32 * 1024 * 1024))
+    workers = int(os.environ.get('GURUPIA_WORKERS', '1'))
+    # 스레드 하나가 연결 하나를 쓰므로 스레드 수 = 연결 풀 크기
+    return GurupiaASGI(flask_app, threads=flask_app.config['POOL_SIZE'], multiprocess=workers > 1)
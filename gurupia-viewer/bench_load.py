@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+GurupiaDict viewer load test
+
+Hammers a running viewer with concurrent keep-alive clients mixing the
+requests a browsing user makes (article, links prefetch, search,
+autocomplete, stats) and reports throughput and latency percentiles. Run
+it against each serving mode to compare them:
+
+    python app.py GurupiaDict.db --no-browser --port 5000
+    python app.py GurupiaDict.db --no-browser --port 5001 --asgi --workers 4
+
+Usage:
+    python bench_load.py http://127.0.0.1:5000
+    python bench_load.py http://127.0.0.1:5001 --clients 32 --duration 20
+    python bench_load.py http://127.0.0.1:5001 --uncached
+"""
+
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+
+def fetch_titles(host, port, count):
+    """Article titles to request, collected through /api/random"""
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    titles = set()
+    for _ in range(count * 3):
+        if len(titles) >= count:
+            break
+        conn.request('GET', '/api/random')
+        data = json.loads(conn.getresponse().read())
+        if 'title' in data:
+            titles.add(data['title'])
+    conn.close()
+    return sorted(titles)
+
+
+def make_request(rng, titles, uncached, seq):
+    """(method, path, body) of one request from the browsing mix"""
+    title = rng.choice(titles)
+    kind = rng.random()
+    if kind < 0.4:
+        method, path, body = 'GET', f'/api/article/{quote(title)}', None
+    elif kind < 0.5:
+        picked = rng.sample(titles, min(10, len(titles)))
+        method, path, body = 'POST', '/api/articles', json.dumps({'titles': picked})
+    elif kind < 0.7:
+        method, path, body = 'GET', f'/api/search?q={quote(title[:2])}&limit=20', None
+    elif kind < 0.95:
+        method, path, body = 'GET', f'/api/suggest?q={quote(title[:rng.randint(1, 3)])}', None
+    else:
+        method, path, body = 'GET', '/api/stats', None
+    if uncached and method == 'GET':
+        # 쿼리 인자가 다르면 응답 캐시 키도 달라진다 - 매번 DB까지 가게
+        path += f"{'&' if '?' in path else '?'}_={seq}"
+    return method, path, body
+
+
+def client(host, port, titles, deadline, uncached, seed, results):
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    latencies = []
+    errors = 0
+    seq = 0
+    while time.perf_counter() < deadline:
+        seq += 1
+        method, path, body = make_request(rng, titles, uncached, f'{seed}.{seq}')
+        headers = {'Content-Type': 'application/json'} if body else {}
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 500:
+                errors += 1
+            if response.getheader('Connection', '').lower() == 'close':
+                conn.close()
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    results.append((latencies, errors))
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test a running GurupiaDict viewer')
+    parser.add_argument('url', help='Viewer base URL, e.g. http://127.0.0.1:5000')
+    parser.add_argument('--clients', type=int, default=16, help='Concurrent keep-alive clients')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run')
+    parser.add_argument('--titles', type=int, default=200, help='Distinct articles to request')
+    parser.add_argument('--uncached', action='store_true',
+                        help='Vary query strings so the response cache never hits')
+
+    args = parser.parse_args()
+
+    parts = urlsplit(args.url)
+    host, port = parts.hostname, parts.port or 80
+
+    titles = fetch_titles(host, port, args.titles)
+    if not titles:
+        print("❌ No articles returned by /api/random")
+        return
+    print(f"⏱️  {args.clients} clients x {args.duration:.0f}s, {len(titles)} articles"
+          f"{' (uncached)' if args.uncached else ''}")
+
+    results = []
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=client, args=(host, port, titles, deadline, args.uncached, seed, results))
+        for seed in range(args.clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(t for latency_list, _ in results for t in latency_list)
+    errors = sum(e for _, e in results)
+    if not latencies:
+        print(f"❌ No successful requests ({errors} errors)")
+        return
+    print(f"   {len(latencies):,} requests  {len(latencies) / elapsed:8.1f} req/s  "
+          f"p50 {percentile(latencies, 50) * 1000:7.2f} ms  "
+          f"p99 {percentile(latencies, 99) * 1000:7.2f} ms  "
+          f"max {latencies[-1] * 1000:7.2f} ms  errors {errors}")
+
+
+if __name__ == '__main__':
+    main()
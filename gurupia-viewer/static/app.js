@@ -4,9 +4,14 @@ class GurupiaViewer {
     constructor() {
         this.currentArticle = null;
         this.searchTimeout = null;
+        this.searchSeq = 0;
         this.history = [];
         this.historyIndex = -1;
 
+        // 불러온/미리 받은 문서 (제목 -> /api/article 응답), 오래된 것부터 제거
+        this.articleCache = new Map();
+        this.articleCacheSize = 100;
+
         // TTS
         this.tts = null;
         this.ttsUtterance = null;
@@ -85,16 +90,20 @@ class GurupiaViewer {
         }
 
         this.searchTimeout = setTimeout(async () => {
+            // 늦게 도착한 이전 입력의 응답이 최신 결과를 덮어쓰지 않도록
+            const seq = ++this.searchSeq;
             try {
-                const response = await fetch(`/api/search?q=${encodeURIComponent(query)}&limit=20`);
+                const response = await fetch(`/api/suggest?q=${encodeURIComponent(query)}&limit=20`);
                 const data = await response.json();
 
-                this.displaySearchResults(data.results);
+                if (seq === this.searchSeq) {
+                    this.displaySearchResults(data.results);
+                }
             } catch (error) {
                 console.error('Search error:', error);
                 this.showError('검색 중 오류가 발생했습니다.');
             }
-        }, 300); // Debounce 300ms
+        }, 80); // Debounce 80ms (autocomplete index answers in a few ms)
     }
 
     displaySearchResults(results) {
@@ -148,17 +157,22 @@ class GurupiaViewer {
         this.showLoading(true);
 
         try {
-            const response = await fetch(`/api/article/${encodeURIComponent(title)}`);
-            const data = await response.json();
-
-            if (data.error) {
-                this.showError(data.error);
-                return;
+            let data = this.articleCache.get(title);
+            if (!data) {
+                const response = await fetch(`/api/article/${encodeURIComponent(title)}`);
+                data = await response.json();
+
+                if (data.error) {
+                    this.showError(data.error);
+                    return;
+                }
+                this.cacheArticle(title, data);
             }
 
             this.currentArticle = data;
             this.displayArticle(data);
             this.displayLinks(data);
+            this.prefetchLinks(data);
 
             // Update history
             if (addToHistory) {
@@ -173,6 +187,38 @@ class GurupiaViewer {
         }
     }
 
+    cacheArticle(title, data) {
+        this.articleCache.delete(title);
+        this.articleCache.set(title, data);
+        while (this.articleCache.size > this.articleCacheSize) {
+            this.articleCache.delete(this.articleCache.keys().next().value);
+        }
+    }
+
+    async prefetchLinks(data) {
+        // 화면에 보이는 참조 문서들을 요청 한 번(POST /api/articles)으로 미리 받아 둔다
+        const titles = data.outgoing_links.slice(0, 20)
+            .filter(link => link.exists && !this.articleCache.has(link.title))
+            .map(link => link.title);
+        if (titles.length === 0) return;
+
+        try {
+            const response = await fetch('/api/articles', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ titles })
+            });
+            const result = await response.json();
+            if (result.error) return;
+
+            for (const [title, bundle] of Object.entries(result.articles)) {
+                this.cacheArticle(title, bundle);
+            }
+        } catch (error) {
+            console.warn('Prefetch error:', error);
+        }
+    }
+
     displayArticle(data) {
         const container = document.getElementById('articleContent');
         const article = data.article;
@@ -201,19 +247,37 @@ class GurupiaViewer {
         // Add copy buttons to code blocks
         this.addCodeCopyButtons(container);
 
+        // 없는 문서로 가는 링크 (서버가 outgoing_links에 exists: false로 표시)
+        const redLinks = new Set(data.outgoing_links.filter(link => !link.exists).map(link => link.title));
+
         // Add click handlers to dict:// links
         container.querySelectorAll('a.dict-link').forEach(link => {
+            const href = link.getAttribute('href');
+            const title = href.startsWith('dict://') ? this.dictLinkTitle(href) : null;
+            if (title !== null && redLinks.has(title)) {
+                link.classList.add('red-link');
+                link.title = '아직 없는 문서입니다';
+            }
+
             link.addEventListener('click', (e) => {
                 e.preventDefault();
-                const href = link.getAttribute('href');
-                if (href.startsWith('dict://')) {
-                    const title = decodeURIComponent(href.substring(7));
+                if (title !== null && !redLinks.has(title)) {
                     this.loadArticle(title);
                 }
             });
         });
     }
 
+    // dict:// 링크는 인코딩되지 않은 제목으로 만들어지므로 '%'가 든 제목("100%")은 그대로 사용
+    dictLinkTitle(href) {
+        const raw = href.substring(7);
+        try {
+            return decodeURIComponent(raw);
+        } catch (e) {
+            return raw;
+        }
+    }
+
     addCodeCopyButtons(container) {
         const preBlocks = container.querySelectorAll('pre');
         preBlocks.forEach(pre => {
@@ -246,9 +310,13 @@ class GurupiaViewer {
             <div class="links-section">
                 <h3>📚 참조 문서 (${data.outgoing_links.length})</h3>
                 <ul class="link-list">
-                    ${data.outgoing_links.slice(0, 20).map(link => `
-                        <li class="link-item" data-title="${this.escapeHtml(link)}">
-                            ${this.escapeHtml(link)}
+                    ${data.outgoing_links.slice(0, 20).map(link => link.exists ? `
+                        <li class="link-item" data-title="${this.escapeHtml(link.title)}">
+                            ${this.escapeHtml(link.title)}
+                        </li>
+                    ` : `
+                        <li class="link-item red-link" title="아직 없는 문서입니다">
+                            ${this.escapeHtml(link.title)}
                         </li>
                     `).join('')}
                     ${data.outgoing_links.length > 20 ?
@@ -433,47 +501,36 @@ class GurupiaViewer {
 
         this.stopTTS();
 
-        const title = this.currentArticle.article.title;
+        // Pre-generated MP3 (서버가 문서 응답에 버전 붙은 URL을 넣어 줌)
+        // Audio 요소가 Range 요청으로 스트리밍하므로 전체를 받기 전에 재생되고, 탐색은 필요한 부분만 받는다
+        const audioInfo = this.currentArticle.audio;
+        if (audioInfo) {
+            console.log('✅ Found pre-generated MP3');
+            const audio = new Audio(audioInfo.url);
 
-        // Check for pre-generated MP3 file first
-        try {
-            const response = await fetch(`/api/audio/${encodeURIComponent(title)}`);
-
-            if (response.ok) {
-                // MP3 file exists! Play it
-                console.log('✅ Found pre-generated MP3');
-                const blob = await response.blob();
-                const url = URL.createObjectURL(blob);
-                const audio = new Audio(url);
-
-                audio.onplay = () => {
-                    console.log('🔊 Playing MP3');
-                    playBtn.textContent = '▶️ 읽기';
-                    playBtn.disabled = false;
-                    playBtn.style.display = 'none';
-                    document.getElementById('ttsPauseBtn').style.display = 'inline-block';
-                };
-
-                audio.onended = () => {
-                    console.log('✅ MP3 ended');
-                    document.getElementById('ttsPlayBtn').style.display = 'inline-block';
-                    document.getElementById('ttsPauseBtn').style.display = 'none';
-                    URL.revokeObjectURL(url);
-                };
-
-                audio.onerror = () => {
-                    console.error('❌ MP3 error');
-                    playBtn.textContent = '▶️ 읽기';
-                    playBtn.disabled = false;
-                    URL.revokeObjectURL(url);
-                };
-
-                this.currentAudio = audio;
-                audio.play();
-                return;
-            }
-        } catch (error) {
-            console.log('ℹ️ No MP3, using browser TTS');
+            audio.onplay = () => {
+                console.log('🔊 Playing MP3');
+                playBtn.textContent = '▶️ 읽기';
+                playBtn.disabled = false;
+                playBtn.style.display = 'none';
+                document.getElementById('ttsPauseBtn').style.display = 'inline-block';
+            };
+
+            audio.onended = () => {
+                console.log('✅ MP3 ended');
+                document.getElementById('ttsPlayBtn').style.display = 'inline-block';
+                document.getElementById('ttsPauseBtn').style.display = 'none';
+            };
+
+            audio.onerror = () => {
+                console.error('❌ MP3 error');
+                playBtn.textContent = '▶️ 읽기';
+                playBtn.disabled = false;
+            };
+
+            this.currentAudio = audio;
+            audio.play();
+            return;
         }
 
         // Fallback to browser TTS
@@ -1,147 +1,478 @@
 """
 GurupiaDict TTS Generator
 Generate high-quality MP3 files using Google Cloud TTS
+
+Batch engine: one backend client shared by a bounded worker pool, a token
+bucket limiting request rate, retry with exponential backoff for transient
+errors, and long articles split into chunks at sentence boundaries (the
+chunks' MP3 streams are joined into one file per article).
+
+Chunks are cached by content (hash of text, voice and speaking rate) under
+<output>/chunks/, and manifest.json lists each article's chunk keys: an
+article is regenerated only when its chunk list changes, and then only the
+chunks not already in the cache are sent to the backend.
+
+Backends:
+- google : Google Cloud Text-to-Speech (WaveNet)
+- local  : offline stand-in producing silent MP3s of realistic length, with
+           simulated latency/failures, to test and benchmark the pipeline
 """
 
+import argparse
+import hashlib
 import os
+import random
+import re
+import struct
 import sys
-import json
-import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from google.cloud import texttospeech
-
-def generate_tts_audio(text, output_path, voice_name="ko-KR-Wavenet-A", speaking_rate=1.0):
-    """Generate TTS audio using Google Cloud TTS"""
-    
-    # Initialize client
-    client = texttospeech.TextToSpeechClient()
-    
-    # Set up synthesis input
-    synthesis_input = texttospeech.SynthesisInput(text=text)
-    
-    # Set up voice parameters
-    voice = texttospeech.VoiceSelectionParams(
-        language_code="ko-KR",
-        name=voice_name  # WaveNet for high quality
-    )
-    
-    # Set up audio config
-    audio_config = texttospeech.AudioConfig(
-        audio_encoding=texttospeech.AudioEncoding.MP3,
-        speaking_rate=speaking_rate
-    )
-    
-    # Perform TTS
-    response = client.synthesize_speech(
-        input=synthesis_input,
-        voice=voice,
-        audio_config=audio_config
-    )
-    
-    # Save to file
-    with open(output_path, "wb") as out:
-        out.write(response.audio_content)
-    
-    return len(text)
-
-def generate_popular_articles(db_path, output_dir, limit=100):
-    """Generate TTS for popular articles"""
-    
+from typing import Dict, List, Set
+
+sys.path.insert(0, str(Path(__file__).parent / 'gurupia-synthesizer'))
+from query import GurupiaQuery
+from audio_manifest import AudioManifest, ChunkCache, chunk_key, safe_filename, strip_tags
+
+# google 백엔드에서만 필요한 선택 의존성
+try:
+    from google.api_core import exceptions as google_exceptions
+    from google.cloud import texttospeech
+except ImportError:
+    google_exceptions = None
+    texttospeech = None
+
+# 재시도: 지수 백오프 (초), 지터 50~100%
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+# 청크 경계: 평균 8문장에 한 번꼴로 해시가 고른 문장 뒤에서 끊는다
+CHUNK_ANCHOR_EVERY = 8
+
+RE_SENTENCE_END = re.compile(r'(?<=[.!?。…])\s+|\s*\n\s*')
+RE_PIPED_LINK = re.compile(r'\[\[[^\[\]|]*\|([^\[\]]*)\]\]')
+RE_SIMPLE_LINK = re.compile(r'\[\[([^\[\]]*)\]\]')
+RE_QUOTES = re.compile(r"'{2,}")
+
+
+class TransientTTSError(Exception):
+    """A synthesis failure worth retrying (rate limit, timeout, server error)"""
+
+
+class GoogleTTSBackend:
+    """Google Cloud TTS with one client shared by all workers (the client is thread-safe)"""
+
+    name = 'google'
+    # 요청 한 번의 입력 상한은 5,000 "바이트" (한글은 글자당 3바이트)
+    max_bytes = 5000
+
+    def __init__(self, voice_name="ko-KR-Wavenet-A", speaking_rate=1.0):
+        if texttospeech is None:
+            raise ImportError("The google backend requires: pip install google-cloud-texttospeech")
+        # 캐시 키의 일부 (목소리·속도가 바뀌면 모든 청크를 새로 합성)
+        self.voice_name = voice_name
+        self.speaking_rate = speaking_rate
+        self.client = texttospeech.TextToSpeechClient()
+        self.voice = texttospeech.VoiceSelectionParams(
+            language_code="ko-KR",
+            name=voice_name  # WaveNet for high quality
+        )
+        self.audio_config = texttospeech.AudioConfig(
+            audio_encoding=texttospeech.AudioEncoding.MP3,
+            speaking_rate=speaking_rate
+        )
+
+    def synthesize(self, text: str) -> bytes:
+        response = self.client.synthesize_speech(
+            input=texttospeech.SynthesisInput(text=text),
+            voice=self.voice,
+            audio_config=self.audio_config
+        )
+        return response.audio_content
+
+    def is_retryable(self, error: Exception) -> bool:
+        return isinstance(error, (
+            google_exceptions.ResourceExhausted,
+            google_exceptions.ServiceUnavailable,
+            google_exceptions.DeadlineExceeded,
+            google_exceptions.InternalServerError,
+        ))
+
+
+class LocalTTSBackend:
+    """
+    Offline stand-in: silent MP3 (MPEG-2 Layer III, 24 kHz, 32 kbps mono) as
+    long as the text would take to read, after a simulated request latency,
+    failing transiently at the given rate
+    """
+
+    name = 'local'
+    max_bytes = 5000
+
+    CHARS_PER_SECOND = 8.0
+    # 무음 프레임: 72 * 32000 / 24000 = 96바이트, 프레임당 576샘플 (24 ms)
+    _FRAME = struct.pack('>BBBB', 0xFF, 0xF3, 0x44, 0xC0) + bytes(92)
+    _FRAME_SECONDS = 576 / 24000
+
+    voice_name = 'local-silence'
+
+    def __init__(self, latency=0.2, failure_rate=0.0, speaking_rate=1.0, seed=0):
+        self.speaking_rate = speaking_rate
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def synthesize(self, text: str) -> bytes:
+        with self._lock:
+            fail = self._rng.random() < self.failure_rate
+        time.sleep(self.latency)
+        if fail:
+            raise TransientTTSError("simulated rate limit")
+        seconds = len(text) / self.CHARS_PER_SECOND / self.speaking_rate
+        frames = max(1, round(seconds / self._FRAME_SECONDS))
+        return self._FRAME * frames
+
+    def is_retryable(self, error: Exception) -> bool:
+        return isinstance(error, TransientTTSError)
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until `tokens` are available, then take them"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def speech_text(raw_content: str) -> str:
+    """Wiki markup -> text to read aloud ([[A|B]] -> B, [[A]] -> A, no bold/italic quotes)"""
+    text = RE_PIPED_LINK.sub(r'\1', raw_content)
+    text = RE_SIMPLE_LINK.sub(r'\1', text)
+    return RE_QUOTES.sub('', text)
+
+
+def _split_long(text: str, max_bytes: int) -> List[str]:
+    """Split a single over-long sentence at spaces (or anywhere, for a giant word)"""
+    pieces, current = [], ''
+    for word in text.split(' '):
+        candidate = f"{current} {word}" if current else word
+        if len(candidate.encode('utf-8')) <= max_bytes:
+            current = candidate
+            continue
+        if current:
+            pieces.append(current)
+        current = ''
+        while len(word.encode('utf-8')) > max_bytes:
+            cut = len(word.encode('utf-8')[:max_bytes].decode('utf-8', 'ignore'))
+            pieces.append(word[:cut])
+            word = word[cut:]
+        current = word
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _is_anchor(sentence: str) -> bool:
+    """Whether a chunk may end after this sentence (decided by its content alone)"""
+    return hashlib.blake2b(sentence.encode('utf-8'), digest_size=1).digest()[0] < 256 // CHUNK_ANCHOR_EVERY
+
+
+def chunk_text(text: str, max_bytes: int) -> List[str]:
+    """
+    Split text into chunks of at most max_bytes UTF-8 bytes at sentence boundaries
+
+    Chunks end after "anchor" sentences chosen by hash once they hold a
+    quarter of max_bytes, not only when full, so an edit that changes a
+    sentence's length moves boundaries only until the next anchor and the
+    other chunks keep their cache keys.
+    """
+    chunks, current = [], ''
+    for sentence in RE_SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        candidate = f"{current} {sentence}" if current else sentence
+        if len(candidate.encode('utf-8')) <= max_bytes:
+            current = candidate
+            if len(current.encode('utf-8')) >= max_bytes // 4 and _is_anchor(sentence):
+                chunks.append(current)
+                current = ''
+            continue
+        if current:
+            chunks.append(current)
+        if len(sentence.encode('utf-8')) <= max_bytes:
+            current = sentence
+        else:
+            *full, current = _split_long(sentence, max_bytes)
+            chunks.extend(full)
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class TTSBatchEngine:
+    """Synthesize many articles concurrently with rate limiting and retries"""
+
+    def __init__(self, backend, workers: int = 4, rate: float = 0, retries: int = 5):
+        self.backend = backend
+        self.workers = workers
+        self.bucket = TokenBucket(rate) if rate > 0 else None
+        self.retries = retries
+        self.retried = 0
+        self._lock = threading.Lock()
+
+    def synthesize(self, text: str) -> bytes:
+        """One backend request, after a rate-limit token, retried with backoff if transient"""
+        for attempt in range(self.retries + 1):
+            if self.bucket:
+                self.bucket.acquire()
+            try:
+                return self.backend.synthesize(text)
+            except Exception as e:
+                if attempt == self.retries or not self.backend.is_retryable(e):
+                    raise
+                with self._lock:
+                    self.retried += 1
+                delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+
+    def run(self, jobs: List[Dict], cache: ChunkCache, on_done):
+        """
+        Synthesize the chunks of jobs ({'title', 'chunks': [(key, text)]}) that
+        are not cached yet, each distinct key once, storing results in the cache
+
+        on_done(job, error or None) is called from the calling thread as soon as
+        all of an article's chunks are cached (at once if they already were).
+        """
+        texts = {}
+        waiting = {}
+        remaining = {}
+        failed = {}
+        for index, job in enumerate(jobs):
+            # 다른 문서가 이미 요청한 같은 청크는 다시 요청하지 않고 그 결과를 기다린다
+            missing = {key for key, _ in job['chunks'] if key in texts or key not in cache}
+            for key, text in job['chunks']:
+                if key in missing:
+                    texts[key] = text
+                    waiting.setdefault(key, set()).add(index)
+            remaining[index] = len(missing)
+
+        self.synthesized = len(texts)
+        self.synthesized_chars = sum(len(text) for text in texts.values())
+
+        for index, job in enumerate(jobs):
+            if remaining[index] == 0:
+                on_done(job, None)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='tts') as pool:
+            futures = {
+                pool.submit(self._synthesize_into, cache, key, text): key
+                for key, text in texts.items()
+            }
+            for future in as_completed(futures):
+                error = future.exception()
+                for index in waiting[futures[future]]:
+                    if error is not None:
+                        failed.setdefault(index, error)
+                    remaining[index] -= 1
+                    if remaining[index] == 0:
+                        on_done(jobs[index], failed.get(index))
+
+    def _synthesize_into(self, cache: ChunkCache, key: str, text: str):
+        cache.put(key, self.synthesize(text))
+
+
+def create_backend(args):
+    if args.backend == 'google':
+        return GoogleTTSBackend(voice_name=args.voice, speaking_rate=args.speaking_rate)
+    return LocalTTSBackend(latency=args.local_latency, failure_rate=args.local_failure_rate,
+                           speaking_rate=args.speaking_rate)
+
+
+def audio_filename(title: str, keys: List[str]) -> str:
+    """Per-article MP3 name: sanitized title + digest of its chunk keys (no collisions between titles)"""
+    digest = hashlib.blake2b('\n'.join(keys).encode('ascii'), digest_size=16).hexdigest()
+    return f"{safe_filename(title) or 'audio'}-{digest[:12]}.mp3"
+
+
+def generate_popular_articles(db_path, output_dir, limit=100, backend=None, workers=4, rate=0, retries=5,
+                              prune=False):
+    """Generate TTS for popular articles (only articles whose text changed since the last run)"""
+
+    # 기본값은 이전과 같이 Google TTS (오프라인 테스트는 LocalTTSBackend를 명시적으로 전달)
+    backend = backend or GoogleTTSBackend()
+
     print(f"🎙️ GurupiaDict TTS Generator")
     print(f"📚 Database: {db_path}")
     print(f"📁 Output: {output_dir}")
     print(f"🎯 Generating top {limit} articles")
+    print(f"⚙️  Backend: {backend.name} ({backend.voice_name}, x{backend.speaking_rate:g}), {workers} workers"
+          f"{f', {rate:g} req/s' if rate > 0 else ''}, {retries} retries")
     print()
-    
+
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
-    
-    # Connect to database
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    # Get most referenced articles (popular ones)
-    cursor.execute("""
-        SELECT n.title, n.raw_content, COUNT(e.id) as ref_count
-        FROM Nodes n
-        LEFT JOIN Edges e ON e.target_title = n.title
-        GROUP BY n.id
-        ORDER BY ref_count DESC
-        LIMIT ?
-    """, (limit,))
-    
-    articles = cursor.fetchall()
-    total_chars = 0
-    generated = 0
-    
+
+    # 제목 -> 파일·크기·재생 시간·해시·청크 키 (뷰어가 시작할 때 한 번 읽음)
+    manifest = AudioManifest.load(output_dir)
+    cache = ChunkCache(output_dir)
+
+    # Get most referenced articles (popular ones; PageRank order when the DB has it)
+    with GurupiaQuery(db_path) as gq:
+        articles = gq.get_popular_articles(limit)
+
+    jobs = []
+    job_keys: Set[str] = set()
+    unchanged = 0
     for i, article in enumerate(articles, 1):
         title = article['title']
-        content = article['raw_content']
-        ref_count = article['ref_count']
-        
-        # Create safe filename
-        safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()
-        safe_title = safe_title[:100]  # Limit filename length
-        output_path = os.path.join(output_dir, f"{safe_title}.mp3")
-        
-        # Skip if already exists
-        if os.path.exists(output_path):
-            print(f"⏭️  [{i}/{limit}] Skipped: {title} (already exists)")
+
+        # 5,000자에서 자르지 않고 문장 단위 청크로 나눠 전체를 읽는다
+        texts = chunk_text(speech_text(article['raw_content']), backend.max_bytes)
+        if not texts:
+            continue
+        chunks = [(chunk_key(text, backend.voice_name, backend.speaking_rate), text) for text in texts]
+        keys = [key for key, _ in chunks]
+        job_keys.update(keys)
+
+        # 청크 목록이 같고 파일이 있으면 본문이 바뀌지 않은 것
+        entry = manifest.articles.get(title)
+        if entry is not None and entry.get('chunks') == keys and manifest.file_path(entry).is_file():
+            unchanged += 1
             continue
-        
-        try:
-            # Truncate content if too long (max 5000 chars for TTS)
-            if len(content) > 5000:
-                content = content[:5000] + "..."
-            
-            # Generate TTS
-            chars = generate_tts_audio(content, output_path)
-            total_chars += chars
-            generated += 1
-            
-            print(f"✅ [{i}/{limit}] Generated: {title} ({chars:,} chars, {ref_count} refs)")
-            
-        except Exception as e:
-            print(f"❌ [{i}/{limit}] Error: {title} - {e}")
-    
-    conn.close()
-    
+        if entry is None and manifest.get(title) is not None:
+            # 매니페스트에 없는 직접 넣은 MP3 (AI Studio 등) - 덮어쓰지 않음
+            print(f"⏭️  [{i}/{limit}] Skipped: {title} (unlisted audio file)")
+            continue
+
+        jobs.append({
+            'index': i, 'title': title, 'chunks': chunks,
+            'ref_count': article['ref_count'], 'updated': entry is not None,
+        })
+
+    total_chars = 0
+    generated = 0
+    errors = 0
+
+    def on_done(job, error):
+        nonlocal total_chars, generated, errors
+        title = job['title']
+        if error is not None:
+            errors += 1
+            print(f"❌ [{job['index']}/{limit}] Error: {title} - {error}")
+            return
+
+        # 캐시된 청크별 MP3를 이어 붙여 문서당 파일 하나 (뒤 청크의 ID3 태그는 제거)
+        keys = [key for key, _ in job['chunks']]
+        parts = [cache.get(key) for key in keys]
+        filename = audio_filename(title, keys)
+        with open(os.path.join(output_dir, filename), "wb") as out:
+            out.write(parts[0] + b''.join(strip_tags(part) for part in parts[1:]))
+
+        old = manifest.articles.get(title)
+        manifest.add(title, filename, keys)
+        if old is not None and old['file'] != filename and \
+                all(entry['file'] != old['file'] for entry in manifest.articles.values()):
+            manifest.file_path(old).unlink(missing_ok=True)
+        manifest.save()
+
+        chars = sum(len(text) for _, text in job['chunks'])
+        total_chars += chars
+        generated += 1
+        print(f"✅ [{job['index']}/{limit}] {'Updated' if job['updated'] else 'Generated'}: {title} "
+              f"({chars:,} chars, {len(keys)} chunks, {job['ref_count']} refs)")
+
+    engine = TTSBatchEngine(backend, workers=workers, rate=rate, retries=retries)
+    start = time.perf_counter()
+    engine.run(jobs, cache, on_done)
+    elapsed = time.perf_counter() - start
+
+    chunk_count = sum(len(job['chunks']) for job in jobs)
     print()
     print(f"📊 Summary:")
-    print(f"   Generated: {generated} files")
-    print(f"   Total characters: {total_chars:,}")
-    print(f"   Estimated cost: ${total_chars / 1_000_000 * 16:.2f} (WaveNet)")
-    print(f"   Free tier: {max(0, 1_000_000 - total_chars):,} chars remaining")
+    print(f"   Generated: {generated} files ({errors} failed), {unchanged} unchanged")
+    print(f"   Chunks: {chunk_count} needed, {engine.synthesized} synthesized, "
+          f"{chunk_count - engine.synthesized} from cache")
+    print(f"   Requests: {engine.retried} retries, {elapsed:.1f}s "
+          f"({engine.synthesized / elapsed if elapsed else 0:.1f} chunks/s)")
+    print(f"   Characters: {total_chars:,} in generated files, {engine.synthesized_chars:,} synthesized")
+    print(f"   Manifest: {len(manifest.articles)} articles ({manifest.path})")
+    if prune:
+        removed = cache.prune(manifest.chunk_keys() | job_keys)
+        print(f"   Pruned: {removed} unused chunks")
+    if backend.name == 'google':
+        print(f"   Estimated cost: ${engine.synthesized_chars / 1_000_000 * 16:.2f} (WaveNet)")
+        print(f"   Free tier: {max(0, 1_000_000 - engine.synthesized_chars):,} chars remaining")
     print()
     print(f"✅ TTS generation completed!")
 
-if __name__ == '__main__':
-    if len(sys.argv) < 2:
-        print("Usage: python tts_generator.py <database.db> [limit]")
-        print("\nExample:")
-        print("  python tts_generator.py GurupiaDict_Complete.db 100")
-        sys.exit(1)
-    
-    db_path = sys.argv[1]
-    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 100
-    output_dir = "gurupia-viewer/audio"
-    
-    if not Path(db_path).exists():
-        print(f"❌ Database not found: {db_path}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate TTS audio for the most popular articles')
+    parser.add_argument('database', help='GurupiaDict database')
+    parser.add_argument('limit', nargs='?', type=int, default=100, help='Articles to generate (default: 100)')
+    parser.add_argument('--output', default='gurupia-viewer/audio', help='Audio directory')
+    parser.add_argument('--backend', choices=('google', 'local'), default='google',
+                        help='google: Cloud TTS, local: offline stand-in for testing (default: google)')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent requests (default: 4)')
+    parser.add_argument('--rate', type=float, default=10.0,
+                        help='Max requests per second, 0 for unlimited (default: 10)')
+    parser.add_argument('--retries', type=int, default=5, help='Retries for transient errors (default: 5)')
+    parser.add_argument('--prune', action='store_true',
+                        help='Delete cached chunks no article uses any more')
+    parser.add_argument('--voice', default='ko-KR-Wavenet-A', help='Google voice name')
+    parser.add_argument('--speaking-rate', type=float, default=1.0, help='Speaking rate')
+    parser.add_argument('--local-latency', type=float, default=0.2,
+                        help='local backend: simulated seconds per request (default: 0.2)')
+    parser.add_argument('--local-failure-rate', type=float, default=0.0,
+                        help='local backend: fraction of requests failing transiently (default: 0)')
+
+    args = parser.parse_args()
+
+    if not Path(args.database).exists():
+        print(f"❌ Database not found: {args.database}")
         sys.exit(1)
-    
-    # Check for Google Cloud credentials
-    if not os.getenv('GOOGLE_APPLICATION_CREDENTIALS'):
-        print("⚠️  Warning: GOOGLE_APPLICATION_CREDENTIALS not set")
-        print("   Please set up Google Cloud credentials first:")
-        print("   1. Create a service account in Google Cloud Console")
-        print("   2. Download JSON key file")
-        print("   3. Set environment variable:")
-        print("      $env:GOOGLE_APPLICATION_CREDENTIALS='path/to/key.json'")
-        print()
-        response = input("Continue anyway? (y/n): ")
-        if response.lower() != 'y':
+
+    if args.backend == 'google':
+        if texttospeech is None:
+            print("❌ The google backend requires: pip install google-cloud-texttospeech")
             sys.exit(1)
-    
-    generate_popular_articles(db_path, output_dir, limit)
+
+        # Check for Google Cloud credentials
+        if not os.getenv('GOOGLE_APPLICATION_CREDENTIALS'):
+            print("⚠️  Warning: GOOGLE_APPLICATION_CREDENTIALS not set")
+            print("   Please set up Google Cloud credentials first:")
+            print("   1. Create a service account in Google Cloud Console")
+            print("   2. Download JSON key file")
+            print("   3. Set environment variable:")
+            print("      $env:GOOGLE_APPLICATION_CREDENTIALS='path/to/key.json'")
+            print()
+            response = input("Continue anyway? (y/n): ")
+            if response.lower() != 'y':
+                sys.exit(1)
+
+    generate_popular_articles(args.database, args.output, args.limit, backend=create_backend(args),
+                              workers=max(1, args.workers), rate=args.rate, retries=args.retries,
+                              prune=args.prune)
+
+
+if __name__ == '__main__':
+    main()